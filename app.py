@@ -1,20 +1,21 @@
 import os
-import json
 import streamlit as st
 from v1.member_count import get_new_members
 from v1.nuvem import gerar_nuvem_palavras, file_to_json
-from v1.stats import get_top_authors, get_author_comments
+from v1.stats import get_top_authors, get_author_comments, get_author_seen
 from v1.particoes import get_partitions
 from v1.peaks import get_peaks, get_top_words, get_word_context
 import plotly.graph_objects as go
 from v2.app_pages.scream_index.scream_index import scream_index_page
+from v2.app_pages.search.search import search_page
 from v2.app_pages.sentiment.sentiment_analysis import sentiment_analysis_page
 from v2.app_pages.toxic.toxic_types import toxic_types_page
-from v2.output.counts.sentiment_type_counts import count_sentiment_types
-from v2.output.counts.toxic_type_counts import count_toxic_types
+from v2.output.counts.key_stats import get_key_stats
 from text_classification.CustomModelPage import custom_model_classification_page
 from text_classification.DetoxifyPage import detoxify_page
 from text_classification.ModelComparisonsPage import model_comparisons_page
+from v2.dataset.comment_dataset import as_dataset
+from v2.dataset.dataset_registry import get_dataset, get_uploaded_dataset
 
 st.set_page_config(
     page_title='StreamVis',
@@ -22,12 +23,19 @@ st.set_page_config(
     layout='wide'
 )
 
-if st.session_state.get('comments_file') is None:
-    with open('input/comments.json', encoding='utf-8') as json_file:
-        st.session_state['comments_file'] = json.load(json_file)
+COMMENTS_LOG = 'input/comments.jsonl'  # Log do coletor, lido enquanto a coleta ainda está em andamento
+COMMENTS_FILE = 'input/comments.json'  # Array JSON gerado ao fim da coleta
 
-if st.session_state.get('partitions') is None:
-    st.session_state['partitions'] = get_partitions(st.session_state['comments_file'])
+if 'comments_source' not in st.session_state:
+    st.session_state['comments_source'] = COMMENTS_LOG if os.path.exists(COMMENTS_LOG) else COMMENTS_FILE
+
+if st.session_state['comments_source'] is not None:
+    # A cada rerun: a versão atual vem do registro sem custo; de um log que cresceu só as linhas novas são lidas
+    # Referência ao dataset compartilhado entre as sessões, não uma cópia
+    st.session_state['comments_file'] = get_dataset(st.session_state['comments_source'])
+
+# As páginas leem as colunas do dataset; uma lista de comentários (ex.: resultado do Detoxify) é convertida uma vez
+st.session_state['comments_file'] = as_dataset(st.session_state['comments_file'])
 
 UPLOAD_DIR = 'input'
 
@@ -69,6 +77,8 @@ def most_comments():
         for author, count in authors:
             with st.expander(f'{author}: {count} comments'):
                 path, comments = get_author_comments(author, st.session_state['comments_file'])
+                first_seen, last_seen = get_author_seen(author, st.session_state['comments_file'])
+                st.write(f'First comment: {first_seen} - Last comment: {last_seen}')
                 st.image(path)
                 for comment in comments:
                     st.write(f"{comment['time_elapsed']} - {comment['message']}")
@@ -76,8 +86,8 @@ def most_comments():
 def show_partitions():
     st.title('Partitions')
     num_part = st.slider('Number of partitions on display', 1, 10, 5)
-    st.session_state['partitions'] = get_partitions(st.session_state['comments_file'], n=num_part)
-    for index, partition in st.session_state['partitions'].items():
+    partitions = get_partitions(st.session_state['comments_file'], n=num_part)
+    for index, partition in partitions.items():
         with st.expander(f'Partition {index+1}'):
             st.write(f'Comments: {len(partition["comments"])}')
             st.write(f'Start: {partition["start"]}')
@@ -92,22 +102,27 @@ def show_partitions():
 def show_stats():
     st.title('Key Stats')
 
-    comments_data = st.session_state['comments_file']
-
-    total_comments = len(comments_data)
-    total_authors = len(set([comment["author"] for comment in comments_data]))
-    avg_comments_per_person = total_comments / total_authors
-    total_words = sum([len(comment["message"].split()) for comment in comments_data])
-    unique_words = len(set([word for comment in comments_data for word in comment["message"].split()]))
-    avg_words_per_comment = total_words / total_comments
-    _, new_mem = get_new_members(comments_data)
-    if new_mem is not None:
-        new_members_count = len(new_mem)
-    else:
-        new_members_count = 0
+    # Todos os indicadores em uma passada, calculados uma vez por versão do dataset
+    stats = get_key_stats(st.session_state['comments_file'])
+
+    total_comments = stats['total_comments']
+    if total_comments == 0:
+        st.warning('No comments loaded')
+        return
+
+    total_authors = stats['total_authors']
+    avg_comments_per_person = stats['avg_comments_per_person']
+    total_words = stats['total_words']
+    unique_words = stats['unique_words']
+    avg_words_per_comment = stats['avg_words_per_comment']
+    new_members_count = stats['new_members']
+    # Autores e palavras distintos são estimados (HyperLogLog) em datasets grandes
+    approx = ' (≈)' if stats['distinct_error'] else ''
 
-    total_positive, total_neutral, total_negative = count_sentiment_types(st.session_state['comments_file']).values()
-    total_toxic = count_toxic_types(st.session_state['comments_file']).get('toxicity', 0)
+    total_positive = stats['sentiments']['POS']
+    total_neutral = stats['sentiments']['NEU']
+    total_negative = stats['sentiments']['NEG']
+    total_toxic = stats['toxic']
 
     def create_card(title, value, card_color="lightgray", text_color="black"):
         fig = go.Figure(go.Indicator(
@@ -134,12 +149,12 @@ def show_stats():
         st.plotly_chart(create_card("Toxic Comments %", (total_toxic / total_comments) * 100, card_color="red", text_color="white"), use_container_width=True)
 
     with col2:
-        st.plotly_chart(create_card("Total Authors", total_authors, card_color="lightyellow", text_color="darkorange"), use_container_width=True)
-        st.plotly_chart(create_card("Unique Words", unique_words, card_color="lightpink", text_color="darkred"), use_container_width=True)
+        st.plotly_chart(create_card(f"Total Authors{approx}", total_authors, card_color="lightyellow", text_color="darkorange"), use_container_width=True)
+        st.plotly_chart(create_card(f"Unique Words{approx}", unique_words, card_color="lightpink", text_color="darkred"), use_container_width=True)
         st.plotly_chart(create_card("Neutral Sentiment Comments %", (total_neutral / total_comments) * 100, card_color="lightyellow", text_color="darkorange"), use_container_width=True)
 
     with col3:
-        st.plotly_chart(create_card("Avg Comments/Person", avg_comments_per_person, card_color="lightgray", text_color="black"), use_container_width=True)
+        st.plotly_chart(create_card(f"Avg Comments/Person{approx}", avg_comments_per_person, card_color="lightgray", text_color="black"), use_container_width=True)
         st.plotly_chart(create_card("New Members", new_members_count, card_color="lightgray", text_color="black"), use_container_width=True)
         st.plotly_chart(create_card("Negative Sentiment Comments %", (total_negative / total_comments) * 100, card_color="red", text_color="white"), use_container_width=True)
 
@@ -158,12 +173,13 @@ def show_new_members():
 def upload_json(json_file):
     if json_file is None:
         return
-    content = json_file.read().decode("utf-8")
-    data = json.loads(content)
+    content = json_file.getvalue()
 
-    st.session_state['comments_file'] = data
+    # Um arquivo enviado substitui o arquivo de entrada até o fim da sessão
+    st.session_state['comments_source'] = None
+    st.session_state['comments_file'] = get_uploaded_dataset(content)
 
-pagina = st.sidebar.selectbox('Page', ['Upload Json','Detoxify Classification', 'Custom Model Classification', 'Model Comparisons', 'Comments peak', 'Top comment authors', 'Partitions', 'Stats', 'New members', 'Toxic Speech', 'Scream Index', 'Sentiment Analysis'])
+pagina = st.sidebar.selectbox('Page', ['Upload Json','Detoxify Classification', 'Custom Model Classification', 'Model Comparisons', 'Comments peak', 'Top comment authors', 'Partitions', 'Stats', 'New members', 'Toxic Speech', 'Scream Index', 'Sentiment Analysis', 'Search'])
 
 if pagina == 'Comments peak':
     comments_peak()
@@ -181,6 +197,8 @@ elif pagina == 'Scream Index':
     scream_index_page()
 elif pagina == 'Sentiment Analysis':
     sentiment_analysis_page()
+elif pagina == 'Search':
+    search_page()
 elif pagina == 'Custom Model Classification':
     custom_model_classification_page()
 elif pagina == 'Detoxify Classification':
@@ -0,0 +1,42 @@
+import os
+import sys
+import pytest
+
+# Os módulos do repositório são importados a partir da raiz (from v1..., from v2...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from v2.dataset.comment_dataset import CommentDataset, TOXIC_TYPES
+
+
+def build_records(n=None, authors=3, messages=('que jogo', 'gol GOL de placa'), elapsed=None, scored=False):
+    """
+    Comentários no formato do comments.json. O i-ésimo tem id str(i), autor
+    author{i % authors}, mensagem messages[i % len(messages)] e elapsed_s
+    elapsed[i] (ou i). Com scored, também sentimento, scream index e toxicidade.
+    """
+    if n is None:
+        n = len(elapsed) if elapsed is not None else len(messages)
+    records = []
+    for i in range(n):
+        record = {
+            'id': str(i),
+            'author': f'author{i % authors}',
+            'elapsed_s': elapsed[i] if elapsed is not None else i,
+            'message': messages[i % len(messages)]
+        }
+        if scored:
+            record['sentiment'] = ['NEG', 'NEU', 'POS'][i % 3]
+            record['scream_index'] = 1.0 if i % 3 else 0.0
+            record.update({toxic_type: 0.9 if i % 5 == 0 else 0.1 for toxic_type in TOXIC_TYPES})
+        records.append(record)
+    return records
+
+
+@pytest.fixture
+def make_records():
+    return build_records
+
+
+@pytest.fixture
+def make_dataset():
+    return lambda **kwargs: CommentDataset.from_records(build_records(**kwargs))
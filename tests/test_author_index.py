@@ -0,0 +1,30 @@
+import numpy as np
+from v2.dataset.author_index import AuthorIndex
+
+
+def test_negative_elapsed_times(make_dataset):
+    elapsed = [-4000, -1900, -10, 0, 5, 1799, 1800, 3600, -3601, 7300]
+    dataset = make_dataset(elapsed=elapsed)
+    index = AuthorIndex(dataset)
+
+    for code, author in enumerate(dataset.authors):
+        rows = np.flatnonzero(dataset.author_codes == code)
+        assert index.rows(author).tolist() == rows.tolist()
+        assert index.first_seen[code] == dataset.seconds[rows].min()
+        assert index.last_seen[code] == dataset.seconds[rows].max()
+
+        starts, counts = index.histogram(author)
+        expected_bins, expected_counts = np.unique(dataset.seconds[rows] // 1800, return_counts=True)
+        assert counts.sum() == len(rows)
+        assert dict(zip((starts // 1800).tolist(), counts.tolist())) == {
+            **{int(b): 0 for b in range(expected_bins.min(), expected_bins.max() + 1)},
+            **dict(zip(expected_bins.tolist(), expected_counts.tolist()))
+        }
+
+
+def test_all_elapsed_times_negative(make_dataset):
+    dataset = make_dataset(elapsed=[-5000, -4000, -3000, -1])
+    index = AuthorIndex(dataset)
+    starts, counts = index.histogram('author0')
+    assert starts.tolist() == [-5400, -3600, -1800]
+    assert counts.tolist() == [1, 0, 1]
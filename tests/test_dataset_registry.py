@@ -0,0 +1,23 @@
+import json
+from v2.dataset import dataset_registry
+from v2.dataset.dataset_registry import get_uploaded_dataset
+
+
+def test_uploads_are_bounded_and_least_recently_used_first(make_records, monkeypatch):
+    def upload(n):
+        return json.dumps(make_records(n)).encode('utf-8')
+
+    monkeypatch.setattr(dataset_registry, 'MAX_UPLOADS', 2)
+    monkeypatch.setattr(dataset_registry, '_uploads', type(dataset_registry._uploads)())
+
+    first = get_uploaded_dataset(upload(1))
+    assert get_uploaded_dataset(upload(1)) is first
+    second = get_uploaded_dataset(upload(2))
+    get_uploaded_dataset(upload(1))
+    get_uploaded_dataset(upload(3))
+
+    assert len(dataset_registry._uploads) == 2
+    assert get_uploaded_dataset(upload(1)) is first
+    assert get_uploaded_dataset(upload(2)) is not second
+    # Quem ainda tem o dataset removido continua com ele
+    assert len(second) == 2
@@ -0,0 +1,74 @@
+import json
+import pytest
+from v1.chat_log import ChatLogWriter
+from v1.dedup_index import BloomDedupIndex, load_dedup_index
+
+
+def comments(start, stop):
+    return [{'id': f'id{i}', 'message': 'oi'} for i in range(start, stop)]
+
+
+def journal_entries(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def collect(writer, index, batch, journal_path):
+    writer.append(index.filter_new(batch))
+    writer.sync()
+    index.save(journal_path, writer.tell())
+
+
+def test_journal_only_gets_the_new_ids(tmp_path):
+    log_path, journal_path = str(tmp_path / 'comments.jsonl'), str(tmp_path / 'comments.dedup.jsonl')
+    with ChatLogWriter(log_path) as writer:
+        index = load_dedup_index(journal_path, log_path)
+        collect(writer, index, comments(0, 5), journal_path)
+        collect(writer, index, comments(3, 8), journal_path)
+        collect(writer, index, comments(0, 8), journal_path)
+
+    entries = journal_entries(journal_path)
+    assert [entry['ids'] for entry in entries] == [[f'id{i}' for i in range(5)], ['id5', 'id6', 'id7']]
+    assert entries[-1]['log_offset'] == (tmp_path / 'comments.jsonl').stat().st_size
+
+
+@pytest.mark.parametrize('mode', ['exact', 'window', 'bloom'])
+def test_restart_continues_from_journal_and_log(tmp_path, mode):
+    log_path, journal_path = str(tmp_path / 'comments.jsonl'), str(tmp_path / 'comments.dedup.jsonl')
+    with ChatLogWriter(log_path) as writer:
+        index = load_dedup_index(journal_path, log_path, mode)
+        collect(writer, index, comments(0, 10), journal_path)
+        # Escritos no log, mas o processo caiu antes de gravar o journal
+        writer.append(index.filter_new(comments(10, 15)))
+        index.close()
+    with open(journal_path, 'a', encoding='utf-8') as f:
+        f.write('{"log_offset": 99999, "ids": ["id1')
+
+    index = load_dedup_index(journal_path, log_path, mode)
+    assert len(index) == 15
+    assert index.filter_new(comments(0, 20)) == comments(15, 20)
+
+    index.save(journal_path, (tmp_path / 'comments.jsonl').stat().st_size)
+    assert journal_entries(journal_path)[-1]['ids'] == [f'id{i}' for i in range(10, 20)]
+
+
+def test_replaced_log_rebuilds_the_index(tmp_path):
+    log_path, journal_path = str(tmp_path / 'comments.jsonl'), str(tmp_path / 'comments.dedup.jsonl')
+    with ChatLogWriter(log_path) as writer:
+        index = load_dedup_index(journal_path, log_path)
+        collect(writer, index, comments(0, 50), journal_path)
+
+    with open(log_path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(comments(100, 101)[0]) + '\n')
+
+    index = load_dedup_index(journal_path, log_path)
+    assert len(index) == 1 and 'id100' in index and 'id0' not in index
+
+
+def test_bloom_hits_outside_the_window_are_checked_on_disk(tmp_path):
+    # Filtro minúsculo (quase tudo é falso positivo) e janela de 2 IDs
+    index = BloomDedupIndex(capacity=8, error_rate=0.5, window=2, path=str(tmp_path / 'comments.dedup.sqlite'))
+    assert index.filter_new(comments(0, 50)) == comments(0, 50)
+    assert index.filter_new(comments(0, 60)) == comments(50, 60)
+    assert 'id0' in index and 'id999' not in index
+    index.close()
@@ -0,0 +1,57 @@
+import json
+import random
+import threading
+import time
+import pytest
+from v1 import chat_poller, live_metadata
+from v1.chat_poller import ChatPoller, parse_chat_items
+from v1.fake_youtube_api import FakeYouTubeApi, LIVE_CHAT_ID, serve
+from v1.http_client import HttpClient
+from v1.live_metadata import fetch_live_details
+from v1.replay import load_recorded_chat
+
+
+@pytest.fixture
+def recorded_chat(tmp_path):
+    # 120 mensagens em 3 segundos de live
+    comments = [
+        {'id': f'msg{i}', 'author': f'author{i % 7}', 'time_elapsed': f'0:00:{i // 40:02}', 'message': f'mensagem {i}'}
+        for i in range(120)
+    ]
+    path = tmp_path / 'comments.json'
+    path.write_text(json.dumps(comments), encoding='utf-8')
+    return load_recorded_chat(str(path))
+
+
+@pytest.fixture
+def fake_api(recorded_chat, monkeypatch):
+    random.seed(7)
+    api = FakeYouTubeApi(recorded_chat, speed=20, polling_interval_ms=10, error_rate=0.3)
+    server = serve(api, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    api_url = f'http://127.0.0.1:{server.server_address[1]}/youtube/v3'
+    monkeypatch.setattr(chat_poller, 'API_URL', api_url)
+    monkeypatch.setattr(live_metadata, 'API_URL', api_url)
+    yield api
+    server.shutdown()
+    server.server_close()
+
+
+def test_poller_receives_every_message_once_despite_503s(fake_api, recorded_chat):
+    statuses = []
+    client = HttpClient(backoff_base=0.001, backoff_max=0.01, max_retries=10, on_request=lambda url, status, latency: statuses.append(status))
+    live_chat_id, live_start_time_utc = fetch_live_details(fake_api.video_id, 'key', client)
+    assert live_chat_id == LIVE_CHAT_ID
+    poller = ChatPoller(live_chat_id, 'key', client, max_results=25, min_delay=0.01, max_delay=0.05)
+
+    received = []
+    deadline = time.monotonic() + 10
+    while len(received) < len(recorded_chat) and time.monotonic() < deadline:
+        received.extend(parse_chat_items(poller.poll(), live_start_time_utc))
+        time.sleep(poller.next_delay())
+    client.close()
+
+    assert statuses.count(503) > 0
+    assert [comment['id'] for comment in received] == [message['id'] for message in recorded_chat]
+    assert [comment['elapsed_s'] for comment in received] == [message['elapsed_s'] for message in recorded_chat]
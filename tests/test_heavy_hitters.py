@@ -0,0 +1,22 @@
+from v2.output.counts.heavy_hitters import AuthorTracker, WordTracker
+
+
+def test_appended_rows_continue_the_summaries(make_dataset):
+    full = make_dataset(n=900)
+    incremental = WordTracker(window=60)
+    incremental.update(make_dataset(n=400), 0)
+    incremental.update(full, 400)
+    whole = WordTracker(window=60)
+    whole.update(full, 0)
+
+    assert incremental.top(5) == whole.top(5) == [('gol', 900), ('jogo', 450), ('placa', 450)]
+    assert incremental.top(5, 120, 300) == whole.top(5, 120, 300) == [('gol', 180), ('jogo', 90), ('placa', 90)]
+    assert incremental.top(5, 10000, 10060) == []
+
+
+def test_author_windows(make_dataset):
+    tracker = AuthorTracker(window=300)
+    tracker.update(make_dataset(n=900), 0)
+    assert tracker.top(3) == [('author0', 300), ('author1', 300), ('author2', 300)]
+    assert sorted(tracker.windows) == [0, 1, 2]
+    assert tracker.top(1, 0, 300) == [('author0', 100)]
@@ -0,0 +1,60 @@
+import pytest
+from streamlit.testing.v1 import AppTest
+from v2.dataset.comment_dataset import CommentDataset, as_dataset
+from v2.output.counts.key_stats import get_key_stats
+
+
+@pytest.fixture
+def detoxify_records(make_records):
+    # O que a página do Detoxify guardava na sessão: dicts vindos de um DataFrame
+    records = make_records(120, authors=4, messages=('que jogo bom', 'QUE GOL lindo', 'QUE GOL lindo'), scored=True)
+    return as_dataset(records).to_pandas().to_dict(orient='records')
+
+
+def toxic_page():
+    from v2.app_pages.toxic.toxic_types import toxic_types_page
+    toxic_types_page()
+
+
+def sentiment_page():
+    from v2.app_pages.sentiment.sentiment_analysis import sentiment_analysis_page
+    sentiment_analysis_page()
+
+
+def scream_page():
+    from v2.app_pages.scream_index.scream_index import scream_index_page
+    scream_index_page()
+
+
+def search_page():
+    from v2.app_pages.search.search import search_page
+    search_page()
+
+
+def test_as_dataset_converts_lists_once(detoxify_records):
+    dataset = as_dataset(detoxify_records)
+    assert isinstance(dataset, CommentDataset)
+    assert as_dataset(dataset) is dataset
+    assert as_dataset(None) is None
+    assert len(dataset) == 120
+    assert dataset.authors.tolist() == ['author0', 'author1', 'author2', 'author3']
+
+
+def test_key_stats_from_list_session(detoxify_records):
+    stats = get_key_stats(as_dataset(detoxify_records))
+    assert stats['total_comments'] == 120
+    assert stats['total_authors'] == 4
+    assert stats['sentiments'] == {'NEG': 40, 'NEU': 40, 'POS': 40}
+    assert stats['toxic'] == 24
+
+
+@pytest.mark.parametrize('page', [toxic_page, sentiment_page, scream_page, search_page])
+def test_pages_run_on_list_session(page, detoxify_records, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'v2/output/wordclouds/images').mkdir(parents=True)
+
+    app = AppTest.from_function(page, default_timeout=60)
+    # Mesma conversão que o app.py faz antes de abrir qualquer página
+    app.session_state['comments_file'] = as_dataset(detoxify_records)
+    app.run()
+    assert not app.exception
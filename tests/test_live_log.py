@@ -0,0 +1,75 @@
+import json
+import os
+from v1.chat_log import read_chat_log
+from v2.dataset.comment_dataset import CommentDataset
+from v2.dataset.dataset_registry import get_dataset
+from v2.output.counts.heavy_hitters import get_author_tracker
+
+
+def append_comments(path, start, stop):
+    with open(path, 'a', encoding='utf-8') as log:
+        for i in range(start, stop):
+            record = {'id': str(i), 'author': f'author{i % 3}', 'time_elapsed': f'0:00:{i:02}', 'message': 'gol'}
+            log.write(json.dumps(record) + '\n')
+
+
+def test_growing_log_is_picked_up_on_the_next_call(tmp_path):
+    path = str(tmp_path / 'comments.jsonl')
+    append_comments(path, 0, 30)
+    first = get_dataset(path)
+    assert get_dataset(path) is first
+    assert dict(get_author_tracker(first).top()) == {'author0': 10, 'author1': 10, 'author2': 10}
+
+    append_comments(path, 30, 45)
+    # Garante uma versão nova mesmo em sistemas de arquivos com mtime grosseiro
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+    second = get_dataset(path)
+    assert second is not first
+    assert len(first) == 30 and len(second) == 45
+    assert dict(get_author_tracker(second).top()) == {'author0': 15, 'author1': 15, 'author2': 15}
+    # A sessão que ainda está na versão anterior continua vendo os totais dela
+    assert dict(get_author_tracker(first).top()) == {'author0': 10, 'author1': 10, 'author2': 10}
+
+
+def bump_mtime(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+
+def test_appended_lines_extend_the_dataset(tmp_path):
+    path = str(tmp_path / 'comments.jsonl')
+    append_comments(path, 0, 10)
+    first = get_dataset(path)
+
+    with open(path, 'a', encoding='utf-8') as log:
+        log.write(json.dumps({'id': '10', 'author': 'nova', 'time_elapsed': '0:00:10', 'message': ' ', 'sentiment': 'POS', 'badge': 'member'}) + '\n')
+        log.write('{"id": "11", "author": "author0"')  # Linha ainda sendo escrita
+    bump_mtime(path)
+    second = get_dataset(path)
+
+    assert len(second) == 11
+    assert second.authors.tolist() == ['author0', 'author1', 'author2', 'nova']
+    assert second.author_codes[:10].tolist() == first.author_codes.tolist()
+    assert second[10]['author'] == 'nova' and second[10]['sentiment'] == 'POS' and second[10]['badge'] == 'member'
+    assert 'badge' not in second[0]
+    assert not second.has_text[10]
+    assert not (tmp_path / '.cache').exists()
+
+    with open(path, 'a', encoding='utf-8') as log:
+        log.write(', "time_elapsed": "0:00:11", "message": "oi"}\n')
+    bump_mtime(path)
+    assert get_dataset(path).to_pandas().to_dict(orient='records') == \
+        CommentDataset.from_records(list(read_chat_log(path))).to_pandas().to_dict(orient='records')
+
+
+def test_truncated_log_is_parsed_again(tmp_path):
+    path = str(tmp_path / 'comments.jsonl')
+    append_comments(path, 0, 20)
+    assert len(get_dataset(path)) == 20
+
+    os.remove(path)
+    append_comments(path, 100, 105)
+    bump_mtime(path)
+    assert get_dataset(path).ids.tolist() == ['100', '101', '102', '103', '104']
@@ -0,0 +1,66 @@
+import asyncio
+from v1 import multi_stream
+from v1.dedup_index import RecentIdWindow, load_dedup_index
+from v1.http_client import HttpClient
+from v1.multi_stream import RateLimiter, StreamCollector
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.headers = {}
+
+
+def test_retries_wait_for_the_rate_limiter(monkeypatch):
+    async def main():
+        # Três tokens e reposição praticamente nula: cada tentativa gasta um
+        limiter = RateLimiter(0.001, burst=3)
+        loop = asyncio.get_running_loop()
+        client = HttpClient(backoff_base=0, before_request=lambda: limiter.wait(loop))
+        statuses = iter([503, 503, 200])
+        monkeypatch.setattr(client.session, 'get', lambda *args, **kwargs: FakeResponse(next(statuses)))
+
+        response = await asyncio.to_thread(client.get, 'http://localhost/youtube/v3/liveChat/messages')
+        client.close()
+        return response, limiter._tokens
+
+    response, tokens = asyncio.run(main())
+    assert response.status_code == 200
+    assert tokens < 1
+
+
+def test_failing_stream_is_restarted_without_stopping_the_others(tmp_path, monkeypatch):
+    monkeypatch.setattr(multi_stream, 'RESTART_DELAY', 0)
+    runs = []
+
+    class FlakyCollector(StreamCollector):
+        async def run(self):
+            runs.append(self.video_id)
+            if self.video_id == 'flaky' and runs.count('flaky') == 1:
+                raise RuntimeError('falha ao gravar')
+
+    collectors = [FlakyCollector(video_id, '', None, None, str(tmp_path)) for video_id in ('flaky', 'steady')]
+
+    async def main():
+        await asyncio.gather(*(collector.run_forever() for collector in collectors))
+
+    asyncio.run(main())
+    assert sorted(runs) == ['flaky', 'flaky', 'steady']
+
+
+def test_collector_uses_the_configured_dedup_mode(tmp_path, monkeypatch):
+    indexes = []
+
+    def load(*args):
+        indexes.append(load_dedup_index(*args))
+        raise RuntimeError('parar depois de carregar o índice')
+
+    monkeypatch.setattr(multi_stream, 'load_dedup_index', load)
+    collector = StreamCollector('video', '', None, None, str(tmp_path), dedup_mode='window', dedup_window=10)
+    try:
+        asyncio.run(collector.run())
+    except RuntimeError:
+        pass
+
+    assert isinstance(indexes[0], RecentIdWindow)
+    assert indexes[0].max_size == 10
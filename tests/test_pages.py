@@ -0,0 +1,33 @@
+from streamlit.testing.v1 import AppTest
+
+
+def sentiment_page():
+    from v2.app_pages.sentiment.sentiment_analysis import sentiment_analysis_page
+    sentiment_analysis_page()
+
+
+def test_sentiment_page_with_one_minute_window(make_dataset, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    app = AppTest.from_function(sentiment_page, default_timeout=60)
+    app.session_state['comments_file'] = make_dataset(n=300, scored=True)
+    app.run()
+    window = next(slider for slider in app.slider if slider.label == 'Window (minutes)')
+    window.set_value(1).run()
+    assert not app.exception
+    assert 'Window step (minutes)' not in [slider.label for slider in app.slider]
+
+
+def search_page():
+    from v2.app_pages.search.search import search_page
+    search_page()
+
+
+def test_search_page_with_a_single_timestamp(make_dataset, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    app = AppTest.from_function(search_page, default_timeout=60)
+    app.session_state['comments_file'] = make_dataset(n=3, elapsed=[42, 42, 42])
+    app.run()
+    assert not app.exception
+    app.text_input[0].input('gol').run()
+    assert not app.exception
+    assert any('**1** comments found' in markdown.value for markdown in app.markdown)
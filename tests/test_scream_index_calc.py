@@ -0,0 +1,22 @@
+import json
+import pytest
+from v1.chat_log import read_chat_log
+from v2.utils.scream_index_calc import add_scream_index_stream
+
+
+def test_stream_writes_a_separate_file(make_records, tmp_path):
+    input_path, output_path = tmp_path / 'comments.jsonl', tmp_path / 'scored.jsonl'
+    input_path.write_text(''.join(json.dumps(record) + '\n' for record in make_records(5)), encoding='utf-8')
+    original = input_path.read_bytes()
+
+    assert add_scream_index_stream(str(input_path), str(output_path), batch_size=2) == 5
+    assert input_path.read_bytes() == original
+    assert [record['scream_index'] for record in read_chat_log(str(output_path))] == pytest.approx([0.0, 3 / 13, 0.0, 3 / 13, 0.0])
+
+
+def test_stream_refuses_to_rewrite_its_input(tmp_path):
+    input_path = tmp_path / 'comments.jsonl'
+    input_path.write_text('{"id": "1", "message": "GOL"}\n', encoding='utf-8')
+    with pytest.raises(ValueError):
+        add_scream_index_stream(str(input_path), str(tmp_path / '.' / 'comments.jsonl'))
+    assert input_path.read_text(encoding='utf-8') == '{"id": "1", "message": "GOL"}\n'
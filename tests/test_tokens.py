@@ -0,0 +1,32 @@
+import numpy as np
+from v2.dataset.tokens import tokenize_rows
+from v2.output.counts.distinct_counts import DistinctWords
+
+
+MESSAGES = ['Que GOL :smile:', '', 'gol de placa', 'vai\x01time', 'GOL']
+
+
+def test_tail_matches_the_full_tokens(make_dataset):
+    dataset = make_dataset(messages=MESSAGES, authors=1)
+    rows, ids, vocabulary = tokenize_rows(dataset)
+    tail_rows, tail_ids, tail_vocabulary = tokenize_rows(dataset, 2)
+
+    assert vocabulary.tolist() == ['que', 'gol', 'de', 'placa', 'vai\x01time']
+    assert tail_vocabulary.tolist() == ['gol', 'de', 'placa', 'vai\x01time']
+    assert tail_rows.tolist() == rows[rows >= 2].tolist() == [2, 2, 2, 3, 4]
+    assert tail_vocabulary[tail_ids].tolist() == vocabulary[ids[rows >= 2]].tolist()
+
+
+def test_distinct_words_continue_with_the_tail(make_dataset):
+    dataset = make_dataset(messages=MESSAGES, authors=1)
+    tracker = DistinctWords(window=2)
+    tracker.update(make_dataset(messages=MESSAGES[:2], authors=1), 0)
+    tracker.update(dataset, 2)
+
+    assert tracker.count() == 5
+    assert tracker.count(2, 4) == 4
+    assert tracker.count(100, 200) == 0
+
+    whole = DistinctWords(window=2)
+    whole.update(dataset)
+    assert np.array_equal(tracker.counter().hashes, whole.counter().hashes)
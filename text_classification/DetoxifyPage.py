@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 from detoxify import Detoxify
 from tqdm import tqdm
+from v2.dataset.comment_dataset import CommentDataset
 tqdm.pandas()
 
 @st.cache_resource
@@ -22,7 +23,7 @@ def detoxify_page():
         return
 
     #file_name = st.selectbox('Uploaded archives', st.session_state.comments_file.keys())
-    dfComentarios = pd.DataFrame(st.session_state['comments_file'])
+    dfComentarios = st.session_state['comments_file'].to_pandas() if isinstance(st.session_state['comments_file'], CommentDataset) else pd.DataFrame(st.session_state['comments_file'])
 
     # Remove colunas de toxicidade se já existirem
     cols_to_drop = ['toxicity', 'severe_toxicity', 'obscene', 'identity_attack',
@@ -40,7 +41,10 @@ def detoxify_page():
             st.success("Analysis finished!")
 
         json_resultado = dfFinal.to_json(orient="records", force_ascii=False, indent=2)
-        st.session_state['comments_file'] = dfFinal.to_dict(orient="records")
+        # As outras páginas leem as colunas do dataset, não uma lista de dicts
+        # O resultado classificado substitui o arquivo de entrada, que deixa de ser relido a cada rerun
+        st.session_state['comments_source'] = None
+        st.session_state['comments_file'] = CommentDataset.from_records(dfFinal.to_dict(orient="records"))
         
         st.download_button(
             label="Download result as JSON",
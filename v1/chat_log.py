@@ -0,0 +1,180 @@
+import json
+import os
+import sys
+import time
+
+# Log de comentários em JSONL (um objeto JSON por linha), apenas com append.
+# Cada poll escreve só os registros novos, então o custo por poll não cresce
+# com a duração da live. O dashboard (app.py) espera um array JSON, gerado
+# pelo passo de compactação (compact_chat_log).
+
+FSYNC_EVERY = 500  # Quantidade de registros entre fsyncs
+FSYNC_INTERVAL = 5.0  # Tempo máximo em segundos entre fsyncs
+
+
+class ChatLogWriter:
+    """Escreve comentários no final de um log JSONL, com fsync em lotes"""
+
+    def __init__(self, path, fsync_every=FSYNC_EVERY, fsync_interval=FSYNC_INTERVAL):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        repair_chat_log(path)
+        self._file = open(path, 'ab')
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def append(self, records):
+        """Escreve os registros no log e retorna a quantidade de bytes escritos"""
+
+        if not records:
+            return 0
+
+        data = ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records).encode('utf-8')
+        self._file.write(data)
+        self._file.flush()
+
+        self._pending += len(records)
+        if self._pending >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.sync()
+
+        return len(data)
+
+    def sync(self):
+        """Força a gravação em disco dos registros pendentes"""
+
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def tell(self):
+        """Tamanho atual do log em bytes (offset do próximo registro)"""
+
+        return self._file.tell()
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.sync()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def repair_chat_log(path):
+    """Remove uma última linha incompleta (escrita interrompida por um crash)"""
+
+    try:
+        size = os.path.getsize(path)
+    except FileNotFoundError:
+        return
+
+    if size == 0:
+        return
+
+    with open(path, 'rb+') as f:
+        f.seek(size - 1)
+        if f.read(1) == b'\n':
+            return
+
+        # Procura a última quebra de linha de trás para frente, em blocos
+        end = size
+        while end > 0:
+            start = max(0, end - 65536)
+            f.seek(start)
+            chunk = f.read(end - start)
+            pos = chunk.rfind(b'\n')
+            if pos != -1:
+                f.truncate(start + pos + 1)
+                return
+            end = start
+        f.truncate(0)
+
+
+def read_chat_log(path, offset=0):
+    """Lê os registros do log a partir de um offset, ignorando linhas incompletas ou corrompidas"""
+
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        return
+
+    with f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b'\n'):
+                break  # Registro ainda sendo escrito
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def read_chat_log_tail(path, offset=0):
+    """Lê os registros completos a partir de um offset e retorna também o offset logo depois do último"""
+
+    records = []
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        return records, offset
+
+    with f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b'\n'):
+                break  # Registro ainda sendo escrito: fica para a próxima leitura
+            offset += len(line)
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return records, offset
+
+
+def compact_chat_log(log_path, json_path, indent=4):
+    """Converte o log JSONL no array JSON esperado pelo dashboard, removendo IDs duplicados"""
+
+    seen_ids = set()
+    count = 0
+    tmp_path = f'{json_path}.tmp'
+    pad = ' ' * indent
+
+    with open(tmp_path, 'w', encoding='utf-8') as out:
+        out.write('[')
+        for record in read_chat_log(log_path):
+            comment_id = record.get('id')
+            if comment_id is not None:
+                if comment_id in seen_ids:
+                    continue
+                seen_ids.add(comment_id)
+
+            text = json.dumps(record, ensure_ascii=False, indent=indent)
+            out.write(',\n' if count else '\n')
+            out.write('\n'.join(pad + line for line in text.split('\n')))
+            count += 1
+        out.write('\n]' if count else ']')
+        out.flush()
+        os.fsync(out.fileno())
+
+    # Substitui o arquivo de forma atômica para o dashboard nunca ler um JSON pela metade
+    os.replace(tmp_path, json_path)
+    return count
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python -m v1.chat_log <comments.jsonl> <comments.json>")
+        sys.exit(1)
+    total = compact_chat_log(sys.argv[1], sys.argv[2])
+    print(f"{total} comentários salvos em: {sys.argv[2]}")
@@ -0,0 +1,145 @@
+import os
+import time
+from v1.http_client import HttpClient, response_json
+from v1.timestamps import parse_rfc3339_ms, format_elapsed
+
+API_URL = os.getenv('YOUTUBE_API_URL', 'https://www.googleapis.com/youtube/v3')
+MAX_RESULTS = 2000  # Máximo de mensagens por página aceito pela API
+MIN_DELAY = 1.0  # Menor espera entre polls quando o servidor não sugere intervalo
+MAX_DELAY = 20.0  # Maior espera entre polls, mesmo com o chat parado
+MAX_DRAIN_PAGES = 20  # Páginas seguidas buscadas sem espera durante um pico
+FILL_TARGET = 0.5  # Fração da página que se espera acumular entre dois polls
+RATE_SMOOTHING = 0.3  # Peso da última medição na média móvel da taxa de mensagens
+
+
+class ChatPoller:
+    """Busca mensagens do chat ao vivo de forma incremental, usando o cursor da API"""
+
+    def __init__(self, live_chat_id, api_key, client=None, max_results=MAX_RESULTS, min_delay=MIN_DELAY, max_delay=MAX_DELAY, max_drain_pages=MAX_DRAIN_PAGES):
+        self.live_chat_id = live_chat_id
+        self.api_key = api_key
+        self.client = client or HttpClient()
+        self.max_results = max_results
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.max_drain_pages = max_drain_pages
+
+        self.page_token = None  # Cursor: a próxima página começa depois da última mensagem recebida
+        self.server_interval = None  # Intervalo sugerido pelo servidor (pollingIntervalMillis), em segundos
+        self.rate = None  # Mensagens por segundo observadas
+        self.backlog = False
+        self._drained_pages = 0
+        self._last_poll = None
+        self._pending_count = 0
+        self.status = None  # Status HTTP da última resposta
+        self.chat_ended = False
+
+    def poll(self):
+        """Busca a próxima página do chat e retorna os itens recebidos"""
+
+        params = {
+            "liveChatId": self.live_chat_id,
+            "part": "snippet,authorDetails",
+            "maxResults": self.max_results,
+            "key": self.api_key
+        }
+        if self.page_token:
+            params["pageToken"] = self.page_token
+
+        response = self.client.get(f"{API_URL}/liveChat/messages", params=params)
+        data = response_json(response)
+
+        self.status = response.status_code
+        if response.status_code != 200:
+            # liveChatEnded vem como 403; chat removido ou ID inválido como 404
+            reasons = [error.get("reason") for error in data.get("error", {}).get("errors", [])]
+            self.chat_ended = "liveChatEnded" in reasons
+            self.backlog = False
+            return []
+
+        # offlineAt aparece quando o chat foi encerrado
+        self.chat_ended = "offlineAt" in data
+
+        items = data.get("items", [])
+        self.page_token = data.get("nextPageToken", self.page_token)
+        if "pollingIntervalMillis" in data:
+            self.server_interval = data["pollingIntervalMillis"] / 1000
+
+        # Página cheia indica que ainda há mensagens acumuladas no servidor
+        self.backlog = len(items) >= self.max_results
+        self._drained_pages = self._drained_pages + 1 if self.backlog else 0
+
+        self._pending_count += len(items)
+        if not self.backlog:
+            self._update_rate()
+
+        return items
+
+    def needs_refresh(self):
+        """Indica se os detalhes da live em cache devem ser consultados de novo"""
+
+        return self.chat_ended or self.status in (403, 404)
+
+    def _update_rate(self):
+        # As páginas de um mesmo pico contam como uma única medição
+        now = time.monotonic()
+        if self._last_poll is not None:
+            elapsed = now - self._last_poll
+            if elapsed > 0:
+                rate = self._pending_count / elapsed
+                self.rate = rate if self.rate is None else self.rate + RATE_SMOOTHING * (rate - self.rate)
+        self._last_poll = now
+        self._pending_count = 0
+
+    def next_delay(self):
+        """Tempo de espera até o próximo poll, em segundos"""
+
+        floor = self.server_interval if self.server_interval is not None else self.min_delay
+
+        # Durante um pico, esvazia as páginas acumuladas sem esperar, com uma pausa curta a cada MAX_DRAIN_PAGES
+        if self.backlog:
+            if self._drained_pages < self.max_drain_pages:
+                return 0.0
+            self._drained_pages = 0
+            return max(floor, self.min_delay)
+
+        # Espera o tempo estimado para acumular FILL_TARGET de uma página na taxa atual
+        if self.rate is None:
+            target = floor
+        elif self.rate > 0:
+            target = self.max_results * FILL_TARGET / self.rate
+        else:
+            target = self.max_delay
+
+        return min(max(floor, target), max(floor, self.max_delay))
+
+
+def parse_chat_items(items, live_start_time_utc):
+    comments_list = []
+    live_start_ms = round(live_start_time_utc.timestamp() * 1000)
+    for item in items:
+        comment_id = item.get("id")
+        author = item["authorDetails"]["displayName"]
+        try:
+            message = item["snippet"]["displayMessage"]
+        except:
+            message = ""
+        timestamp = item["snippet"].get("publishedAt")
+
+        if not timestamp or not comment_id:
+            continue # Ignora comentários sem timestamp ou ID - Podia dar problema sem
+
+        # Guarda os horários como inteiros; o tempo decorrido é truncado no segundo
+        published_ms = parse_rfc3339_ms(timestamp)
+        elapsed_s = (published_ms - live_start_ms) // 1000
+
+        comment_entry = {
+            "id": comment_id,
+            "time_elapsed": format_elapsed(elapsed_s),
+            "elapsed_s": elapsed_s,
+            "published_ms": published_ms,
+            "author": author,
+            "message": message
+        }
+        comments_list.append(comment_entry)
+    return comments_list
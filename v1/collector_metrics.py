@@ -0,0 +1,200 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from urllib.parse import urlparse
+from v1.timestamps import comment_elapsed_seconds
+
+# Métricas dos coletores: mensagens/s, atraso (publishedAt até a gravação),
+# proporção de duplicatas, latência das requisições, cota gasta e bytes
+# gravados. São gravadas periodicamente em <path>.json e <path>.prom (formato
+# texto do Prometheus), que um scraper local pode ler.
+
+METRICS_PATH = 'collector_metrics'  # Gera collector_metrics.json e collector_metrics.prom
+FLUSH_INTERVAL = 10  # Segundos entre gravações das métricas
+RATE_WINDOW = 60  # Janela em segundos usada no cálculo de mensagens/s
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+LAG_BUCKETS = (1, 2, 5, 10, 20, 30, 60, 120, 300, 600)
+
+# Custo aproximado de cada chamada em unidades de cota da YouTube Data API
+QUOTA_COSTS = {
+    'liveChat/messages': 5,
+    'videos': 1,
+    'commentThreads': 1,
+    'comments': 1
+}
+
+
+class Histogram:
+    """Histograma com limites fixos, no formato cumulativo do Prometheus"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # O último é o +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        result = []
+        for bound, count in zip(list(self.buckets) + ['+Inf'], self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def to_dict(self):
+        return {
+            'buckets': {str(bound): count for bound, count in self.cumulative()},
+            'sum': self.sum,
+            'count': self.count
+        }
+
+
+class StreamMetrics:
+    def __init__(self):
+        self.received = 0
+        self.messages = 0
+        self.duplicates = 0
+        self.bytes_written = 0
+        self.lag = Histogram(LAG_BUCKETS)
+        self._recent = deque()  # (instante, mensagens gravadas)
+
+    def messages_per_second(self, now):
+        while self._recent and now - self._recent[0][0] > RATE_WINDOW:
+            self._recent.popleft()
+        return sum(count for _, count in self._recent) / RATE_WINDOW
+
+    def to_dict(self, now):
+        return {
+            'messages_total': self.messages,
+            'duplicates_total': self.duplicates,
+            'duplicate_ratio': self.duplicates / self.received if self.received else 0.0,
+            'messages_per_second': self.messages_per_second(now),
+            'bytes_written_total': self.bytes_written,
+            'lag_seconds': self.lag.to_dict()
+        }
+
+
+class CollectorMetrics:
+    """Métricas de um processo coletor, separadas por live (stream)"""
+
+    def __init__(self, path=METRICS_PATH, flush_interval=FLUSH_INTERVAL):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.streams = {}
+        self.requests = {}  # (endpoint, status) -> quantidade
+        self.request_latency = {}  # endpoint -> Histogram
+        self.quota_units = 0
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def _stream(self, stream):
+        if stream not in self.streams:
+            self.streams[stream] = StreamMetrics()
+        return self.streams[stream]
+
+    def on_request(self, url, status, latency):
+        """Callback para o HttpClient; pode ser chamado de várias threads"""
+
+        endpoint = urlparse(url).path.rsplit('/youtube/v3/', 1)[-1]
+        with self._lock:
+            key = (endpoint, status if status is not None else 'error')
+            self.requests[key] = self.requests.get(key, 0) + 1
+            if endpoint not in self.request_latency:
+                self.request_latency[endpoint] = Histogram(LATENCY_BUCKETS)
+            self.request_latency[endpoint].observe(latency)
+            if status is not None:
+                self.quota_units += QUOTA_COSTS.get(endpoint, 1)
+
+    def observe_batch(self, stream, received, new_comments, bytes_written, live_start_time_utc=None):
+        """Registra um lote gravado: recebidos, novos (após a deduplicação) e bytes escritos"""
+
+        now = time.time()
+        with self._lock:
+            metrics = self._stream(stream)
+            metrics.received += received
+            metrics.messages += len(new_comments)
+            metrics.duplicates += received - len(new_comments)
+            metrics.bytes_written += bytes_written
+            metrics._recent.append((time.monotonic(), len(new_comments)))
+
+            for comment in new_comments:
+                if 'published_ms' in comment:
+                    published = comment['published_ms'] / 1000
+                elif live_start_time_utc is not None:
+                    published = live_start_time_utc.timestamp() + comment_elapsed_seconds(comment)
+                else:
+                    continue
+                metrics.lag.observe(max(0.0, now - published))
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self._lock:
+            return {
+                'timestamp': time.time(),
+                'quota_units_total': self.quota_units,
+                'requests_total': [
+                    {'endpoint': endpoint, 'status': status, 'count': count}
+                    for (endpoint, status), count in self.requests.items()
+                ],
+                'request_latency_seconds': {endpoint: histogram.to_dict() for endpoint, histogram in self.request_latency.items()},
+                'streams': {stream: metrics.to_dict(now) for stream, metrics in self.streams.items()}
+            }
+
+    def to_prometheus(self):
+        now = time.monotonic()
+        lines = []
+
+        def histogram_lines(name, labels, histogram):
+            for bound, count in histogram.cumulative():
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'{name}_sum{{{labels}}} {histogram.sum}')
+            lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+
+        with self._lock:
+            lines.append('# TYPE streamvis_collector_quota_units_total counter')
+            lines.append(f'streamvis_collector_quota_units_total {self.quota_units}')
+
+            lines.append('# TYPE streamvis_collector_requests_total counter')
+            for (endpoint, status), count in self.requests.items():
+                lines.append(f'streamvis_collector_requests_total{{endpoint="{endpoint}",status="{status}"}} {count}')
+
+            lines.append('# TYPE streamvis_collector_request_latency_seconds histogram')
+            for endpoint, histogram in self.request_latency.items():
+                histogram_lines('streamvis_collector_request_latency_seconds', f'endpoint="{endpoint}"', histogram)
+
+            for name, kind in (('messages_total', 'counter'), ('duplicates_total', 'counter'), ('bytes_written_total', 'counter'), ('messages_per_second', 'gauge'), ('duplicate_ratio', 'gauge')):
+                lines.append(f'# TYPE streamvis_collector_{name} {kind}')
+                for stream, metrics in self.streams.items():
+                    lines.append(f'streamvis_collector_{name}{{stream="{stream}"}} {metrics.to_dict(now)[name]}')
+
+            lines.append('# TYPE streamvis_collector_lag_seconds histogram')
+            for stream, metrics in self.streams.items():
+                histogram_lines('streamvis_collector_lag_seconds', f'stream="{stream}"', metrics.lag)
+
+        return '\n'.join(lines) + '\n'
+
+    def flush(self):
+        """Grava os arquivos de métricas de forma atômica"""
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        for extension, content in (('json', json.dumps(self.snapshot(), indent=2)), ('prom', self.to_prometheus())):
+            tmp_path = f'{self.path}.{extension}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(tmp_path, f'{self.path}.{extension}')
+        self._last_flush = time.monotonic()
+
+    def maybe_flush(self):
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
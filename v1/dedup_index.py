@@ -0,0 +1,182 @@
+import hashlib
+import math
+import os
+import sqlite3
+from collections import deque
+from v1.chat_log import ChatLogWriter, read_chat_log
+
+# Índices de deduplicação de IDs de mensagens, mantidos durante toda a coleta.
+# O custo de cada poll depende só do tamanho do lote, não da duração da live.
+# Um journal JSONL em disco recebe, a cada gravação, só os IDs vistos desde a
+# anterior e o offset do log até onde o índice está atualizado; ao reiniciar,
+# o índice é refeito com os IDs do journal e só a parte do log depois desse
+# offset é relida.
+
+RECENT_WINDOW = 50000  # IDs recentes mantidos de forma exata nos modos limitados
+
+
+class DedupIndex:
+    """Conjunto exato com todos os IDs já vistos"""
+
+    def __init__(self):
+        self._ids = set()
+        self._unsaved = []  # IDs adicionados depois da última gravação do journal
+        self._saved_offset = 0
+
+    def __contains__(self, comment_id):
+        return comment_id in self._ids
+
+    def __len__(self):
+        return len(self._ids)
+
+    def add(self, comment_id):
+        self._remember(comment_id)
+        self._unsaved.append(comment_id)
+
+    def _remember(self, comment_id):
+        self._ids.add(comment_id)
+
+    def filter_new(self, comments):
+        """Retorna apenas os comentários com IDs ainda não vistos e os registra no índice"""
+
+        new_comments = []
+        for comment in comments:
+            comment_id = comment.get('id')
+            if comment_id is None or comment_id in self:
+                continue
+            self.add(comment_id)
+            new_comments.append(comment)
+        return new_comments
+
+    def save(self, path, log_offset):
+        """Acrescenta ao journal os IDs novos desde a última gravação, válidos para o log até log_offset"""
+
+        if not self._unsaved and log_offset == self._saved_offset:
+            return
+        # Uma linha interrompida por um crash é descartada ao abrir o journal de novo
+        with ChatLogWriter(path) as journal:
+            journal.append([{'log_offset': log_offset, 'ids': self._unsaved}])
+        self._unsaved = []
+        self._saved_offset = log_offset
+
+    def close(self):
+        pass
+
+
+class RecentIdWindow(DedupIndex):
+    """Janela com os últimos max_size IDs, com memória limitada"""
+
+    def __init__(self, max_size=RECENT_WINDOW):
+        super().__init__()
+        self.max_size = max_size
+        self._order = deque()
+
+    def _remember(self, comment_id):
+        self._ids.add(comment_id)
+        self._order.append(comment_id)
+        if len(self._order) > self.max_size:
+            self._ids.discard(self._order.popleft())
+
+
+class BloomDedupIndex(DedupIndex):
+    """
+    Filtro de Bloom para todos os IDs, com uma janela exata dos IDs recentes
+    e um conjunto exato em disco (SQLite) com todos os IDs.
+
+    Um ID que o filtro nunca viu é novo com certeza. Se o filtro acusa o ID,
+    a janela recente responde de forma exata; fora dela a resposta vem do
+    conjunto em disco. Só os falsos positivos do filtro (cerca de error_rate
+    dos IDs novos) e as duplicatas antigas chegam ao disco, e a memória fica
+    limitada ao filtro, à janela e ao cache de páginas do SQLite.
+
+    O conjunto em disco é refeito a cada carga a partir do journal e do log,
+    por isso não precisa de durabilidade própria. Sem path ele fica em memória.
+    """
+
+    def __init__(self, capacity=1000000, error_rate=0.001, window=RECENT_WINDOW, path=None):
+        super().__init__()
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._recent = RecentIdWindow(window)
+        self._count = 0
+
+        # Usado por uma coleta de cada vez, mas de threads diferentes no multi_stream
+        self._store = sqlite3.connect(path or ':memory:', check_same_thread=False)
+        self._store.execute('PRAGMA journal_mode = OFF')
+        self._store.execute('PRAGMA synchronous = OFF')
+        self._store.execute('CREATE TABLE IF NOT EXISTS ids (id TEXT PRIMARY KEY) WITHOUT ROWID')
+        self._store.execute('DELETE FROM ids')
+
+    def _positions(self, comment_id):
+        digest = hashlib.blake2b(comment_id.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def _maybe_seen(self, comment_id):
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(comment_id))
+
+    def __contains__(self, comment_id):
+        if not self._maybe_seen(comment_id):
+            return False
+        if comment_id in self._recent:
+            return True
+        # Fora da janela: falso positivo do filtro ou duplicata antiga, decidido de forma exata
+        return self._store.execute('SELECT 1 FROM ids WHERE id = ?', (comment_id,)).fetchone() is not None
+
+    def __len__(self):
+        return self._count
+
+    def _remember(self, comment_id):
+        for pos in self._positions(comment_id):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self._recent._remember(comment_id)
+        self._store.execute('INSERT OR IGNORE INTO ids VALUES (?)', (comment_id,))
+        self._count += 1
+
+    def save(self, path, log_offset):
+        super().save(path, log_offset)
+        self._store.commit()
+
+    def close(self):
+        self._store.close()
+
+
+def create_dedup_index(mode='exact', store_path=None, window=RECENT_WINDOW):
+    if mode == 'exact':
+        return DedupIndex()
+    if mode == 'window':
+        return RecentIdWindow(window)
+    if mode == 'bloom':
+        return BloomDedupIndex(window=window, path=store_path)
+    raise ValueError(f"Modo de deduplicação não suportado: {mode}")
+
+
+def load_dedup_index(journal_path, log_path, mode='exact', window=RECENT_WINDOW):
+    """Recupera o índice do journal e completa com os registros do log escritos depois dele"""
+
+    # O conjunto em disco do modo bloom fica ao lado do journal (comments.dedup.sqlite)
+    index = create_dedup_index(mode, f'{os.path.splitext(journal_path)[0]}.sqlite', window)
+    entries = [entry for entry in read_chat_log(journal_path)
+               if isinstance(entry, dict) and 'log_offset' in entry and 'ids' in entry]
+
+    log_size = os.path.getsize(log_path) if os.path.exists(log_path) else 0
+    if entries and entries[-1]['log_offset'] > log_size:
+        # Journal de um log que foi substituído: reconstrói do zero a partir do log
+        os.remove(journal_path)
+        entries = []
+
+    # O journal vale para qualquer modo: os IDs são adicionados de novo, na ordem em que foram vistos
+    for entry in entries:
+        for comment_id in entry['ids']:
+            index._remember(comment_id)
+    log_offset = entries[-1]['log_offset'] if entries else 0
+    index._saved_offset = log_offset
+
+    for comment in read_chat_log(log_path, offset=log_offset):
+        comment_id = comment.get('id')
+        if comment_id is not None and comment_id not in index:
+            index.add(comment_id)
+
+    return index
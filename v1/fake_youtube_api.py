@@ -0,0 +1,132 @@
+import argparse
+import json
+import random
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from v1.replay import ChatReplay, load_recorded_chat
+
+# Servidor local que imita os endpoints da YouTube Data API usados pelo coletor
+# (videos e liveChat/messages), reproduzindo um chat gravado em comments.json
+# ou comments.jsonl. Com --speed a gravação é reproduzida N vezes mais rápido,
+# o que permite testar o coletor em picos de mensagens sem uma live real.
+#
+#   python -m v1.fake_youtube_api comments.json --speed 20 --port 8080
+#   YOUTUBE_API_URL=http://localhost:8080/youtube/v3 python -m v1.main
+
+LIVE_CHAT_ID = 'fake-live-chat'
+
+
+class FakeYouTubeApi:
+    """Endpoints falsos servindo as mensagens já 'publicadas' pela reprodução"""
+
+    def __init__(self, messages, speed=1.0, polling_interval_ms=2000, video_id='fake-video', error_rate=0.0):
+        self.replay = ChatReplay(messages, speed)
+        self.messages = messages
+        self.polling_interval_ms = polling_interval_ms
+        self.error_rate = error_rate  # Fração das respostas trocadas por um 503, para testar as retentativas
+        self.video_id = video_id
+        self.live_start = datetime.now(timezone.utc).replace(microsecond=0)
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def available(self):
+        return self.replay.available()
+
+    def videos(self, query):
+        return {
+            'items': [{
+                'id': self.video_id,
+                'liveStreamingDetails': {
+                    'actualStartTime': self.live_start.isoformat().replace('+00:00', 'Z'),
+                    'activeLiveChatId': LIVE_CHAT_ID
+                }
+            }]
+        }
+
+    def chat_messages(self, query):
+        start = int(query.get('pageToken', ['0'])[0] or 0)
+        max_results = int(query.get('maxResults', ['500'])[0])
+        end = min(self.available(), start + max_results)
+
+        items = []
+        for message in self.messages[start:end]:
+            published = self.live_start + timedelta(seconds=message['elapsed_s'])
+            items.append({
+                'id': message['id'],
+                'snippet': {
+                    'publishedAt': published.isoformat().replace('+00:00', 'Z'),
+                    'displayMessage': message.get('message', '')
+                },
+                'authorDetails': {'displayName': message.get('author', '')}
+            })
+
+        # Com mensagens acumuladas o servidor pede o próximo poll imediatamente
+        backlog = self.available() > end
+        return {
+            'items': items,
+            'nextPageToken': str(max(start, end)),
+            'pollingIntervalMillis': 0 if backlog else self.polling_interval_ms
+        }
+
+
+def make_handler(api):
+    routes = {
+        '/youtube/v3/videos': api.videos,
+        '/youtube/v3/liveChat/messages': api.chat_messages
+    }
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            route = routes.get(url.path)
+            if route is None:
+                self._send(404, {'error': {'code': 404, 'message': 'Not Found'}})
+                return
+            with api._lock:
+                api.requests += 1
+            if random.random() < api.error_rate:
+                self._send(503, {'error': {'code': 503, 'message': 'Backend Error'}})
+                return
+            self._send(200, route(parse_qs(url.query)))
+
+        def _send(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(api, host='127.0.0.1', port=8080):
+    """Cria o servidor (ainda sem iniciar o loop) para a reprodução dada"""
+
+    return ThreadingHTTPServer((host, port), make_handler(api))
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description='Fake YouTube API replaying a recorded live chat')
+    arg_parser.add_argument('comments', help='comments.json or comments.jsonl to replay')
+    arg_parser.add_argument('--speed', type=float, default=1.0, help='replay speed multiplier')
+    arg_parser.add_argument('--polling-interval', type=int, default=2000, help='pollingIntervalMillis returned to the client')
+    arg_parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered with 503')
+    arg_parser.add_argument('--host', default='127.0.0.1')
+    arg_parser.add_argument('--port', type=int, default=8080)
+    args = arg_parser.parse_args()
+
+    api = FakeYouTubeApi(load_recorded_chat(args.comments), speed=args.speed, polling_interval_ms=args.polling_interval, error_rate=args.error_rate)
+    server = serve(api, args.host, args.port)
+    print(f"Reproduzindo {len(api.messages)} mensagens em http://{args.host}:{args.port}/youtube/v3 ({args.speed}x)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
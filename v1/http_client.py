@@ -0,0 +1,90 @@
+import random
+import time
+from collections import deque
+import requests
+from requests.adapters import HTTPAdapter
+
+POOL_SIZE = 10  # Conexões keep-alive mantidas por host
+CONNECT_TIMEOUT = 5  # Segundos para abrir a conexão
+READ_TIMEOUT = 30  # Segundos esperando a resposta
+MAX_RETRIES = 4  # Retentativas depois da primeira tentativa
+BACKOFF_BASE = 0.5  # Espera base do backoff exponencial, em segundos
+BACKOFF_MAX = 30  # Espera máxima entre tentativas, em segundos
+RETRY_STATUS = {429, 500, 502, 503, 504}  # Status considerados transitórios
+LATENCY_SAMPLES = 1000  # Latências recentes guardadas em memória
+
+
+class HttpClient:
+    """
+    Sessão HTTP compartilhada pelos coletores.
+
+    Reaproveita conexões keep-alive (sem um handshake TCP+TLS por chamada),
+    aplica timeouts e tenta de novo erros transitórios (timeout, conexão,
+    429 e 5xx) com backoff exponencial e jitter. A latência de cada tentativa
+    é guardada em latencies e repassada para o callback on_request; o callback
+    before_request, se houver, é chamado antes de cada tentativa (ex.: para
+    esperar um limite de requisições por segundo).
+    """
+
+    def __init__(self, pool_size=POOL_SIZE, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT, max_retries=MAX_RETRIES, backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX, on_request=None, before_request=None):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.on_request = on_request  # Chamado como on_request(url, status, latency); status None em falhas de rede
+        self.before_request = before_request  # Chamado sem argumentos antes de cada tentativa, retentativas incluídas
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def get(self, url, params=None):
+        """GET com retentativas; levanta requests.RequestException se todas falharem"""
+
+        for attempt in range(self.max_retries + 1):
+            if self.before_request is not None:
+                self.before_request()
+            start = time.monotonic()
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                self._record(url, None, time.monotonic() - start)
+                if attempt == self.max_retries:
+                    raise
+                retry_after = None
+            else:
+                self._record(url, response.status_code, time.monotonic() - start)
+                if response.status_code not in RETRY_STATUS or attempt == self.max_retries:
+                    return response
+                retry_after = response.headers.get('Retry-After')
+
+            time.sleep(self._backoff(attempt, retry_after))
+
+    def _backoff(self, attempt, retry_after=None):
+        # Respeita o Retry-After do servidor quando vier em segundos
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        # Full jitter: espera aleatória até o limite exponencial da tentativa
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _record(self, url, status, latency):
+        self.latencies.append(latency)
+        if self.on_request is not None:
+            self.on_request(url, status, latency)
+
+    def close(self):
+        self.session.close()
+
+
+def response_json(response):
+    """Corpo JSON da resposta, ou um dicionário vazio se não for JSON (ex.: página de erro 5xx)"""
+
+    try:
+        return response.json()
+    except ValueError:
+        return {}
@@ -0,0 +1,62 @@
+import time
+from dateutil import parser
+from v1.chat_poller import API_URL
+from v1.http_client import HttpClient, response_json
+
+METADATA_TTL = 3600  # Segundos até reconsultar os detalhes da live mesmo sem erros
+
+
+def fetch_live_details(video_id, api_key, client):
+    params = {"part": "liveStreamingDetails", "id": video_id, "key": api_key}
+    response = client.get(f"{API_URL}/videos", params=params)
+    data = response_json(response)
+
+    if "items" in data and len(data["items"]) > 0:
+        live_details = data["items"][0]["liveStreamingDetails"]
+        if "actualStartTime" in live_details:
+            live_start_time = live_details["actualStartTime"]
+            return live_details.get("activeLiveChatId"), parser.isoparse(live_start_time)
+    return None, None
+
+
+class LiveMetadataCache:
+    """
+    Guarda o activeLiveChatId e o actualStartTime da live, que não mudam durante a transmissão.
+
+    Os detalhes são consultados de novo apenas quando invalidados (403/404 ou fim
+    do chat detectados pelo ChatPoller) ou depois de METADATA_TTL segundos.
+    Falhas não são guardadas: a próxima chamada tenta de novo.
+    """
+
+    def __init__(self, video_id, api_key, client=None, ttl=METADATA_TTL):
+        self.video_id = video_id
+        self.api_key = api_key
+        self.client = client or HttpClient()
+        self.ttl = ttl
+        self.refreshes = 0
+        self._details = None
+        self._fetched_at = None
+
+    def is_stale(self):
+        """Indica se a próxima chamada a get vai consultar a API"""
+
+        return self._details is None or time.monotonic() - self._fetched_at >= self.ttl
+
+    def get(self):
+        """Retorna (live_chat_id, live_start_time_utc), consultando a API só se necessário"""
+
+        if self.is_stale():
+            self.refresh()
+        return self._details or (None, None)
+
+    def refresh(self):
+        live_chat_id, live_start_time_utc = fetch_live_details(self.video_id, self.api_key, self.client)
+        self.refreshes += 1
+        if live_chat_id and live_start_time_utc:
+            self._details = (live_chat_id, live_start_time_utc)
+            self._fetched_at = time.monotonic()
+        else:
+            self._details = None
+
+    def invalidate(self):
+        self._details = None
@@ -1,65 +1,33 @@
 import requests
-from dateutil import parser
 from dotenv import load_dotenv
 import json
 import time
 import os
+from v1.chat_log import ChatLogWriter, compact_chat_log
+from v1.dedup_index import RECENT_WINDOW, load_dedup_index
+from v1.chat_poller import ChatPoller, parse_chat_items
+from v1.live_metadata import LiveMetadataCache
+from v1.http_client import HttpClient
+from v1.collector_metrics import CollectorMetrics
 
 load_dotenv()
 API_KEY = os.getenv('GOOGLE_API_KEY')
 VIDEO_ID = os.getenv('VIDEO_ID')
-WAIT_TIME = 20  # Tempo de espera em segundos
+WAIT_TIME = 20  # Tempo de espera em segundos quando a live não está disponível
+LOG_FILE = 'comments.jsonl'  # Log append-only usado durante a coleta
+OUTPUT_FILE = 'comments.json'  # Array JSON lido pelo dashboard
+DEDUP_JOURNAL_FILE = 'comments.dedup.jsonl'  # Journal append-only do índice de IDs já coletados
+DEDUP_MODE = os.getenv('DEDUP_MODE', 'exact')  # 'exact', 'window' (IDs recentes) ou 'bloom'
+DEDUP_WINDOW = int(os.getenv('DEDUP_WINDOW', RECENT_WINDOW))  # IDs recentes guardados nos modos 'window' e 'bloom'
+JOURNAL_EVERY = 30  # Quantidade de polls entre gravações do journal do índice
 
-def get_live_details():
-    url = f"https://www.googleapis.com/youtube/v3/videos?part=liveStreamingDetails&id={VIDEO_ID}&key={API_KEY}"
-    response = requests.get(url)
-    data = response.json()
-    
-    if "items" in data and len(data["items"]) > 0:
-        live_details = data["items"][0]["liveStreamingDetails"]
-        if "actualStartTime" in live_details:
-            live_start_time = live_details["actualStartTime"]
-            return live_details.get("activeLiveChatId"), parser.isoparse(live_start_time)
-    return None, None
-
-def get_chat_messages(live_chat_id, live_start_time_utc):
-    comments_list = []
-    chat_url = f"https://www.googleapis.com/youtube/v3/liveChat/messages?liveChatId={live_chat_id}&part=snippet,authorDetails&maxResults=200&key={API_KEY}"
-    chat_response = requests.get(chat_url)
-    chat_data = chat_response.json()
-
-    if "items" in chat_data:
-        for item in chat_data["items"]:
-            comment_id = item.get("id")
-            author = item["authorDetails"]["displayName"]
-            try:
-                message = item["snippet"]["displayMessage"]
-            except:
-                message = ""
-            timestamp = item["snippet"].get("publishedAt")
-            
-            if not timestamp or not comment_id:
-                continue # Ignora comentários sem timestamp ou ID - Podia dar problema sem
-
-            # Calcula o tempo decorrido desde o início da live, convertendo e tirando após a vírgula
-            message_time_utc = parser.isoparse(timestamp)
-            
-            time_elapsed = message_time_utc - live_start_time_utc
-            
-            time_elapsed_str = str(time_elapsed).split('.')[0]
-            
-            comment_entry = {
-                "id": comment_id,
-                "time_elapsed": time_elapsed_str,
-                "author": author,
-                "message": message
-            }
-            comments_list.append(comment_entry)
-    return comments_list
+def get_chat_messages(poller, live_start_time_utc):
+    # Cada chamada continua do cursor da anterior, sem baixar de novo a mesma página
+    return parse_chat_items(poller.poll(), live_start_time_utc)
 
 def load_existing_comments():
     try:
-        with open('comments.json', 'r', encoding='utf-8') as f:
+        with open(OUTPUT_FILE, 'r', encoding='utf-8') as f:
             # Verifica se o arquivo está vazio
             if f.read(1):
                 f.seek(0)  # Volta para o início do arquivo
@@ -69,31 +37,80 @@ def load_existing_comments():
     except (FileNotFoundError, json.JSONDecodeError):
         return []  # Arquivo não encontrado ou corrompido
 
-def save_comments(comments_list):
-    with open('comments.json', 'w', encoding='utf-8') as f:
-        json.dump(comments_list, f, ensure_ascii=False, indent=4)
+def open_comment_log():
+    # Coletas antigas gravavam direto no comments.json: importa uma única vez para o log
+    if not os.path.exists(LOG_FILE):
+        with ChatLogWriter(LOG_FILE) as writer:
+            writer.append(load_existing_comments())
 
-def append_new_comments(new_comments):
-    existing_comments = load_existing_comments()
-    existing_ids = {comment.get('id') for comment in existing_comments if 'id' in comment}
-    
+    dedup_index = load_dedup_index(DEDUP_JOURNAL_FILE, LOG_FILE, mode=DEDUP_MODE, window=DEDUP_WINDOW)
+    return ChatLogWriter(LOG_FILE), dedup_index
+
+def append_new_comments(new_comments, writer, dedup_index, metrics=None, live_start_time_utc=None):
     # Filtra apenas os novos comentários
-    new_comments_filtered = [comment for comment in new_comments if comment['id'] not in existing_ids]
-    
-    # Adiciona novos comentários ao arquivo existente
-    existing_comments.extend(new_comments_filtered)
-    save_comments(existing_comments)
-    
+    new_comments_filtered = dedup_index.filter_new(new_comments)
+
+    # Escreve apenas os novos comentários no final do log
+    bytes_written = writer.append(new_comments_filtered)
+
+    if metrics is not None:
+        metrics.observe_batch(VIDEO_ID, len(new_comments), new_comments_filtered, bytes_written, live_start_time_utc)
+
     return len(new_comments_filtered)  # Retorna a quantidade de novos comentários
 
-# Loop para coletar e salvar comentários
-while True:
-    live_chat_id, live_start_time_utc = get_live_details()
-    if live_chat_id and live_start_time_utc:
-        new_comments = get_chat_messages(live_chat_id, live_start_time_utc)
-        new_count = append_new_comments(new_comments)
-        print(f"Coletado e adicionado {new_count} novos comentários.")
-    else:
-        print("Não foi possível obter os detalhes da live ou o chat ao vivo. Verifique se o vídeo está ao vivo e se os detalhes estão disponíveis.")
-    
-    time.sleep(WAIT_TIME)
\ No newline at end of file
+if __name__ == "__main__":
+    writer, dedup_index = open_comment_log()
+    metrics = CollectorMetrics()  # Gravadas periodicamente em collector_metrics.json/.prom
+    client = HttpClient(on_request=metrics.on_request)  # Conexões reaproveitadas entre as chamadas, com retentativas
+    # Os detalhes da live só são consultados de novo em caso de erro, fim do chat ou TTL
+    live_metadata = LiveMetadataCache(VIDEO_ID, API_KEY, client)
+    poller = None
+    polls = 0
+
+    # Loop para coletar e salvar comentários
+    try:
+        while True:
+            try:
+                live_chat_id, live_start_time_utc = live_metadata.get()
+            except requests.RequestException as e:
+                print(f"Erro ao consultar os detalhes da live: {e}")
+                live_chat_id, live_start_time_utc = None, None
+
+            if live_chat_id and live_start_time_utc:
+                if poller is None or poller.live_chat_id != live_chat_id:
+                    poller = ChatPoller(live_chat_id, API_KEY, client)
+                try:
+                    new_comments = get_chat_messages(poller, live_start_time_utc)
+                except requests.RequestException as e:
+                    # Retentativas esgotadas: mantém o cursor e tenta de novo no próximo ciclo
+                    print(f"Erro ao buscar mensagens do chat: {e}")
+                    new_comments = []
+                if poller.needs_refresh():
+                    live_metadata.invalidate()
+                new_count = append_new_comments(new_comments, writer, dedup_index, metrics, live_start_time_utc)
+                print(f"Coletado e adicionado {new_count} novos comentários.")
+
+                polls += 1
+                if polls % JOURNAL_EVERY == 0:
+                    writer.sync()
+                    dedup_index.save(DEDUP_JOURNAL_FILE, writer.tell())
+
+                # Espera conforme o intervalo sugerido pelo servidor e a taxa de mensagens
+                delay = poller.next_delay()
+            else:
+                print("Não foi possível obter os detalhes da live ou o chat ao vivo. Verifique se o vídeo está ao vivo e se os detalhes estão disponíveis.")
+                delay = WAIT_TIME
+
+            metrics.maybe_flush()
+            time.sleep(delay)
+    except KeyboardInterrupt:
+        print("Coleta interrompida.")
+    finally:
+        writer.sync()
+        dedup_index.save(DEDUP_JOURNAL_FILE, writer.tell())
+        dedup_index.close()
+        writer.close()
+        client.close()
+        metrics.flush()
+        total = compact_chat_log(LOG_FILE, OUTPUT_FILE)
+        print(f"{total} comentários salvos em: {OUTPUT_FILE}")
@@ -2,6 +2,9 @@ from datetime import datetime, timedelta
 import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
+from v1.timestamps import elapsed_datetimes
+
+NEW_MEMBER_MESSAGE = 'just became a member!'  # Mensagem do YouTube quando alguém vira membro
 
 def convert_time_to_timedelta(time_str):
     try:
@@ -14,14 +17,14 @@ def convert_time_to_timedelta(time_str):
 def get_new_members(json_data, interval = 20):
     member_messages = []
     for comment in json_data:
-        if 'just became a member!' in comment['message']:
+        if NEW_MEMBER_MESSAGE in comment['message']:
             member_messages.append(comment)
 
     if not member_messages:
         return None, None
 
     df = pd.DataFrame(member_messages)
-    df['timestamp'] = pd.to_datetime(df['time_elapsed'])
+    df['timestamp'] = elapsed_datetimes(df)
     df.set_index('timestamp', inplace=True)
     resampled_df = df.resample(f'{interval}T').size()
 
@@ -0,0 +1,201 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from dotenv import load_dotenv
+from v1.chat_log import ChatLogWriter, compact_chat_log
+from v1.dedup_index import RECENT_WINDOW, load_dedup_index
+from v1.chat_poller import ChatPoller, parse_chat_items
+from v1.live_metadata import LiveMetadataCache
+from v1.http_client import HttpClient, POOL_SIZE
+from v1.collector_metrics import CollectorMetrics
+
+# Coleta o chat de várias lives ao mesmo tempo em um único processo.
+# Cada live tem seu próprio cursor, intervalo de polling, índice de IDs e log;
+# todas dividem a mesma sessão HTTP e um limite global de requisições por
+# segundo, para gastar a cota da API de forma controlada.
+#
+#   VIDEO_IDS=id1,id2,id3 python -m v1.multi_stream
+#
+# As requisições continuam usando o HttpClient (requests) em threads, via
+# asyncio.to_thread, assim como o fsync, o journal do índice e a compactação
+# do log; o asyncio só coordena as esperas de cada live. Um erro inesperado
+# em uma live reinicia só a coleta dela.
+
+load_dotenv()
+API_KEY = os.getenv('GOOGLE_API_KEY')
+VIDEO_IDS = [video_id.strip() for video_id in os.getenv('VIDEO_IDS', '').split(',') if video_id.strip()]
+REQUESTS_PER_SECOND = float(os.getenv('REQUESTS_PER_SECOND', '5'))  # Limite global de requisições
+OUTPUT_DIR = 'streams'  # Pasta com os logs de cada live
+WAIT_TIME = 20  # Tempo de espera em segundos quando a live não está disponível
+DEDUP_MODE = os.getenv('DEDUP_MODE', 'exact')  # 'exact', 'window' (IDs recentes) ou 'bloom', o mesmo para todas as lives
+DEDUP_WINDOW = int(os.getenv('DEDUP_WINDOW', RECENT_WINDOW))  # IDs recentes guardados por live nos modos 'window' e 'bloom'
+JOURNAL_EVERY = 30  # Quantidade de polls entre gravações do journal do índice
+RESTART_DELAY = 30  # Espera em segundos antes de reiniciar a coleta de uma live que falhou
+
+
+class RateLimiter:
+    """Token bucket compartilhado por todas as lives"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        # O lock mantém a ordem de chegada: quem espera não é ultrapassado
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def wait(self, loop):
+        """Versão bloqueante de acquire, para as threads que fazem as requisições"""
+
+        asyncio.run_coroutine_threadsafe(self.acquire(), loop).result()
+
+
+class StreamCollector:
+    """Coleta de uma live: cursor, intervalo, índice de IDs e log próprios"""
+
+    def __init__(self, video_id, api_key, client, metrics, output_dir=OUTPUT_DIR, dedup_mode=DEDUP_MODE, dedup_window=DEDUP_WINDOW):
+        self.video_id = video_id
+        self.api_key = api_key
+        self.client = client
+        self.metrics = metrics
+        self.dedup_mode = dedup_mode
+        self.dedup_window = dedup_window
+
+        base_path = os.path.join(output_dir, f'comments_{video_id}')
+        self.log_path = f'{base_path}.jsonl'
+        self.output_path = f'{base_path}.json'
+        self.journal_path = f'{base_path}.dedup.jsonl'
+
+        self.live_metadata = LiveMetadataCache(video_id, api_key, client)
+        self.poller = None
+        self.collected = 0
+
+    async def run_forever(self):
+        """Roda a coleta e a reinicia depois de um erro inesperado, sem derrubar as outras lives"""
+
+        while True:
+            try:
+                await self.run()
+                return
+            except Exception as e:
+                print(f"[{self.video_id}] Erro inesperado na coleta, reiniciando em {RESTART_DELAY}s: {e!r}")
+                await asyncio.sleep(RESTART_DELAY)
+
+    async def run(self):
+        # Leitura e reparo do log e do journal fora do loop de eventos
+        writer = await asyncio.to_thread(ChatLogWriter, self.log_path)
+        try:
+            dedup_index = await asyncio.to_thread(load_dedup_index, self.journal_path, self.log_path, self.dedup_mode, self.dedup_window)
+        except BaseException:
+            writer.close()
+            raise
+        polls = 0
+
+        try:
+            while True:
+                delay = await self._poll_once(writer, dedup_index)
+
+                polls += 1
+                if polls % JOURNAL_EVERY == 0:
+                    await asyncio.to_thread(self._save_journal, writer, dedup_index)
+
+                await asyncio.sleep(delay)
+        finally:
+            await asyncio.to_thread(self._close, writer, dedup_index)
+
+    def _save_journal(self, writer, dedup_index):
+        writer.sync()
+        dedup_index.save(self.journal_path, writer.tell())
+
+    def _close(self, writer, dedup_index):
+        self._save_journal(writer, dedup_index)
+        dedup_index.close()
+        writer.close()
+        compact_chat_log(self.log_path, self.output_path)
+
+    async def _poll_once(self, writer, dedup_index):
+        """Faz um ciclo de coleta e retorna o tempo de espera até o próximo"""
+
+        try:
+            live_chat_id, live_start_time_utc = await asyncio.to_thread(self.live_metadata.get)
+        except requests.RequestException as e:
+            print(f"[{self.video_id}] Erro ao consultar os detalhes da live: {e}")
+            return WAIT_TIME
+
+        if not live_chat_id or not live_start_time_utc:
+            print(f"[{self.video_id}] Não foi possível obter os detalhes da live ou o chat ao vivo.")
+            return WAIT_TIME
+
+        if self.poller is None or self.poller.live_chat_id != live_chat_id:
+            self.poller = ChatPoller(live_chat_id, self.api_key, self.client)
+
+        try:
+            items = await asyncio.to_thread(self.poller.poll)
+        except requests.RequestException as e:
+            print(f"[{self.video_id}] Erro ao buscar mensagens do chat: {e}")
+            items = []
+
+        if self.poller.needs_refresh():
+            self.live_metadata.invalidate()
+
+        comments = parse_chat_items(items, live_start_time_utc)
+        new_comments = dedup_index.filter_new(comments)
+        # O append pode fazer fsync, que não deve travar as outras lives
+        bytes_written = await asyncio.to_thread(writer.append, new_comments)
+        self.metrics.observe_batch(self.video_id, len(comments), new_comments, bytes_written, live_start_time_utc)
+        self.collected += len(new_comments)
+        if new_comments:
+            print(f"[{self.video_id}] Coletado e adicionado {len(new_comments)} novos comentários.")
+
+        return self.poller.next_delay()
+
+
+async def collect_streams(video_ids, api_key, requests_per_second=REQUESTS_PER_SECOND, output_dir=OUTPUT_DIR):
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Uma thread e uma conexão por live, para nenhuma live esperar a requisição de outra
+    workers = max(POOL_SIZE, len(video_ids))
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=workers))
+    metrics = CollectorMetrics(os.path.join(output_dir, 'collector_metrics'))
+    limiter = RateLimiter(requests_per_second)
+    loop = asyncio.get_running_loop()
+    # Cada tentativa, retentativas incluídas, espera um token do limite global
+    client = HttpClient(pool_size=workers, on_request=metrics.on_request, before_request=lambda: limiter.wait(loop))
+
+    collectors = [StreamCollector(video_id, api_key, client, metrics, output_dir) for video_id in video_ids]
+    flusher = asyncio.create_task(flush_metrics(metrics))
+    try:
+        await asyncio.gather(*(collector.run_forever() for collector in collectors))
+    finally:
+        flusher.cancel()
+        client.close()
+        metrics.flush()
+
+
+async def flush_metrics(metrics):
+    while True:
+        await asyncio.sleep(metrics.flush_interval)
+        await asyncio.to_thread(metrics.flush)
+
+
+if __name__ == "__main__":
+    if not VIDEO_IDS:
+        print("Defina VIDEO_IDS com os IDs das lives separados por vírgula.")
+    else:
+        try:
+            asyncio.run(collect_streams(VIDEO_IDS, API_KEY))
+        except KeyboardInterrupt:
+            print("Coleta interrompida.")
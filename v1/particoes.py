@@ -1,43 +1,74 @@
 from datetime import timedelta
 import json
+import numpy as np
+from v1.timestamps import comment_elapsed_seconds
+from v2.dataset.comment_dataset import CommentDataset
+from v2.dataset.time_index import get_time_index
 
 def parse_time(time):
     h, m, s = map(int, time.split(':'))
     return timedelta(hours=h, minutes=m, seconds=s)
 
+def partition_buckets(seconds, n):
+    """Partição de cada comentário, floor((t - t0) / tamanho), em uma única passada vetorizada"""
+
+    if len(seconds) == 0:
+        return 0, 0, np.zeros(0, dtype=np.int64)
+
+    first = int(seconds.min())
+    total = int(seconds.max()) - first
+    if total == 0:
+        return first, total, np.zeros(len(seconds), dtype=np.int64)
+
+    # Conta inteira: (t - t0) * n // total é o mesmo que floor((t - t0) / (total / n)), sem arredondamento.
+    # Os comentários do último instante entram na última partição em vez de ficarem de fora
+    return first, total, np.minimum((seconds.astype(np.int64) - first) * n // total, n - 1)
+
+def partition_bounds(first, total, n):
+    first_timestamp = timedelta(seconds=first)
+    partition_size = timedelta(seconds=total) / n
+    return [(first_timestamp + partition_size * index, first_timestamp + partition_size * (index + 1)) for index in range(n)]
+
 def get_partitions(data, n=5):
-    for comment in data:
-        comment['timestamp'] = parse_time(comment['time_elapsed'])
+    """Divide os comentários em n partições de mesma duração; não altera os comentários"""
+
+    if isinstance(data, CommentDataset):
+        # Calculado só quando a página pede, uma vez por versão do dataset e n
+        return data.cached(('partitions', n), lambda: get_dataset_partitions(data, n))
 
-    first_comment = min(data, key=lambda x: x['timestamp'])
-    last_comment = max(data, key=lambda x: x['timestamp'])
-    total_time = last_comment['timestamp'] - first_comment['timestamp']
+    seconds = np.fromiter((comment_elapsed_seconds(comment) for comment in data), dtype=np.int64, count=len(data))
+    first, total, buckets = partition_buckets(seconds, n)
 
-    partition_size = total_time / n
+    # Ordenação estável: dentro de cada partição os comentários ficam na ordem original
+    order = np.argsort(buckets, kind='stable')
+    offsets = np.concatenate(([0], np.cumsum(np.bincount(buckets, minlength=n))))
 
     partitions = {}
+    for index, (start, end) in enumerate(partition_bounds(first, total, n)):
+        partitions[index] = {
+            'comments': [data[i] for i in order[offsets[index]:offsets[index + 1]]],
+            'start': start,
+            'end': end
+        }
+
+    return partitions
+
+def get_dataset_partitions(dataset, n=5):
+    # Os tempos do índice já estão ordenados, então cada partição é um trecho contínuo da permutação
+    time_index = get_time_index(dataset)
+    first, total, buckets = partition_buckets(time_index.seconds, n)
+    offsets = np.concatenate(([0], np.cumsum(np.bincount(buckets, minlength=n))))
 
-    for index in range(n):
+    partitions = {}
+    for index, (start, end) in enumerate(partition_bounds(first, total, n)):
         partitions[index] = {
-            'comments': [],
-            'start': first_comment['timestamp'] + partition_size * index,
-            'end': first_comment['timestamp'] + partition_size * (index + 1)
+            'comments': dataset.view(time_index.order[offsets[index]:offsets[index + 1]]),
+            'start': start,
+            'end': end
         }
-    
-    for comment in data:
-        for index, partition in partitions.items():
-            if partition['start'] <= comment['timestamp'] < partition['end']:
-                partition['comments'].append(comment)
-
-    for index, partition in partitions.items():
-        print(f'Partition {index+1}')
-        print(f'Comments: {len(partition["comments"])}')
-        print(f'Start: {partition["start"]}')
-        print(f'End: {partition["end"]}')
-        print()
-        
+
     return partitions
 
     
 #if __name__ == '__main__':
-#    get_partitions('data.json')
\ No newline at end of file
+#    get_partitions('data.json')
@@ -3,8 +3,15 @@ import matplotlib
 matplotlib.use('Agg')  # Define o backend para salvar figuras
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
+import numpy as np
 import pandas as pd
 from v1.nuvem import file_to_json
+from v1.timestamps import elapsed_datetimes
+from v2.dataset.comment_dataset import CommentDataset, resolve_rows
+from v2.dataset.time_index import get_time_index
+from v2.dataset.search_index import get_inverted_index
+from v2.dataset.tokens import get_tokens
+from v2.output.counts.heavy_hitters import get_word_tracker
 from nltk.corpus import stopwords
 
 def format_timedelta(td):
@@ -17,9 +24,14 @@ def format_datetime(dt):
     return dt.strftime('%H:%M')
 
 def get_peaks(comments_data, mnt=10, top=3):
-    df = pd.DataFrame(comments_data)
-
-    df['time_elapsed'] = pd.to_datetime(df['time_elapsed'])
+    if isinstance(comments_data, CommentDataset):
+        # Só a coluna de tempo é necessária; as mensagens de cada pico vêm do índice de tempo
+        time_index = get_time_index(comments_data)
+        df = pd.DataFrame({'time_elapsed': pd.to_datetime(comments_data.seconds, unit='s')})
+    else:
+        time_index = None
+        df = pd.DataFrame(comments_data)
+        df['time_elapsed'] = elapsed_datetimes(df)
 
     df_resampled = df.resample(f'{mnt}T', on='time_elapsed').size().reset_index(name='Comentários')
 
@@ -31,14 +43,17 @@ def get_peaks(comments_data, mnt=10, top=3):
         start_time = row['time_elapsed']
         end_time = row['time_elapsed'] + pd.to_timedelta(f'{mnt}min')
 
-        peak_messages = df[(df['time_elapsed'] >= row['time_elapsed']) & (df['time_elapsed'] < row['time_elapsed'] + pd.to_timedelta(f'{mnt}min'))]
-
-        messages_list = [{'message': msg} for msg in peak_messages['message'].tolist()]
+        if time_index is not None:
+            start_seconds = (start_time - pd.Timestamp(0)).total_seconds()
+            messages_list = time_index.view(start_seconds, start_seconds + mnt * 60)
+        else:
+            peak_messages = df[(df['time_elapsed'] >= row['time_elapsed']) & (df['time_elapsed'] < row['time_elapsed'] + pd.to_timedelta(f'{mnt}min'))]
+            messages_list = [{'message': msg} for msg in peak_messages['message'].tolist()]
 
         peak_dict = {
             'start': format_datetime(start_time),
             'end': format_datetime(end_time),
-            'comments': len(peak_messages),
+            'comments': len(messages_list),
             'messages': messages_list
         }
 
@@ -71,6 +86,16 @@ def get_peaks(comments_data, mnt=10, top=3):
     return peaks_array, path
 
 def get_top_words(data, n=10, language='portuguese'):
+    if isinstance(data, CommentDataset):
+        # Top palavras do rastreador do dataset, sem recontar as mensagens a cada chamada
+        top = get_word_tracker(data, language).top(n)
+        return pd.Series([count for _, count in top], index=pd.Index([word for word, _ in top], dtype=object), name='count')
+
+    dataset, indices = resolve_rows(data)
+    if dataset is not None:
+        # Contagem sobre os ids de palavras já tokenizados do dataset
+        return get_tokens(dataset).top_words(indices, n, language)
+
     stop_words = set(stopwords.words(language))
     words = ' '.join([comment['message'].lower() for comment in data]).split()
     words_filtered = [word for word in words if word not in stop_words]
@@ -78,6 +103,12 @@ def get_top_words(data, n=10, language='portuguese'):
     return words_count[:n]
 
 def get_word_context(data, word):
+    dataset, indices = resolve_rows(data)
+    if dataset is not None:
+        # Linhas da palavra vêm do índice invertido, mantendo a ordem do pico/partição
+        rows = get_inverted_index(dataset).rows(word) if word else []
+        return dataset.messages[indices[np.isin(indices, rows)]].tolist()
+
     word_lower = word.lower()
     return [comment['message'] for comment in data if word_lower in comment['message'].lower()]
 
@@ -0,0 +1,174 @@
+import argparse
+import json
+import os
+import time
+from bisect import bisect_right
+from v1.chat_log import ChatLogWriter, read_chat_log, compact_chat_log
+from v1.collector_metrics import CollectorMetrics
+from v1.timestamps import comment_elapsed_seconds, format_elapsed
+
+# Reproduz um chat gravado (comments.json ou comments.jsonl) em tempo real ou
+# N vezes mais rápido, para medir coleta, enriquecimento e o dashboard com uma
+# carga controlada e repetível. Há dois destinos:
+#
+#   Log do coletor: grava no formato do coletor (JSONL) e, opcionalmente,
+#   compacta de tempos em tempos no comments.json lido pelo app.py
+#     python -m v1.replay gravacao.json --speed 10 --output replay.jsonl --compact-to input/comments.json
+#
+#   API falsa: serve a gravação pelos endpoints da YouTube Data API
+#     python -m v1.replay gravacao.json --speed 10 --api --port 8080
+
+COMPACT_EVERY = 30  # Segundos (de relógio) entre compactações no modo log
+BATCH_INTERVAL = 0.5  # Maior espera em segundos entre dois lotes gravados
+
+
+def load_recorded_chat(path):
+    """Carrega a gravação ordenada pelo tempo decorrido, com elapsed_s e id preenchidos"""
+
+    if path.endswith('.jsonl'):
+        comments = list(read_chat_log(path))
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            comments = json.load(f)
+
+    messages = []
+    for index, comment in enumerate(comments):
+        message = dict(comment)
+        message['id'] = comment.get('id') or f'replay-{index}'
+        message['elapsed_s'] = comment_elapsed_seconds(comment)
+        messages.append(message)
+    messages.sort(key=lambda message: message['elapsed_s'])
+    return messages
+
+
+class ChatReplay:
+    """Relógio da reprodução: quais mensagens da gravação já foram 'publicadas'"""
+
+    def __init__(self, messages, speed=1.0):
+        self.messages = messages
+        self.speed = speed
+        # Começa na primeira mensagem, sem esperar o silêncio antes dela
+        self.offset = messages[0]['elapsed_s'] if messages else 0
+        self.started = time.monotonic()
+        self._elapsed = [message['elapsed_s'] for message in messages]
+        self._cursor = 0
+
+    def stream_elapsed(self):
+        """Segundos decorridos na live reproduzida"""
+
+        return self.offset + (time.monotonic() - self.started) * self.speed
+
+    def available(self):
+        """Quantidade de mensagens já publicadas na reprodução"""
+
+        return bisect_right(self._elapsed, self.stream_elapsed())
+
+    def finished(self):
+        return self._cursor >= len(self.messages)
+
+    def take_due(self):
+        """Mensagens publicadas desde a chamada anterior"""
+
+        end = self.available()
+        due = self.messages[self._cursor:end]
+        self._cursor = max(self._cursor, end)
+        return due
+
+    def time_to_next(self):
+        """Segundos de relógio até a próxima mensagem ser publicada"""
+
+        if self.finished():
+            return 0.0
+        return max(0.0, (self._elapsed[self._cursor] - self.stream_elapsed()) / self.speed)
+
+
+def replay_to_log(replay, log_path, compact_to=None, compact_every=COMPACT_EVERY, metrics=None):
+    """Grava a reprodução no log do coletor, como se as mensagens chegassem ao vivo"""
+
+    # Cada reprodução começa de um log vazio, para as medições serem repetíveis
+    if os.path.exists(log_path):
+        os.remove(log_path)
+
+    started = time.monotonic()
+    last_compact = started
+    written = 0
+    compact_times = []
+
+    with ChatLogWriter(log_path) as writer:
+        while not replay.finished():
+            time.sleep(min(replay.time_to_next(), BATCH_INTERVAL))
+            now_ms = int(time.time() * 1000)
+
+            batch = []
+            for message in replay.take_due():
+                record = dict(message)
+                record['time_elapsed'] = format_elapsed(message['elapsed_s'])
+                # publishedAt da reprodução: o horário em que a mensagem foi "publicada" agora
+                record['published_ms'] = now_ms
+                batch.append(record)
+
+            bytes_written = writer.append(batch)
+            written += len(batch)
+            if metrics is not None:
+                metrics.observe_batch('replay', len(batch), batch, bytes_written)
+                metrics.maybe_flush()
+
+            if compact_to and time.monotonic() - last_compact >= compact_every:
+                writer.sync()
+                compact_started = time.monotonic()
+                compact_chat_log(log_path, compact_to)
+                compact_times.append(time.monotonic() - compact_started)
+                last_compact = time.monotonic()
+
+    if compact_to:
+        compact_started = time.monotonic()
+        compact_chat_log(log_path, compact_to)
+        compact_times.append(time.monotonic() - compact_started)
+    if metrics is not None:
+        metrics.flush()
+
+    duration = time.monotonic() - started
+    return {
+        'messages': written,
+        'duration_seconds': duration,
+        'messages_per_second': written / duration if duration > 0 else 0.0,
+        'compactions': len(compact_times),
+        'max_compaction_seconds': max(compact_times, default=0.0)
+    }
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description='Replay a recorded live chat for load testing')
+    arg_parser.add_argument('comments', help='recorded comments.json or comments.jsonl')
+    arg_parser.add_argument('--speed', type=float, default=1.0, help='replay speed multiplier')
+    arg_parser.add_argument('--output', default='replay_comments.jsonl', help='collector log written by the replay')
+    arg_parser.add_argument('--compact-to', help='JSON array refreshed periodically for the dashboard (e.g. input/comments.json)')
+    arg_parser.add_argument('--compact-every', type=float, default=COMPACT_EVERY, help='seconds between compactions')
+    arg_parser.add_argument('--api', action='store_true', help='serve the replay through the fake YouTube API instead')
+    arg_parser.add_argument('--polling-interval', type=int, default=2000, help='pollingIntervalMillis returned by the fake API')
+    arg_parser.add_argument('--host', default='127.0.0.1')
+    arg_parser.add_argument('--port', type=int, default=8080)
+    args = arg_parser.parse_args()
+
+    messages = load_recorded_chat(args.comments)
+
+    if args.api:
+        from v1.fake_youtube_api import FakeYouTubeApi, serve
+
+        api = FakeYouTubeApi(messages, speed=args.speed, polling_interval_ms=args.polling_interval)
+        server = serve(api, args.host, args.port)
+        print(f"Reproduzindo {len(messages)} mensagens em http://{args.host}:{args.port}/youtube/v3 ({args.speed}x)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+    else:
+        print(f"Reproduzindo {len(messages)} mensagens em {args.output} ({args.speed}x)")
+        metrics = CollectorMetrics(f'{args.output}.metrics')
+        try:
+            summary = replay_to_log(ChatReplay(messages, args.speed), args.output, args.compact_to, args.compact_every, metrics)
+            print(json.dumps(summary, indent=2))
+        except KeyboardInterrupt:
+            print("Reprodução interrompida.")
@@ -2,20 +2,40 @@ import json
 from matplotlib import pyplot as plt
 from matplotlib import dates as mdates
 import pandas as pd
+import numpy as np
 from collections import Counter
+from v1.timestamps import comment_elapsed_seconds, elapsed_datetimes, format_elapsed
+from v2.dataset.author_index import get_author_index
+from v2.dataset.comment_dataset import CommentDataset, resolve_rows
+from v2.output.counts.heavy_hitters import get_author_tracker
 
 def get_author_comments(author, data, interval=30):
-    author_comments = []
-    for item in data:
-        if item['author'] == author:
-            author_comments.append(item)
-    
-    author_filtered_comments = [comment for comment in author_comments if comment['message'].strip()]
-
-    df = pd.DataFrame(author_filtered_comments)
-    df['timestamp'] = pd.to_datetime(df['time_elapsed'], format='%H:%M:%S', errors='coerce')
-    df.set_index('timestamp', inplace=True)
-    resampled_df = df.resample(f'{interval}min').size()
+    if isinstance(data, CommentDataset):
+        # Linhas e histograma do autor vêm do índice por autor: custo proporcional aos comentários dele
+        author_index = get_author_index(data)
+        author_filtered_comments = data.view(author_index.rows(author, with_text=True))
+        starts, counts = author_index.histogram(author, interval * 60)
+        resampled_df = pd.Series(counts, index=pd.to_datetime(starts, unit='s'))
+    else:
+        dataset, indices = resolve_rows(data)
+        if dataset is not None:
+            # Compara os códigos inteiros do autor em vez das strings
+            codes = np.flatnonzero(dataset.authors == author)
+            selected = indices[np.isin(dataset.author_codes[indices], codes) & dataset.has_text[indices]]
+            author_filtered_comments = dataset.view(selected)
+            df = author_filtered_comments.to_pandas()
+        else:
+            author_comments = []
+            for item in data:
+                if item['author'] == author:
+                    author_comments.append(item)
+
+            author_filtered_comments = [comment for comment in author_comments if comment['message'].strip()]
+            df = pd.DataFrame(author_filtered_comments)
+
+        df['timestamp'] = elapsed_datetimes(df)
+        df.set_index('timestamp', inplace=True)
+        resampled_df = df.resample(f'{interval}min').size()
 
     plt.figure(figsize=(14, 6))
     plt.plot(resampled_df.index, resampled_df.values)
@@ -30,10 +50,40 @@ def get_author_comments(author, data, interval=30):
     path = f'v1/output/comentarios_{author}_por_minuto.png'
 
     plt.savefig(path)
+    plt.close()
 
     return path, author_filtered_comments
 
+def get_author_seen(author, data):
+    dataset, indices = resolve_rows(data)
+    if isinstance(data, CommentDataset):
+        # Primeiro e último comentário já calculados no índice por autor
+        author_index = get_author_index(data)
+        code = author_index.code(author)
+        seconds = [] if code is None else [author_index.first_seen[code], author_index.last_seen[code]]
+    elif dataset is not None:
+        codes = np.flatnonzero(dataset.authors == author)
+        seconds = dataset.seconds[indices[np.isin(dataset.author_codes[indices], codes)]]
+    else:
+        seconds = [comment_elapsed_seconds(item) for item in data if item['author'] == author]
+
+    if len(seconds) == 0:
+        return None, None
+    return format_elapsed(int(min(seconds))), format_elapsed(int(max(seconds)))
+
 def get_top_authors(data, n=5):
+    if isinstance(data, CommentDataset):
+        # Autores com mais comentários com texto, já contados pelo rastreador do dataset
+        return get_author_tracker(data).top(n)
+
+    dataset, indices = resolve_rows(data)
+    if dataset is not None:
+        # Contagem por código do autor, só das mensagens com texto
+        counts = np.bincount(dataset.author_codes[indices[dataset.has_text[indices]]], minlength=len(dataset.authors))
+        # Ordenação estável: empates ficam na ordem de aparição, como no Counter
+        top_codes = np.argsort(-counts, kind='stable')[:n]
+        return [(dataset.authors[code], int(counts[code])) for code in top_codes if counts[code] > 0]
+
     filter_data = [item for item in data if item['message'].strip()]
 
     authors = [item['author'] for item in filter_data]
@@ -0,0 +1,101 @@
+from datetime import timedelta
+from dateutil import parser
+
+# Conversão de horários feita uma única vez, na coleta. Cada comentário guarda
+# published_ms (epoch em milissegundos) e elapsed_s (segundos desde o início
+# da live) como inteiros, além do time_elapsed em texto por compatibilidade,
+# para o dashboard não precisar interpretar strings de horário.
+
+
+def days_from_civil(year, month, day):
+    """Dias desde 1970-01-01 no calendário gregoriano (algoritmo de Howard Hinnant)"""
+
+    year -= month <= 2
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * (month + (-3 if month > 2 else 9)) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+
+def parse_rfc3339_ms(value):
+    """
+    Epoch em milissegundos de um timestamp RFC 3339, como o publishedAt da API
+    (ex.: 2024-05-01T12:34:56.789123+00:00 ou 2024-05-01T12:34:56Z).
+
+    Lê as posições fixas do formato direto da string; qualquer outro formato
+    cai no dateutil.
+    """
+
+    try:
+        if value[4] != '-' or value[7] != '-' or value[10] not in 'Tt ' or value[13] != ':' or value[16] != ':':
+            raise ValueError(value)
+        year = int(value[0:4])
+        month = int(value[5:7])
+        day = int(value[8:10])
+        hour = int(value[11:13])
+        minute = int(value[14:16])
+        second = int(value[17:19])
+
+        millis = 0
+        pos = 19
+        if len(value) > pos and value[pos] == '.':
+            end = pos + 1
+            while end < len(value) and value[end].isdigit():
+                end += 1
+            millis = int((value[pos + 1:end] + '00')[:3])
+            pos = end
+
+        zone = value[pos:]
+        if zone in ('Z', 'z'):
+            offset = 0
+        elif len(zone) == 6 and zone[0] in '+-' and zone[3] == ':':
+            offset = (int(zone[1:3]) * 3600 + int(zone[4:6]) * 60) * (1 if zone[0] == '+' else -1)
+        else:
+            raise ValueError(value)
+    except (ValueError, IndexError):
+        return int(parser.isoparse(value).timestamp() * 1000)
+
+    seconds = days_from_civil(year, month, day) * 86400 + hour * 3600 + minute * 60 + second - offset
+    return seconds * 1000 + millis
+
+
+def format_elapsed(seconds):
+    """Segundos como 'H:MM:SS', igual ao str(timedelta) usado antes na coleta"""
+
+    if seconds < 0:
+        return str(timedelta(seconds=seconds))
+    hours, remainder = divmod(seconds, 3600)
+    minutes, secs = divmod(remainder, 60)
+    return f"{hours}:{minutes:02}:{secs:02}"
+
+
+def time_elapsed_to_seconds(time_elapsed):
+    """Converte 'H:MM:SS' (ou 'M:SS') em segundos"""
+
+    parts = list(map(int, time_elapsed.split(':')))
+    if len(parts) == 3:
+        return parts[0] * 3600 + parts[1] * 60 + parts[2]
+    elif len(parts) == 2:
+        return parts[0] * 60 + parts[1]
+    return 0
+
+
+def comment_elapsed_seconds(comment):
+    """Segundos desde o início da live; arquivos antigos sem elapsed_s caem na conversão do texto"""
+
+    elapsed_s = comment.get('elapsed_s')
+    if elapsed_s is not None:
+        return elapsed_s
+    return time_elapsed_to_seconds(comment.get('time_elapsed', '0:0'))
+
+
+def elapsed_datetimes(df):
+    """Coluna de datetimes do pandas com o tempo decorrido de cada comentário, para resample"""
+
+    # Importado aqui para o coletor não depender do pandas
+    import pandas as pd
+
+    if 'elapsed_s' in df and df['elapsed_s'].notna().all():
+        return pd.to_datetime(df['elapsed_s'], unit='s')
+    return pd.to_datetime(df['time_elapsed'], format='%H:%M:%S', errors='coerce')
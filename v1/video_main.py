@@ -1,54 +1,143 @@
 import json
 import os
-import requests
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from v1.chat_log import ChatLogWriter, compact_chat_log
+from v1.chat_poller import API_URL
+from v1.http_client import HttpClient, response_json
+from v1.collector_metrics import CollectorMetrics
 
 load_dotenv()
 API_KEY = os.getenv('GOOGLE_API_KEY')
 VIDEO_ID = os.getenv('VIDEO_ID')
 WAIT_TIME = 10  # Tempo de espera em segundos
+OUTPUT_FILE = "youtube_comments.json"  # Array JSON final
+LOG_FILE = "youtube_comments.jsonl"  # Cada página é gravada aqui assim que chega
+CHECKPOINT_FILE = "youtube_comments.checkpoint.json"  # Token da próxima página, para retomar a coleta
+REPLY_WORKERS = 4  # Threads buscando respostas ao mesmo tempo
 
 params = {
-    "part": "snippet",
+    "part": "snippet,replies",
     "videoId": VIDEO_ID,
     "key": API_KEY,
     "maxResults": 100  # Pega até 100 comentários por página
 }
 
-def get_video_comments():
-    comments = []
-    next_page_token = None
+def parse_comment(comment, parent_id=None):
+    snippet = comment["snippet"]
+    entry = {
+        "id": comment.get("id"),
+        "author": snippet["authorDisplayName"],
+        "message": snippet["textDisplay"],
+        "like_count": snippet["likeCount"],
+        "time": snippet["publishedAt"]
+    }
+    if parent_id:
+        entry["parent_id"] = parent_id
+    return entry
 
+def fetch_page(client, page_token):
+    page_params = dict(params)
+    if page_token:
+        page_params["pageToken"] = page_token
+    return response_json(client.get(f"{API_URL}/commentThreads", params=page_params))
+
+def fetch_replies(client, parent_id):
+    replies = []
+    page_token = None
     while True:
-        if next_page_token:
-            params["pageToken"] = next_page_token
-        
-        response = requests.get("https://www.googleapis.com/youtube/v3/commentThreads", params=params)
-        data = response.json()
-
-        if "items" not in data:
-            print("Nenhum comentário encontrado")
-            break
-        
-        for item in data["items"]:
-            comment = item["snippet"]["topLevelComment"]
-            author = comment["snippet"]["authorDisplayName"]
-            message = comment["snippet"]["textDisplay"]
-            like_count = comment["snippet"]["likeCount"]
-            time = comment["snippet"]["publishedAt"]
-            comments.append({"author": author, "message": message, "like_count": like_count, "time": time})
-
-        next_page_token = data.get("nextPageToken")
-        if not next_page_token:
-            break
-    
-    output_file = "youtube_comments.json"
-    with open(output_file, "w", encoding="utf-8") as file:
-        json.dump(comments, file, ensure_ascii=False, indent=4)
-
-    print(f"Total de comentários coletados: {len(comments)}")
-    print(f"Comentários salvos em: {output_file}")
+        reply_params = {"part": "snippet", "parentId": parent_id, "key": API_KEY, "maxResults": 100}
+        if page_token:
+            reply_params["pageToken"] = page_token
+        data = response_json(client.get(f"{API_URL}/comments", params=reply_params))
+        replies.extend(parse_comment(item, parent_id) for item in data.get("items", []))
+        page_token = data.get("nextPageToken")
+        if not page_token:
+            return replies
+
+def load_checkpoint():
+    try:
+        with open(CHECKPOINT_FILE, "r", encoding="utf-8") as file:
+            checkpoint = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    # Checkpoint de outro vídeo não serve para retomar
+    return checkpoint if checkpoint.get("video_id") == VIDEO_ID else None
+
+def save_checkpoint(next_page_token):
+    tmp_path = f"{CHECKPOINT_FILE}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump({"video_id": VIDEO_ID, "next_page_token": next_page_token}, file)
+    os.replace(tmp_path, CHECKPOINT_FILE)
+
+def get_video_comments(client=None, with_replies=True, reply_workers=REPLY_WORKERS):
+    metrics = CollectorMetrics('youtube_comments_metrics')
+    client = client or HttpClient(pool_size=reply_workers + 1, on_request=metrics.on_request)
+
+    checkpoint = load_checkpoint()
+    if checkpoint is None and os.path.exists(LOG_FILE):
+        os.remove(LOG_FILE)  # Log de uma coleta anterior que não pode ser retomada
+
+    page_token = checkpoint["next_page_token"] if checkpoint else None
+    if page_token:
+        print(f"Retomando a coleta a partir da página {page_token}")
+
+    finished = False
+    with ThreadPoolExecutor(max_workers=1) as page_pool, \
+            ThreadPoolExecutor(max_workers=reply_workers) as reply_pool, \
+            ChatLogWriter(LOG_FILE) as writer:
+        page_future = page_pool.submit(fetch_page, client, page_token)
+        while page_future is not None:
+            data = page_future.result()
+
+            if "items" not in data:
+                print("Nenhum comentário encontrado")
+                break
+
+            # Dispara a requisição da próxima página antes de processar a atual
+            next_page_token = data.get("nextPageToken")
+            page_future = page_pool.submit(fetch_page, client, next_page_token) if next_page_token else None
+
+            page_comments = []
+            reply_futures = []
+            for item in data["items"]:
+                comment = item["snippet"]["topLevelComment"]
+                page_comments.append(parse_comment(comment))
+
+                if not with_replies:
+                    continue
+                # A thread traz só algumas respostas; as demais são buscadas em paralelo
+                inline_replies = item.get("replies", {}).get("comments", [])
+                if item["snippet"].get("totalReplyCount", 0) > len(inline_replies):
+                    reply_futures.append(reply_pool.submit(fetch_replies, client, comment["id"]))
+                else:
+                    page_comments.extend(parse_comment(reply, comment["id"]) for reply in inline_replies)
+
+            for reply_future in reply_futures:
+                page_comments.extend(reply_future.result())
+
+            # A página só conta como concluída depois de gravada em disco
+            bytes_written = writer.append(page_comments)
+            writer.sync()
+            save_checkpoint(next_page_token)
+
+            metrics.observe_batch(VIDEO_ID, len(page_comments), page_comments, bytes_written)
+            metrics.maybe_flush()
+        else:
+            finished = True
+
+    # Coleta completa: a próxima execução começa do zero. Se a API falhou, o checkpoint fica para retomar
+    if finished and os.path.exists(CHECKPOINT_FILE):
+        os.remove(CHECKPOINT_FILE)
+
+    metrics.flush()
+
+    # Páginas regravadas após uma retomada são removidas pelo ID na compactação
+    total = compact_chat_log(LOG_FILE, OUTPUT_FILE)
+
+    print(f"Total de comentários coletados: {total}")
+    print(f"Comentários salvos em: {OUTPUT_FILE}")
 
 
 if __name__ == "__main__":
-    get_video_comments()
\ No newline at end of file
+    get_video_comments()
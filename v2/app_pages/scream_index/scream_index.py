@@ -1,7 +1,11 @@
 import json
+import numpy as np
 from v2.output.counts.scream_index_counts import scream_index_mean
 import streamlit as st
 import plotly.graph_objects as go
+from v2.dataset.author_index import get_author_index
+from v2.dataset.toxicity import get_sorted_scores
+from v2.output.charts.threshold_curve_chart import create_threshold_curve_chart
 
 def scream_index_page():
     """ Streamlit page to display the Scream Index.
@@ -46,31 +50,39 @@ def scream_index_page():
         scream_index_mean(st.session_state['comments_file'])
     ), use_container_width=True)
     
-    with st.expander("Messages above 0.7 scream index", expanded=True):
-        data = st.session_state['comments_file']
-        scream_indices = [obj for obj in data if obj.get('scream_index', 0) > 0.70]
+    data = st.session_state['comments_file']
+    scream_scores = get_sorted_scores(data, 'scream_index')
+    threshold = st.slider('Scream index threshold', 0.0, 0.95, 0.7, step=0.05)
+
+    with st.expander("Comments above Threshold", expanded=False):
+        thresholds = np.linspace(0, 1, 101)
+        st.plotly_chart(
+            create_threshold_curve_chart(thresholds, {'scream_index': scream_scores.curve(thresholds)}, threshold),
+            use_container_width=True
+        )
+
+    # Busca binária na coluna ordenada; as linhas voltam para a ordem do arquivo
+    screaming = data.view(np.sort(scream_scores.rows_above(threshold)))
+
+    with st.expander(f"Messages above {threshold:.2f} scream index", expanded=True):
         st.dataframe(
-            data=scream_indices,
+            data=screaming.to_pandas(),
             use_container_width=True
         )
 
     st.title('Top Commenters by Scream Index')
 
-    data = st.session_state['comments_file']
-    commenters = {}
-    scream_indices = [obj for obj in data if obj.get('scream_index', 0) > 0.70]
-    for obj in scream_indices:
-        commenter = obj.get('author', 'Unknown')
-        if commenter not in commenters:
-            commenters[commenter] = []
-        commenters[commenter].append(obj)
-    sorted_commenters = sorted(commenters.items(), key=lambda x: len(x[1]), reverse=True)
-    top_commenters = sorted_commenters[:10]
+    author_index = get_author_index(data)
+    counts = np.bincount(data.author_codes[screaming.indices], minlength=len(data.authors))
+    top_codes = [code for code in np.argsort(-counts, kind='stable')[:10] if counts[code] > 0]
     st.write("Top 10 commenters by Scream Index:")
-    for commenter, comments in top_commenters:
-        st.write(f"{commenter}: {len(comments)} comments")
+    for code in top_codes:
+        commenter = data.authors[code]
+        st.write(f"{commenter}: {counts[code]} comments")
         with st.expander(f"Comments by {commenter}", expanded=False):
-            for comment in comments:
-                st.write(f"- {comment.get('message', 'No content')} (Scream Index: {comment.get('scream_index', 0)})")
+            # Só as linhas do autor, pelo índice por autor, com o mesmo corte do limiar
+            rows = author_index.rows(code)
+            for index in rows[data.scream_index[rows] > threshold]:
+                st.write(f"- {data.messages[index] or 'No content'} (Scream Index: {data.scream_index[index]})")
     
     
\ No newline at end of file
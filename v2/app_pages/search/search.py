@@ -0,0 +1,83 @@
+import time
+import pandas as pd
+import streamlit as st
+from v1.timestamps import format_elapsed
+from v2.dataset.search_index import get_inverted_index, keyword_in_context, parse_query
+from v2.dataset.time_index import get_time_index
+from v2.output.counts.distinct_counts import get_distinct_authors, get_distinct_words
+from v2.output.counts.heavy_hitters import get_word_tracker
+
+MAX_RESULTS = 200  # Comentários exibidos por busca; a contagem é sempre a total
+TOP_WORDS = 20  # Palavras mais frequentes exibidas para o intervalo
+
+def search_page():
+    """
+    Returns page for full-text search over the comments.
+    Words are looked up in the dataset's inverted index, so each query only touches
+    the comments that contain the searched words.
+    """
+    data = st.session_state['comments_file']
+    st.title('Search Comments')
+
+    if not len(data):
+        st.warning("No data available.")
+        return
+
+    time_index = get_time_index(data)
+    index = get_inverted_index(data)
+
+    query = st.text_input('Search', placeholder='Words separated by spaces; end a word with * to match its prefix (e.g. gol*)')
+    match_all = st.radio('Match', ['All words', 'Any word'], horizontal=True) == 'All words'
+
+    # Intervalo do vídeo/stream; o fim do slider é inclusivo, a busca usa intervalo semiaberto
+    if time_index.min_time < time_index.max_time:
+        start, end = st.slider(
+            label="Video/stream time range:",
+            min_value=time_index.min_time,
+            max_value=time_index.max_time,
+            value=(time_index.min_time, time_index.max_time)
+        )
+    else:
+        # Todos os comentários no mesmo segundo: o slider não aceita mínimo igual ao máximo
+        start, end = time_index.min_time, time_index.max_time
+    st.info(f"**Range selected:** `{format_elapsed(start)}` to `{format_elapsed(end)}`")
+
+    with st.expander("Top words in this range", expanded=False):
+        # Resumos por janela de tempo combinados; o intervalo é arredondado para janelas inteiras
+        tracker = get_word_tracker(data)
+        top_words = tracker.top(TOP_WORDS, start, end + 1)
+        # Contadores de distintos por janela, combinados para o intervalo
+        authors = get_distinct_authors(data).counter(start, end + 1)
+        words = get_distinct_words(data).counter(start, end + 1)
+        approx = '≈' if authors.relative_error or words.relative_error else ''
+        st.write(f"{approx}**{authors.count()}** authors and {approx}**{words.count()}** distinct words in this range")
+        st.caption(f"Counted in {tracker.window // 60}-minute windows.")
+        st.dataframe(
+            data=pd.DataFrame(top_words, columns=['word', 'count']),
+            use_container_width=True,
+            hide_index=True
+        )
+
+    terms = parse_query(query)
+    if not terms:
+        return
+
+    started = time.perf_counter()
+    rows = index.search(query, match_all=match_all, start=start, end=end + 1)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    st.write(f"**{len(rows)}** comments found in {elapsed_ms:.1f} ms")
+    if not len(rows):
+        return
+
+    shown = rows[:MAX_RESULTS]
+    results = data.view(shown).to_pandas()[['time_elapsed', 'author', 'message']]
+    results['snippet'] = [keyword_in_context(message or '', terms) for message in results['message']]
+    if len(rows) > MAX_RESULTS:
+        st.caption(f"Showing the first {MAX_RESULTS} comments.")
+
+    st.dataframe(
+        data=results[['time_elapsed', 'author', 'snippet']],
+        use_container_width=True,
+        hide_index=True
+    )
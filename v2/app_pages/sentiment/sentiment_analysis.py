@@ -4,71 +4,55 @@ from v2.output.charts.sentiment_types_chart import create_sentiment_types_chart
 from v2.output.counts.sentiment_type_counts import count_sentiment_types
 from v2.output.charts.negativity_gauge_meter import *
 from v2.output.peaks.sentiment_peaks import get_sentiments_peak
-
-@st.cache_data
-def load_and_process_data():
-    """
-    Loads the JSON, converts time strings to seconds and returns the data
-    """
-    try:
-        data = st.session_state['comments_file']
-        
-        for comment in data:
-            comment['time_in_seconds'] = time_str_to_seconds(comment.get('time_elapsed', '0:0'))
-        
-        return data
-    except (FileNotFoundError, json.JSONDecodeError) as e:
-        st.error(f"Erro ao carregar o arquivo JSON em '{path}': {e}")
-        return []
+from v2.output.charts.negativity_timeline_chart import create_negativity_timeline_chart
+from v2.output.counts.sentiment_timeline import get_sentiment_timeline
+from v2.dataset.time_index import get_time_index
 
 def sentiment_analysis_page():
     """
     Returns page for sentiment types analysis.
     This function sets up the Streamlit page configuration and sidebar selection for sentiment types analysis.
     """
-    data = load_and_process_data()
-    st.session_state['comments_file'] = data
-    
-    # Adiciona o tempo em segundos a cada comentário para facilitar a filtragem (o json nao sera modificado)
-    for comment in data:
-        comment['time_in_seconds'] = time_str_to_seconds(comment.get('time_elapsed', '0:0'))
+    data = st.session_state['comments_file']
+    time_index = get_time_index(data)
+    timeline = get_sentiment_timeline(data)
     
     st.title('Sentiment Analysis using Pysentimiento')
 
     with st.expander("Negativity Gauge Meter", expanded=True):
-        if not data:
+        if not len(data):
             st.warning("No data available.")
             return
 
         # Define os limites do slider
-        min_time = data[0]['time_in_seconds']
-        max_time = data[-1]['time_in_seconds']
-
-        # Cria o slider de tempo
-        selected_seconds = st.slider(
-            label="Select the video/stream timestamp:",
-            min_value=min_time,
-            max_value=max_time,
-            value=max_time
-        )
-
-        st.info(f"**Timestamp selected:** `{seconds_to_time_str(selected_seconds)}`")
-
-        # Filtra os comentários até o tempo selecionado
-        filtered_data = [c for c in data if c['time_in_seconds'] <= selected_seconds]
+        min_time = time_index.min_time
+        max_time = time_index.max_time
 
+        # Um instante (do início até ele) ou um intervalo
+        range_mode = st.toggle("Select a time range", value=False)
 
-        # Calcula a porcentagem de negatividade
-        if not filtered_data:
-            negativity_percentage = 0.0
+        # Cria o slider de tempo
+        if range_mode:
+            selected_seconds = st.slider(
+                label="Select the video/stream time range:",
+                min_value=min_time,
+                max_value=max_time,
+                value=(min_time, max_time)
+            )
+            start, end = selected_seconds
+            st.info(f"**Range selected:** `{seconds_to_time_str(start)}` to `{seconds_to_time_str(end)}`")
         else:
-            total_comments = len(filtered_data)
-            print(f"Total comments considered: {total_comments}")
-            print(f"Data 1: {filtered_data[0]}")
-            negative_comments = sum(1 for c in filtered_data if c.get('sentiment') == 'NEG')
-            print(f"Negative comments: {negative_comments}")
-            negativity_percentage = (negative_comments / total_comments) * 100 if total_comments > 0 else 0
-            print(f"Negativity percentage: {negativity_percentage:.2f}%")
+            selected_seconds = st.slider(
+                label="Select the video/stream timestamp:",
+                min_value=min_time,
+                max_value=max_time,
+                value=max_time
+            )
+            start, end = None, selected_seconds
+            st.info(f"**Timestamp selected:** `{seconds_to_time_str(selected_seconds)}`")
+
+        # Contagens acumuladas por segundo: o gauge é uma consulta O(1), sem filtrar os comentários
+        negativity_percentage = timeline.percentage('NEG', start, end)
 
         # Cria e exibe o gauge       
         st.plotly_chart(
@@ -76,6 +60,16 @@ def sentiment_analysis_page():
             use_container_width=True
         )
 
+    with st.expander("Negativity over Time", expanded=True):
+        window_minutes = st.slider("Rolling window (minutes)", 1, 60, 5)
+        step = max(1, timeline.duration // 500)  # Até ~500 pontos no gráfico
+        points, cumulative = timeline.curve('NEG', step=step)
+        _, rolling = timeline.curve('NEG', step=step, window=window_minutes * 60)
+        st.plotly_chart(
+            create_negativity_timeline_chart(points, cumulative, rolling, window_minutes, selected_seconds if range_mode else None),
+            use_container_width=True
+        )
+
     # Grafico de barra com porcentagens de todos sentimentos em geral
     with st.expander('Sentiment Types in General', expanded=True):
         st.plotly_chart(
@@ -90,19 +84,38 @@ def sentiment_analysis_page():
             label="Select the sentiment to analyze:",
             options=["positive", "negative", "neutral"]
         )
+
+    # Janelas dos picos: tamanho, passo (menor que o tamanho gera janelas deslizantes), mínimo de comentários e quantidade
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        window_minutes = st.slider("Window (minutes)", 1, 60, 5)
+    with col2:
+        # Com janela de 1 minuto o único passo possível é 1 (o slider não aceita mínimo igual ao máximo)
+        if window_minutes > 1:
+            stride_minutes = st.slider("Window step (minutes)", 1, window_minutes, window_minutes)
+        else:
+            stride_minutes = 1
+    with col3:
+        min_count = st.slider("Minimum comments per window", 1, 200, 1)
+    with col4:
+        top = st.slider("Number of peaks", 1, 15, 5)
+
     match sentiment:
         case "positive":
-            peaks = get_sentiments_peak("POS", data)
+            sentiment_code = "POS"
         case "negative":
-            peaks = get_sentiments_peak("NEG", data)
+            sentiment_code = "NEG"
         case "neutral":
-            peaks = get_sentiments_peak("NEU", data)
+            sentiment_code = "NEU"
+    peaks = get_sentiments_peak(sentiment_code, data, window=window_minutes * 60, stride=stride_minutes * 60, min_count=min_count, top=top)
+
+    if not peaks:
+        st.warning("No window has enough comments.")
 
     for peak in peaks:
         with st.expander(f"Peak from {seconds_to_time_str(peak['start_time'])} to {seconds_to_time_str(peak['end_time'])}"):
-            st.write(f"{sentiment.capitalize()}: {peak['sentiment']/ peak['count']:.2f}%")
-            for comment in data:
-                if peak['start_time'] <= comment['time_in_seconds'] < peak['end_time']:
-                    st.write(f"- {comment['message']} (at {seconds_to_time_str(comment['time_in_seconds'])})")
+            st.write(f"{sentiment.capitalize()}: {peak['sentiment'] / peak['count'] * 100:.2f}% of {peak['count']} comments")
+            for index in time_index.range(peak['start_time'], peak['end_time']):
+                st.write(f"- {data.messages[index]} (at {seconds_to_time_str(int(data.seconds[index]))})")
 
         
@@ -4,6 +4,10 @@ from v2.output.counts.all_toxic_type_count import get_all_toxic_type_count
 from v2.output.counts.toxic_type_counts import count_toxic_types
 from v2.output.filter.toxic_types_filter import toxic_types_filter
 from v2.output.wordclouds.wordcloud import gerar_nuvem_palavras
+from v2.dataset.comment_dataset import TOXIC_TYPES
+from v2.dataset.toxicity import TOXIC_THRESHOLD, get_sorted_scores
+from v2.output.charts.threshold_curve_chart import create_threshold_curve_chart
+import numpy as np
 import plotly.graph_objects as go
 import streamlit as st
 
@@ -31,41 +35,48 @@ def toxic_types_page():
         return fig
 
     st.title('Toxic Types Analysis')
+    threshold = st.slider('Toxicity threshold', 0.0, 0.95, TOXIC_THRESHOLD, step=0.05, help='Scores above this value count as toxic')
+
     st.plotly_chart(create_gauge_chart(
         "Toxic Types Count",
-        get_all_toxic_type_count(data)
+        get_all_toxic_type_count(data, threshold)
     ), use_container_width=True)
     
     with st.expander('Toxic Types in General', expanded=True):
         st.plotly_chart(
             create_toxic_types_chart(
-                count_toxic_types(data)
+                count_toxic_types(data, threshold)
+            ),
+            use_container_width=True
+        )
+
+    with st.expander('Comments above Threshold', expanded=False):
+        # Cada curva sai de buscas binárias nas colunas já ordenadas
+        thresholds = np.linspace(0, 1, 101)
+        st.plotly_chart(
+            create_threshold_curve_chart(
+                thresholds,
+                {toxic_type: get_sorted_scores(data, toxic_type).curve(thresholds) for toxic_type in TOXIC_TYPES},
+                threshold
             ),
             use_container_width=True
         )
     
     toxic_type = st.selectbox(
         'Select a toxic type to analyze',
-        [
-            'toxicity',
-            'severe_toxicity',
-            'obscene',
-            'identity_attack',
-            'insult',
-            'threat',
-            'sexual_explicit'
-        ]
+        TOXIC_TYPES
     )
 
+    toxic_data = toxic_types_filter(data, toxic_type, threshold)
+
     with st.expander(f'{toxic_type} Analysis', expanded=True):
         st.dataframe(
-            data=toxic_types_filter(data, toxic_type),
+            data=toxic_data.to_pandas(),
             use_container_width=True
         )
 
     with st.expander(f'{toxic_type} Wordclouds', expanded=True):
         st.write(f'Wordclouds for {toxic_type} will be displayed here.')
-        toxic_data = toxic_types_filter(data, toxic_type)
         if(toxic_data.__len__() == 0):
             st.warning(f'No data found for {toxic_type}.')
             return
@@ -0,0 +1,130 @@
+import numpy as np
+
+HISTOGRAM_WINDOW = 1800  # Seconds per histogram bin, the 30 minutes of the Top commenters chart
+
+
+class AuthorIndex:
+    """
+    Rows of each author, in CSR layout: the rows of author code a are
+    `order[offsets[a]:offsets[a + 1]]`, in file order.
+
+    Also keeps per-author totals and a sparse per-window histogram of the
+    comments with text, so an author's drill-down only reads that author's rows.
+
+    Attributes:
+        dataset (CommentDataset): The indexed dataset.
+        order (np.ndarray): Row indices grouped by author code.
+        offsets (np.ndarray): int64, len(authors) + 1 positions into `order`.
+        counts (np.ndarray): Comments of each author.
+        text_counts (np.ndarray): Comments with text of each author.
+        first_seen (np.ndarray): Earliest elapsed second of each author.
+        last_seen (np.ndarray): Latest elapsed second of each author.
+        window (int): Seconds per histogram bin.
+    """
+
+    def __init__(self, dataset, window=HISTOGRAM_WINDOW):
+        codes = dataset.author_codes
+        authors = len(dataset.authors)
+
+        self.dataset = dataset
+        self.window = window
+        self.order = np.argsort(codes, kind='stable').astype(np.int32)
+        self.counts = np.bincount(codes, minlength=authors)
+        self.text_counts = np.bincount(codes[dataset.has_text], minlength=authors)
+        self.offsets = np.zeros(authors + 1, dtype=np.int64)
+        np.cumsum(self.counts, out=self.offsets[1:])
+
+        # Per-author minimum and maximum over each author's block of rows
+        self.first_seen = np.zeros(authors, dtype=np.int64)
+        self.last_seen = np.zeros(authors, dtype=np.int64)
+        seen = np.flatnonzero(self.counts)
+        if len(seen):
+            grouped = dataset.seconds[self.order]
+            self.first_seen[seen] = np.minimum.reduceat(grouped, self.offsets[seen])
+            self.last_seen[seen] = np.maximum.reduceat(grouped, self.offsets[seen])
+
+        # Sparse histogram: (author, bin) pairs with their counts, grouped by author
+        text_rows = self.order[dataset.has_text[self.order]]
+        bins = dataset.seconds[text_rows].astype(np.int64) // window
+        # Shifted to start at 0: comments sent before the stream started have negative times
+        first_bin = int(bins.min()) if len(bins) else 0
+        bins -= first_bin
+        span = int(bins.max()) + 1 if len(bins) else 1
+        keys, bin_counts = np.unique(codes[text_rows].astype(np.int64) * span + bins, return_counts=True)
+        self.histogram_bins = keys % span + first_bin
+        self.histogram_counts = bin_counts
+        self.histogram_offsets = np.zeros(authors + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys // span, minlength=authors), out=self.histogram_offsets[1:])
+
+        self._codes = {}
+        for code, author in enumerate(dataset.authors.tolist()):
+            self._codes.setdefault(author, code)
+
+        for array in (self.order, self.counts, self.text_counts, self.offsets, self.first_seen, self.last_seen,
+                      self.histogram_bins, self.histogram_counts, self.histogram_offsets):
+            array.flags.writeable = False
+
+    def code(self, author):
+        """Author code of a name, or None when the author has no comments."""
+        return self._codes.get(author)
+
+    def rows(self, author, with_text=False):
+        """
+        Rows of an author, in file order.
+
+        Args:
+            author (str | int): Author name or code.
+            with_text (bool): Only the comments with text.
+
+        Returns:
+            np.ndarray: Row indices.
+        """
+        code = author if isinstance(author, (int, np.integer)) else self.code(author)
+        if code is None:
+            return np.zeros(0, dtype=np.int32)
+        rows = self.order[self.offsets[code]:self.offsets[code + 1]]
+        if with_text:
+            rows = rows[self.dataset.has_text[rows]]
+        return rows
+
+    def histogram(self, author, window=None):
+        """
+        Comments with text of an author per time window, from the first to the last non-empty window.
+
+        Args:
+            author (str | int): Author name or code.
+            window (int, optional): Seconds per bin; the precomputed bins are used for the index's window.
+
+        Returns:
+            tuple: (starts, counts): start second of each bin and its number of comments.
+        """
+        window = window or self.window
+        code = author if isinstance(author, (int, np.integer)) else self.code(author)
+        if code is None:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+        if window == self.window:
+            first, last = self.histogram_offsets[code], self.histogram_offsets[code + 1]
+            bins, counts = self.histogram_bins[first:last], self.histogram_counts[first:last]
+        else:
+            bins, counts = np.unique(self.dataset.seconds[self.rows(code, with_text=True)].astype(np.int64) // window, return_counts=True)
+        if len(bins) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+        # Empty bins between the first and the last are kept, as a resample would
+        dense = np.zeros(int(bins[-1] - bins[0]) + 1, dtype=np.int64)
+        dense[bins - bins[0]] = counts
+        return (bins[0] + np.arange(len(dense))) * window, dense
+
+
+def get_author_index(dataset):
+    """
+    Returns the author index of a dataset, building it on first use.
+
+    Args:
+        dataset (CommentDataset): The dataset.
+
+    Returns:
+        AuthorIndex: The cached index for this dataset version.
+    """
+    return dataset.cached('author_index', lambda: AuthorIndex(dataset))
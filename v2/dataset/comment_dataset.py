@@ -0,0 +1,447 @@
+import json
+import itertools
+from collections.abc import Mapping, Sequence
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from v1.chat_log import read_chat_log
+from v1.timestamps import comment_elapsed_seconds, format_elapsed
+
+TOXIC_TYPES = [
+    'toxicity',
+    'severe_toxicity',
+    'obscene',
+    'identity_attack',
+    'insult',
+    'threat',
+    'sexual_explicit'
+]
+
+SENTIMENTS = ['NEG', 'NEU', 'POS']
+SENTIMENT_CODES = {sentiment: code for code, sentiment in enumerate(SENTIMENTS)}
+NO_SENTIMENT = -1
+
+# Fields stored in dedicated columns; anything else goes to `extras`.
+# 'time_in_seconds' and 'timestamp' were derived fields written by older pages.
+_COLUMN_FIELDS = {'id', 'time_elapsed', 'elapsed_s', 'author', 'message', 'sentiment', 'scream_index', 'time_in_seconds', 'timestamp', *TOXIC_TYPES}
+_MISSING = object()
+_versions = itertools.count(1)
+
+
+class CommentDataset(Sequence):
+    """
+    Columnar, read-only comments dataset.
+
+    Each field is held once as a typed array instead of one dict per comment.
+    Aggregations read the arrays directly; legacy code that iterates over
+    comments gets lightweight `CommentRow` mappings built on demand.
+
+    Attributes:
+        seconds (np.ndarray): int32 seconds since the stream start.
+        author_codes (np.ndarray): int32 index of each comment's author in `authors`.
+        authors (np.ndarray): Distinct author names, in order of first appearance.
+        messages (np.ndarray): Message strings.
+        ids (np.ndarray): Comment ids (None when missing).
+        toxicity (np.ndarray): n x 7 float32 Detoxify scores, ordered as TOXIC_TYPES; NaN when missing.
+        sentiment (np.ndarray): int8 sentiment code (index in SENTIMENTS), NO_SENTIMENT when missing.
+        scream_index (np.ndarray): float32 scream index; NaN when missing.
+        has_text (np.ndarray): bool, message is not blank.
+        extras (dict): Any other field, as object arrays.
+        version (str): Identifies this dataset's content, used as cache key.
+        source (str): Absolute path of the file it was loaded from, when shared through the registry.
+    """
+
+    def __init__(self, seconds, author_codes, authors, messages, ids, toxicity, sentiment, scream_index, extras=None, version=None, has_text=None):
+        self.seconds = seconds
+        self.author_codes = author_codes
+        self.authors = authors
+        self.messages = messages
+        self.ids = ids
+        self.toxicity = toxicity
+        self.sentiment = sentiment
+        self.scream_index = scream_index
+        self.extras = extras or {}
+        if has_text is None:
+            has_text = np.fromiter((bool(message.strip()) for message in messages), dtype=bool, count=len(messages))
+        self.has_text = has_text
+        self.version = version or f'dataset-{next(_versions)}'
+        self.source = None
+        self._cache = {}
+
+        for array in (self.seconds, self.author_codes, self.messages, self.ids, self.toxicity, self.sentiment, self.scream_index, self.has_text, *self.extras.values()):
+            array.flags.writeable = False
+
+    @classmethod
+    def from_records(cls, records, version=None):
+        """
+        Builds the dataset from a list of comment dicts (the comments.json format).
+
+        Args:
+            records (list[dict]): Comments as loaded from JSON.
+            version (str, optional): Cache key for this content.
+
+        Returns:
+            CommentDataset: The columnar dataset.
+        """
+        n = len(records)
+        seconds = np.empty(n, dtype=np.int32)
+        author_codes = np.empty(n, dtype=np.int32)
+        messages = np.empty(n, dtype=object)
+        ids = np.empty(n, dtype=object)
+        toxicity = np.full((n, len(TOXIC_TYPES)), np.nan, dtype=np.float32)
+        sentiment = np.full(n, NO_SENTIMENT, dtype=np.int8)
+        scream_index = np.full(n, np.nan, dtype=np.float32)
+        extras = {}
+        author_lookup = {}
+
+        for i, record in enumerate(records):
+            seconds[i] = comment_elapsed_seconds(record)
+            author = record.get('author') or ''
+            code = author_lookup.get(author)
+            if code is None:
+                code = author_lookup[author] = len(author_lookup)
+            author_codes[i] = code
+            messages[i] = record.get('message') or ''
+            ids[i] = record.get('id')
+
+            for j, toxic_type in enumerate(TOXIC_TYPES):
+                score = record.get(toxic_type)
+                if score is not None:
+                    toxicity[i, j] = score
+            sentiment[i] = SENTIMENT_CODES.get(record.get('sentiment'), NO_SENTIMENT)
+            if record.get('scream_index') is not None:
+                scream_index[i] = record['scream_index']
+
+            for key in record.keys() - _COLUMN_FIELDS:
+                if key not in extras:
+                    extras[key] = np.full(n, _MISSING, dtype=object)
+                extras[key][i] = record[key]
+
+        authors = np.array(list(author_lookup), dtype=object)
+        return cls(seconds, author_codes, authors, messages, ids, toxicity, sentiment, scream_index, extras, version)
+
+    @classmethod
+    def from_arrow(cls, table, version=None):
+        """
+        Builds the dataset from a table written by `to_arrow`.
+
+        Numeric columns are used without copying, so a table read from a
+        memory-mapped file keeps them in the shared page cache.
+
+        Args:
+            table (pa.Table): Table in the `to_arrow` layout.
+            version (str, optional): Cache key for this content.
+
+        Returns:
+            CommentDataset: The columnar dataset.
+        """
+        n = table.num_rows
+
+        def column(name):
+            chunked = table.column(name)
+            return chunked.chunk(0) if chunked.num_chunks == 1 else chunked.combine_chunks()
+
+        authors = column('author')
+        toxicity = column('toxicity').flatten().to_numpy(zero_copy_only=False).reshape(n, len(TOXIC_TYPES))
+
+        extras = {}
+        for name in table.column_names:
+            if name.startswith('extra:'):
+                values = np.empty(n, dtype=object)
+                for i, value in enumerate(column(name).to_pylist()):
+                    values[i] = _MISSING if value is None else json.loads(value)
+                extras[name[len('extra:'):]] = values
+
+        return cls(
+            column('seconds').to_numpy(zero_copy_only=False),
+            authors.indices.to_numpy(zero_copy_only=False),
+            authors.dictionary.to_numpy(zero_copy_only=False),
+            column('message').to_numpy(zero_copy_only=False),
+            column('id').to_numpy(zero_copy_only=False),
+            toxicity,
+            column('sentiment').to_numpy(zero_copy_only=False),
+            column('scream_index').to_numpy(zero_copy_only=False),
+            extras,
+            version
+        )
+
+    def extend(self, records, version=None):
+        """
+        Returns a new dataset with the given comments appended after these rows.
+
+        Only the new records are parsed; the existing columns are concatenated
+        as they are. Authors already seen keep their codes, new ones are
+        numbered after them. This dataset is left unchanged.
+
+        Args:
+            records (list[dict]): Comments to append, in the comments.json format.
+            version (str, optional): Cache key for the new content.
+
+        Returns:
+            CommentDataset: The extended dataset.
+        """
+        tail = CommentDataset.from_records(records)
+
+        author_lookup = {}
+        for author in itertools.chain(self.authors.tolist(), tail.authors.tolist()):
+            author_lookup.setdefault(author, len(author_lookup))
+        tail_codes = np.array([author_lookup[author] for author in tail.authors.tolist()], dtype=np.int32)
+
+        extras = {}
+        for key in dict.fromkeys([*self.extras, *tail.extras]):
+            extras[key] = np.concatenate([
+                self.extras.get(key, np.full(len(self), _MISSING, dtype=object)),
+                tail.extras.get(key, np.full(len(tail), _MISSING, dtype=object))
+            ])
+
+        return CommentDataset(
+            np.concatenate([self.seconds, tail.seconds]),
+            np.concatenate([self.author_codes, tail_codes[tail.author_codes]]),
+            np.array(list(author_lookup), dtype=object),
+            np.concatenate([self.messages, tail.messages]),
+            np.concatenate([self.ids, tail.ids]),
+            np.concatenate([self.toxicity, tail.toxicity]),
+            np.concatenate([self.sentiment, tail.sentiment]),
+            np.concatenate([self.scream_index, tail.scream_index]),
+            extras,
+            version,
+            np.concatenate([self.has_text, tail.has_text])
+        )
+
+    def to_arrow(self):
+        """
+        Converts the columns to an Arrow table (see `from_arrow`).
+
+        Returns:
+            pa.Table: One row per comment; author is dictionary-encoded, toxicity a fixed-size list.
+        """
+        columns = {
+            'seconds': pa.array(self.seconds, type=pa.int32()),
+            'author': pa.DictionaryArray.from_arrays(pa.array(self.author_codes, type=pa.int32()), pa.array(self.authors, type=pa.string())),
+            'message': pa.array(self.messages, type=pa.string()),
+            'id': pa.array(self.ids, type=pa.string()),
+            'toxicity': pa.FixedSizeListArray.from_arrays(pa.array(self.toxicity.ravel(), type=pa.float32()), len(TOXIC_TYPES)),
+            'sentiment': pa.array(self.sentiment, type=pa.int8()),
+            'scream_index': pa.array(self.scream_index, type=pa.float32())
+        }
+        # Extra fields may hold any JSON value, so they are stored encoded
+        for key, values in self.extras.items():
+            columns[f'extra:{key}'] = pa.array([None if value is _MISSING else json.dumps(value, ensure_ascii=False) for value in values], type=pa.string())
+        return pa.table(columns)
+
+    def __len__(self):
+        return len(self.messages)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.view(np.arange(len(self))[index])
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return CommentRow(self, index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield CommentRow(self, index)
+
+    @property
+    def indices(self):
+        return np.arange(len(self))
+
+    @property
+    def dataset(self):
+        return self
+
+    def view(self, indices):
+        """
+        Returns the comments at the given row indices, without copying columns.
+
+        Args:
+            indices (np.ndarray): Row indices.
+
+        Returns:
+            CommentView: A sequence of rows over this dataset.
+        """
+        return CommentView(self, np.asarray(indices, dtype=np.int64))
+
+    def cached(self, key, factory):
+        """
+        Memoizes a derived structure for this dataset version.
+
+        Args:
+            key (hashable): Cache key, usually a name plus its parameters.
+            factory (callable): Builds the value on a cache miss.
+
+        Returns:
+            The cached value.
+        """
+        if key not in self._cache:
+            self._cache[key] = factory()
+        return self._cache[key]
+
+    def to_pandas(self, indices=None):
+        """
+        Builds a DataFrame with one row per comment (all of them, or the given indices).
+
+        Returns:
+            pd.DataFrame: Columns in the comments.json layout.
+        """
+        if indices is None:
+            indices = self.indices
+        seconds = self.seconds[indices]
+
+        frame = {
+            'id': self.ids[indices],
+            'time_elapsed': [format_elapsed(int(second)) for second in seconds],
+            'elapsed_s': seconds,
+            'author': pd.Categorical.from_codes(self.author_codes[indices], categories=pd.Index(self.authors, dtype=object)),
+            'message': self.messages[indices]
+        }
+        for j, toxic_type in enumerate(TOXIC_TYPES):
+            if not np.isnan(self.toxicity[:, j]).all():
+                frame[toxic_type] = self.toxicity[indices, j]
+        if (self.sentiment != NO_SENTIMENT).any():
+            codes = self.sentiment[indices]
+            frame['sentiment'] = np.where(codes == NO_SENTIMENT, None, np.array(SENTIMENTS, dtype=object)[codes])
+        if not np.isnan(self.scream_index).all():
+            frame['scream_index'] = self.scream_index[indices]
+        for key, values in self.extras.items():
+            column = values[indices]
+            frame[key] = np.where(column == _MISSING, None, column)
+
+        return pd.DataFrame(frame)
+
+
+class CommentView(Sequence):
+    """
+    A subset of a dataset's rows (e.g. a peak or a filter result).
+
+    Attributes:
+        dataset (CommentDataset): The underlying dataset.
+        indices (np.ndarray): Row indices into the dataset.
+    """
+
+    def __init__(self, dataset, indices):
+        self.dataset = dataset
+        self.indices = indices
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return CommentView(self.dataset, self.indices[index])
+        return CommentRow(self.dataset, int(self.indices[index]))
+
+    def __iter__(self):
+        for index in self.indices:
+            yield CommentRow(self.dataset, int(index))
+
+    def view(self, indices):
+        return CommentView(self.dataset, self.indices[indices])
+
+    def to_pandas(self):
+        return self.dataset.to_pandas(self.indices)
+
+
+class CommentRow(Mapping):
+    """Read-only dict-like view of one comment, for code written against list[dict]."""
+
+    __slots__ = ('_dataset', '_index')
+
+    def __init__(self, dataset, index):
+        self._dataset = dataset
+        self._index = index
+
+    def _fields(self):
+        dataset, i = self._dataset, self._index
+        yield 'id', dataset.ids[i]
+        yield 'time_elapsed', format_elapsed(int(dataset.seconds[i]))
+        yield 'elapsed_s', int(dataset.seconds[i])
+        yield 'author', dataset.authors[dataset.author_codes[i]]
+        yield 'message', dataset.messages[i]
+        for j, toxic_type in enumerate(TOXIC_TYPES):
+            score = dataset.toxicity[i, j]
+            if not np.isnan(score):
+                yield toxic_type, float(score)
+        if dataset.sentiment[i] != NO_SENTIMENT:
+            yield 'sentiment', SENTIMENTS[dataset.sentiment[i]]
+        if not np.isnan(dataset.scream_index[i]):
+            yield 'scream_index', float(dataset.scream_index[i])
+        for key, values in dataset.extras.items():
+            if values[i] is not _MISSING:
+                yield key, values[i]
+
+    def __getitem__(self, key):
+        dataset, i = self._dataset, self._index
+        # Fast paths for the fields legacy code reads the most
+        if key == 'message':
+            return dataset.messages[i]
+        if key == 'author':
+            return dataset.authors[dataset.author_codes[i]]
+        if key == 'time_elapsed':
+            return format_elapsed(int(dataset.seconds[i]))
+        if key == 'elapsed_s':
+            return int(dataset.seconds[i])
+        for field, value in self._fields():
+            if field == key:
+                return value
+        raise KeyError(key)
+
+    def __iter__(self):
+        return (field for field, _ in self._fields())
+
+    def __len__(self):
+        return sum(1 for _ in self._fields())
+
+    def __repr__(self):
+        return repr(dict(self._fields()))
+
+
+def load_comments(path, version=None):
+    """
+    Loads a comments.json file (or the collector's comments.jsonl log) into a CommentDataset.
+
+    Args:
+        path (str): Path to the JSON array or JSONL log of comments.
+        version (str, optional): Cache key for this content.
+
+    Returns:
+        CommentDataset: The columnar dataset.
+    """
+    if path.endswith('.jsonl'):
+        return CommentDataset.from_records(list(read_chat_log(path)), version)
+    with open(path, encoding='utf-8') as json_file:
+        return CommentDataset.from_records(json.load(json_file), version)
+
+
+def as_dataset(data):
+    """
+    Returns comments as a CommentDataset, converting a plain list of comment dicts
+    (e.g. the Detoxify page's results) or a view.
+
+    Args:
+        data: A CommentDataset, a CommentView, a list of comment dicts or None.
+
+    Returns:
+        CommentDataset: The dataset (None when `data` is None).
+    """
+    if data is None or isinstance(data, CommentDataset):
+        return data
+    return CommentDataset.from_records(list(data))
+
+
+def resolve_rows(data):
+    """
+    Splits dataset-backed data into (dataset, indices) so callers can use the columns.
+
+    Args:
+        data: A CommentDataset, a CommentView or a plain list of comment dicts.
+
+    Returns:
+        tuple: (dataset, indices), or (None, None) for plain lists.
+    """
+    if isinstance(data, (CommentDataset, CommentView)):
+        return data.dataset, data.indices
+    return None, None
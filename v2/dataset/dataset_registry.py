@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+import pyarrow as pa
+from v1.chat_log import read_chat_log_tail
+from v2.dataset.comment_dataset import CommentDataset, load_comments
+
+# Process-wide registry of loaded datasets. Every Streamlit session asks the
+# registry for the file it wants and keeps only a reference, so 20 analysts on
+# the same comments.json share one parsed copy instead of holding 20.
+#
+# Parsed files are also cached as Arrow IPC files in <input dir>/.cache. Those
+# are opened memory-mapped, so the numeric columns of a dataset live in the OS
+# page cache and are shared by every worker process reading the same file.
+#
+# The collector's .jsonl log is append-only and changes on every poll, so it
+# skips the Arrow cache: each new version parses only the lines appended after
+# the previous one and extends that dataset's columns.
+
+CACHE_DIR = '.cache'
+MAX_UPLOADS = 8  # Uploaded datasets kept for reuse; sessions holding an evicted one keep their reference
+_datasets = {}
+_log_offsets = {}  # .jsonl source -> byte offset right after the rows of its registered dataset
+_uploads = OrderedDict()  # Least recently used first
+_lock = threading.Lock()
+
+
+def source_version(path):
+    """
+    Identifies the current content of a file by path, size and modification time.
+
+    Args:
+        path (str): Path to the comments file.
+
+    Returns:
+        str: The version key, which changes whenever the file is rewritten.
+    """
+    stat = os.stat(path)
+    return f'{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}'
+
+
+def _cache_path(path, version):
+    digest = hashlib.blake2b(version.encode('utf-8'), digest_size=8).hexdigest()
+    return os.path.join(os.path.dirname(path), CACHE_DIR, f'{os.path.basename(path)}.{digest}.arrow')
+
+
+def _read_cache(cache_path, version):
+    try:
+        source = pa.memory_map(cache_path, 'r')
+        table = pa.ipc.open_file(source).read_all()
+    except (OSError, pa.ArrowInvalid):
+        return None
+    return CommentDataset.from_arrow(table, version)
+
+
+def _write_cache(path, cache_path, dataset):
+    cache_dir = os.path.dirname(cache_path)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    tmp_path = f'{cache_path}.tmp'
+    table = dataset.to_arrow()
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, cache_path)
+
+    # Caches of older versions of the same file are no longer needed
+    prefix = f'{os.path.basename(path)}.'
+    for name in os.listdir(cache_dir):
+        old_path = os.path.join(cache_dir, name)
+        if name.startswith(prefix) and name.endswith('.arrow') and old_path != cache_path:
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+
+
+def _load(path, version):
+    cache_path = _cache_path(path, version)
+    dataset = _read_cache(cache_path, version)
+    if dataset is not None:
+        return dataset
+
+    dataset = load_comments(path, version)
+    try:
+        _write_cache(path, cache_path, dataset)
+    except OSError as e:
+        # Without the cache the dataset is still shared inside this process
+        print(f"Could not write the dataset cache {cache_path}: {e}")
+        return dataset
+
+    # Re-read from the mapped file so the columns are backed by the shared pages
+    mapped = _read_cache(cache_path, version)
+    return mapped if mapped is not None else dataset
+
+
+def _load_log(path, previous, version):
+    offset = _log_offsets.get(path, 0) if previous is not None else 0
+    if offset > os.path.getsize(path):
+        # Truncated or replaced log: parse it again from the start
+        previous, offset = None, 0
+
+    records, _log_offsets[path] = read_chat_log_tail(path, offset)
+    if previous is None:
+        return CommentDataset.from_records(records, version)
+    if not records:
+        # Only a partial line or a touch: the rows, and everything derived from them, are the same
+        previous.version = version
+        return previous
+    return previous.extend(records, version)
+
+
+def get_dataset(path):
+    """
+    Returns the shared dataset for a comments.json or comments.jsonl file.
+
+    The file is parsed once per version (path + size + mtime); later calls,
+    from any session, get the same read-only object. A newer version of a
+    .jsonl log only parses the lines appended since the previous one.
+
+    Args:
+        path (str): Path to the comments file.
+
+    Returns:
+        CommentDataset: The shared dataset.
+    """
+    version = source_version(path)
+    key = os.path.abspath(path)
+
+    with _lock:
+        dataset = _datasets.get(key)
+        if dataset is None or dataset.version != version:
+            # Sessions still holding the previous version keep their reference
+            if key.endswith('.jsonl'):
+                dataset = _datasets[key] = _load_log(key, dataset, version)
+            else:
+                dataset = _datasets[key] = _load(path, version)
+            dataset.source = key
+        return dataset
+
+
+def get_uploaded_dataset(content):
+    """
+    Returns the shared dataset for an uploaded comments.json, keyed by its content hash.
+
+    Only the `MAX_UPLOADS` most recently used uploads stay in the registry, so
+    replacing uploads does not grow the process memory without bound.
+
+    Args:
+        content (bytes): The uploaded file content.
+
+    Returns:
+        CommentDataset: The shared dataset.
+    """
+    key = f'upload:{hashlib.blake2b(content, digest_size=16).hexdigest()}'
+
+    with _lock:
+        dataset = _uploads.get(key)
+        if dataset is None:
+            dataset = _uploads[key] = CommentDataset.from_records(json.loads(content.decode('utf-8')), key)
+            while len(_uploads) > MAX_UPLOADS:
+                _uploads.popitem(last=False)
+        else:
+            _uploads.move_to_end(key)
+        return dataset
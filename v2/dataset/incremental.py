@@ -0,0 +1,42 @@
+import threading
+
+# Latest accumulator of each append-only source (the collector's .jsonl log) and
+# name, carried forward when the file grows instead of counting it again
+_accumulators = {}
+_lock = threading.Lock()
+
+
+def _continues(accumulator, dataset):
+    # The new version must keep every counted row; the log only grows by appends
+    if accumulator.rows > len(dataset):
+        return False
+    return accumulator.rows == 0 or dataset.ids[accumulator.rows - 1] == accumulator.last_id
+
+
+def accumulate(dataset, name, factory):
+    """
+    Brings an accumulator up to date with a dataset and returns its snapshot.
+
+    For datasets loaded from a .jsonl log, a newer version that only appended
+    comments continues the accumulator of the previous one and feeds it just
+    the new rows. Any other dataset gets a fresh accumulator.
+
+    Args:
+        dataset (CommentDataset): The dataset.
+        name: Identifies the accumulator among those kept for the same source.
+        factory (callable): Creates an empty accumulator, an object with `rows`,
+            `last_id`, `update(dataset, start)` and `snapshot()`.
+
+    Returns:
+        The accumulator's snapshot, taken before any later version can change it.
+    """
+    source = dataset.source if dataset.source and dataset.source.endswith('.jsonl') else None
+    with _lock:
+        accumulator = _accumulators.get((source, name)) if source else None
+        if accumulator is None or not _continues(accumulator, dataset):
+            accumulator = factory()
+        accumulator.update(dataset, accumulator.rows)
+        # A session still on an older version must not replace the newer totals
+        if source and accumulator.rows >= getattr(_accumulators.get((source, name)), 'rows', 0):
+            _accumulators[(source, name)] = accumulator
+        return accumulator.snapshot()
@@ -0,0 +1,171 @@
+import re
+from bisect import bisect_left
+from functools import reduce
+import numpy as np
+from v2.dataset.tokens import get_tokens, normalize_messages
+
+PREFIX_WILDCARD = '*'  # "gol*" matches every word starting with "gol"
+SNIPPET_WIDTH = 40  # Characters kept on each side of the keyword
+
+
+class InvertedIndex:
+    """
+    Word -> rows that contain it, in CSR layout: the rows of vocabulary entry w
+    are `postings[offsets[w]:offsets[w + 1]]`, sorted and without repeats.
+
+    Attributes:
+        dataset (CommentDataset): The indexed dataset.
+        vocabulary (np.ndarray): The words, as in the dataset's tokens.
+        offsets (np.ndarray): int64, len(vocabulary) + 1 positions into `postings`.
+        postings (np.ndarray): int32 row indices.
+    """
+
+    def __init__(self, dataset):
+        tokens = get_tokens(dataset)
+        rows = max(len(tokens), 1)
+
+        # Sorting (word, row) pairs as one integer key groups the rows of each word, in order
+        keys = np.unique(tokens.ids.astype(np.int64) * rows + tokens.rows)
+        words = keys // rows
+
+        self.dataset = dataset
+        self.vocabulary = tokens.vocabulary
+        self.postings = (keys % rows).astype(np.int32)
+        self.offsets = np.zeros(len(self.vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(words, minlength=len(self.vocabulary)), out=self.offsets[1:])
+        self.postings.flags.writeable = False
+        self.offsets.flags.writeable = False
+
+        self._ids = {word: index for index, word in enumerate(self.vocabulary.tolist())}
+        # Vocabulary in alphabetical order, for prefix ranges
+        self._sorted_ids = np.argsort(self.vocabulary, kind='stable')
+        self._sorted_words = self.vocabulary[self._sorted_ids].tolist()
+
+    def rows(self, word):
+        """
+        Rows containing the word (exact match, after the usual normalization).
+
+        Returns:
+            np.ndarray: Sorted row indices.
+        """
+        index = self._ids.get(word.lower())
+        if index is None:
+            return np.zeros(0, dtype=np.int32)
+        return self.postings[self.offsets[index]:self.offsets[index + 1]]
+
+    def prefix_rows(self, prefix):
+        """
+        Rows containing a word that starts with `prefix`.
+
+        Returns:
+            np.ndarray: Sorted row indices.
+        """
+        prefix = prefix.lower()
+        first = bisect_left(self._sorted_words, prefix)
+        last = bisect_left(self._sorted_words, prefix + '\U0010ffff')
+        ids = self._sorted_ids[first:last]
+        if len(ids) == 0:
+            return np.zeros(0, dtype=np.int32)
+        if len(ids) == 1:
+            return self.rows(self.vocabulary[ids[0]])
+        return np.unique(np.concatenate([self.postings[self.offsets[index]:self.offsets[index + 1]] for index in ids]))
+
+    def term_rows(self, term):
+        """Rows for one query term: a word, or a prefix ending in `*`."""
+        if term.endswith(PREFIX_WILDCARD):
+            return self.prefix_rows(term.rstrip(PREFIX_WILDCARD))
+        return self.rows(term)
+
+    def search(self, query, match_all=True, start=None, end=None):
+        """
+        Finds the rows matching a query.
+
+        Args:
+            query (str): Words separated by spaces; a word ending in `*` is a prefix.
+            match_all (bool): True to require every word (AND), False for any of them (OR).
+            start (int, optional): First second of the time range (inclusive).
+            end (int, optional): Last second of the time range (exclusive), as in `TimeIndex`.
+
+        Returns:
+            np.ndarray: Sorted row indices.
+        """
+        terms = parse_query(query)
+        if not terms:
+            return np.zeros(0, dtype=np.int32)
+
+        # Shortest lists first, so each intersection works on as few rows as possible
+        postings = sorted((self.term_rows(term) for term in terms), key=len)
+        if match_all:
+            rows = reduce(lambda left, right: np.intersect1d(left, right, assume_unique=True), postings)
+        else:
+            rows = reduce(np.union1d, postings)
+
+        if start is not None or end is not None:
+            seconds = self.dataset.seconds[rows]
+            keep = np.ones(len(rows), dtype=bool)
+            if start is not None:
+                keep &= seconds >= start
+            if end is not None:
+                keep &= seconds < end
+            rows = rows[keep]
+        return rows
+
+
+def parse_query(query):
+    """
+    Splits a query into terms with the same normalization as the messages.
+
+    Returns:
+        list[str]: The terms, in order, without repeats.
+    """
+    words = normalize_messages([query])[0]
+    return list(dict.fromkeys(word for word in words if word.rstrip(PREFIX_WILDCARD)))
+
+
+def keyword_in_context(message, terms, width=SNIPPET_WIDTH):
+    """
+    Cuts the part of a message around the first query term, with the term in brackets.
+
+    Args:
+        message (str): The message.
+        terms (list[str]): Terms from `parse_query`.
+        width (int): Characters kept on each side of the term.
+
+    Returns:
+        str: The snippet, e.g. "…que [gol] bonito…"; the start of the message when no term is found.
+    """
+    patterns = [
+        re.escape(term.rstrip(PREFIX_WILDCARD)) + (r'\S*' if term.endswith(PREFIX_WILDCARD) else '')
+        for term in terms
+    ]
+    if not patterns:
+        return message[:2 * width]
+    # Whole words first, then anywhere (e.g. a word stuck to an :emoji: code)
+    match = (
+        re.search(r'(?<!\S)(?:' + '|'.join(patterns) + r')(?!\S)', message, re.IGNORECASE)
+        or re.search('|'.join(patterns), message, re.IGNORECASE)
+    )
+    if match is None:
+        return message[:2 * width]
+
+    start, end = match.span()
+    before = message[max(start - width, 0):start]
+    after = message[end:end + width]
+    return (
+        ('…' if start > width else '') + before
+        + f'[{match.group(0)}]'
+        + after + ('…' if end + width < len(message) else '')
+    )
+
+
+def get_inverted_index(dataset):
+    """
+    Returns the inverted index of a dataset, building it on first use.
+
+    Args:
+        dataset (CommentDataset): The dataset.
+
+    Returns:
+        InvertedIndex: The cached index for this dataset version.
+    """
+    return dataset.cached('inverted_index', lambda: InvertedIndex(dataset))
@@ -0,0 +1,85 @@
+import numpy as np
+
+
+class TimeIndex:
+    """
+    Comments sorted by time, for O(log n + k) range queries.
+
+    Built once per dataset version (see `get_time_index`) and shared by every
+    page that needs "the comments between two timestamps".
+
+    Attributes:
+        dataset (CommentDataset): The indexed dataset.
+        order (np.ndarray): Row indices sorted by time (stable, so ties keep file order).
+        seconds (np.ndarray): The dataset's seconds, in `order`.
+    """
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+        self.order = np.argsort(dataset.seconds, kind='stable')
+        self.seconds = dataset.seconds[self.order]
+        self.order.flags.writeable = False
+        self.seconds.flags.writeable = False
+
+    def __len__(self):
+        return len(self.order)
+
+    @property
+    def min_time(self):
+        return int(self.seconds[0]) if len(self) else 0
+
+    @property
+    def max_time(self):
+        return int(self.seconds[-1]) if len(self) else 0
+
+    def bounds(self, start=None, end=None):
+        """
+        Positions in `order` of the comments with start <= seconds < end.
+
+        Args:
+            start (float, optional): Inclusive start in seconds; None for the beginning.
+            end (float, optional): Exclusive end in seconds; None for the end.
+
+        Returns:
+            tuple: (first, last) positions, as a slice of `order`.
+        """
+        first = 0 if start is None else int(np.searchsorted(self.seconds, start, side='left'))
+        last = len(self) if end is None else int(np.searchsorted(self.seconds, end, side='left'))
+        return first, max(first, last)
+
+    def count(self, start=None, end=None):
+        """Number of comments with start <= seconds < end."""
+        first, last = self.bounds(start, end)
+        return last - first
+
+    def range(self, start=None, end=None):
+        """
+        Row indices of the comments with start <= seconds < end, in time order.
+
+        Returns:
+            np.ndarray: A read-only slice of `order` (no copy).
+        """
+        first, last = self.bounds(start, end)
+        return self.order[first:last]
+
+    def view(self, start=None, end=None):
+        """
+        The comments with start <= seconds < end.
+
+        Returns:
+            CommentView: Rows of the dataset, in time order.
+        """
+        return self.dataset.view(self.range(start, end))
+
+
+def get_time_index(dataset):
+    """
+    Returns the time index of a dataset, building it on first use.
+
+    Args:
+        dataset (CommentDataset): The dataset.
+
+    Returns:
+        TimeIndex: The cached index for this dataset version.
+    """
+    return dataset.cached('time_index', lambda: TimeIndex(dataset))
@@ -0,0 +1,191 @@
+import re
+from itertools import chain
+import numpy as np
+import pandas as pd
+from nltk.corpus import stopwords
+
+EMOJI_PATTERN = re.compile(r':[a-zA-Z0-9-]+:')  # YouTube emoji codes in the text, e.g. :face-with-tears-of-joy:
+STOPWORDS_LANGUAGE = 'portuguese'
+_SEPARATOR = '\x01'  # Not whitespace for str.split, and numpy keeps it in comparisons (unlike \x00)
+
+
+def normalize_messages(messages):
+    """
+    Splits messages into words the way the word clouds and top words always did:
+    lowercase, without :emoji: codes, split on whitespace.
+
+    Args:
+        messages (list[str]): The messages.
+
+    Returns:
+        list[list[str]]: The words of each message.
+    """
+    # Lowercase and emoji removal run once over the joined text instead of once per message
+    text = EMOJI_PATTERN.sub('', _SEPARATOR.join(messages).lower())
+    segments = text.split(_SEPARATOR)
+    if len(segments) != len(messages):
+        # A message with the separator in it; fall back to one message at a time
+        segments = [EMOJI_PATTERN.sub('', message.lower()) for message in messages]
+    return [segment.split() for segment in segments]
+
+
+def stopword_flags(words, language=STOPWORDS_LANGUAGE):
+    """
+    Marks the words that are stopwords in the given language.
+
+    Args:
+        words (np.ndarray): Normalized words.
+        language (str): Stopwords language.
+
+    Returns:
+        np.ndarray: bool per word.
+    """
+    stop_words = set(stopwords.words(language))
+    return np.fromiter((word in stop_words for word in words), dtype=bool, count=len(words))
+
+
+def _tokenize(messages):
+    """Word counts per message, word ids and the vocabulary, with a single split of the joined text."""
+    # The separator becomes a word of its own between messages, so its positions give the message boundaries
+    words = EMOJI_PATTERN.sub('', f' {_SEPARATOR} '.join(messages).lower()).split()
+    codes, uniques = pd.factorize(np.array(words, dtype=object))
+    separator = np.flatnonzero(uniques == _SEPARATOR)
+    boundaries = np.flatnonzero(codes == separator[0]) if len(separator) else np.zeros(0, dtype=np.int64)
+
+    if len(boundaries) != max(len(messages) - 1, 0):
+        # A message with the separator in it; fall back to one message at a time
+        message_words = normalize_messages(messages)
+        lengths = np.fromiter((len(row) for row in message_words), dtype=np.int64, count=len(message_words))
+        codes, uniques = pd.factorize(np.array(list(chain.from_iterable(message_words)), dtype=object))
+        return lengths, codes, uniques
+
+    lengths = np.diff(np.concatenate(([-1], boundaries, [len(codes)]))) - 1 if len(messages) else np.zeros(0, dtype=np.int64)
+    if len(separator):
+        codes = codes[codes != separator[0]]
+        codes[codes > separator[0]] -= 1
+        uniques = np.delete(np.asarray(uniques, dtype=object), separator[0])
+    return lengths, codes, uniques
+
+
+class TokenizedMessages:
+    """
+    Word ids of every message, in CSR layout: the words of row i are
+    `ids[offsets[i]:offsets[i + 1]]`, as indices into `vocabulary`.
+
+    Attributes:
+        vocabulary (np.ndarray): Distinct words, in order of first appearance.
+        offsets (np.ndarray): int64, n + 1 positions into `ids`.
+        ids (np.ndarray): int32 word id of every word of every message.
+        rows (np.ndarray): int32 row of each entry of `ids`.
+        is_word (np.ndarray): bool per vocabulary entry, has at least one letter or digit.
+    """
+
+    def __init__(self, messages):
+        lengths, codes, uniques = _tokenize(messages)
+        self.vocabulary = np.asarray(uniques, dtype=object)
+        self.ids = codes.astype(np.int32)
+        self.offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self.offsets[1:])
+        self.rows = np.repeat(np.arange(len(lengths), dtype=np.int32), lengths)
+        self.is_word = np.fromiter((any(char.isalnum() for char in word) for word in self.vocabulary), dtype=bool, count=len(self.vocabulary))
+        self._stopwords = {}
+
+        for array in (self.vocabulary, self.ids, self.offsets, self.rows, self.is_word):
+            array.flags.writeable = False
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def stopword_flags(self, language=STOPWORDS_LANGUAGE):
+        """
+        Marks the vocabulary entries that are stopwords in the given language.
+
+        Returns:
+            np.ndarray: bool per vocabulary entry, computed once per language.
+        """
+        if language not in self._stopwords:
+            self._stopwords[language] = stopword_flags(self.vocabulary, language)
+        return self._stopwords[language]
+
+    def row_ids(self, rows=None):
+        """Word ids of the given rows (all rows when None)."""
+        if rows is None:
+            return self.ids
+        rows = np.asarray(rows, dtype=np.int64)
+        lengths = self.offsets[rows + 1] - self.offsets[rows]
+        # Positions of every word of the selected rows, without a Python loop
+        starts = np.repeat(self.offsets[rows] - np.cumsum(lengths) + lengths, lengths)
+        return self.ids[starts + np.arange(lengths.sum())]
+
+    def counts(self, rows=None):
+        """
+        Occurrences of each vocabulary entry in the given rows.
+
+        Returns:
+            np.ndarray: int64 count per vocabulary entry.
+        """
+        if rows is not None and len(rows) == len(self):
+            # Every row (a view's rows are distinct), in whatever order: same counts
+            rows = None
+        return np.bincount(self.row_ids(rows), minlength=len(self.vocabulary))
+
+    def top_words(self, rows=None, n=10, language=STOPWORDS_LANGUAGE):
+        """
+        Most frequent words of the given rows, stopwords excluded.
+
+        Returns:
+            pd.Series: Counts indexed by word, highest first (like value_counts).
+        """
+        counts = self.counts(rows)
+        counts[self.stopword_flags(language)] = 0
+        top = np.argsort(-counts, kind='stable')[:n]
+        top = top[counts[top] > 0]
+        return pd.Series(counts[top], index=pd.Index(self.vocabulary[top], dtype=object), name='count')
+
+    def frequencies(self, rows=None, language=STOPWORDS_LANGUAGE):
+        """
+        Word frequencies for a word cloud: stopwords and punctuation-only tokens excluded.
+
+        Returns:
+            dict: Word -> count.
+        """
+        counts = self.counts(rows)
+        keep = np.flatnonzero((counts > 0) & self.is_word & ~self.stopword_flags(language))
+        return dict(zip(self.vocabulary[keep].tolist(), counts[keep].tolist()))
+
+
+def get_tokens(dataset):
+    """
+    Returns the tokenized messages of a dataset, building them on first use.
+
+    Args:
+        dataset (CommentDataset): The dataset.
+
+    Returns:
+        TokenizedMessages: The cached tokens for this dataset version.
+    """
+    return dataset.cached('tokens', lambda: TokenizedMessages(dataset.messages))
+
+
+def tokenize_rows(dataset, start=0):
+    """
+    Words of the dataset rows from `start` onwards.
+
+    From the first row the dataset's cached tokens are used; a later `start`
+    (the rows appended to a .jsonl log) splits just those messages, without
+    building the tokens of the whole file.
+
+    Args:
+        dataset (CommentDataset): The dataset.
+        start (int): First row to tokenize.
+
+    Returns:
+        tuple: (rows, ids, vocabulary): the row of each word, its id, and the
+        distinct words in order of first appearance.
+    """
+    if start == 0:
+        tokens = get_tokens(dataset)
+        return tokens.rows, tokens.ids, tokens.vocabulary
+    lengths, codes, uniques = _tokenize(dataset.messages[start:])
+    rows = start + np.repeat(np.arange(len(lengths), dtype=np.int64), lengths)
+    return rows, codes, np.asarray(uniques, dtype=object)
@@ -0,0 +1,78 @@
+import numpy as np
+from v2.dataset.comment_dataset import TOXIC_TYPES
+
+TOXIC_THRESHOLD = 0.7  # Scores above this count as toxic
+ANY_TOXIC_TYPE = 'any'  # Highest of the seven toxic scores of each comment
+
+
+class SortedScores:
+    """
+    A score column sorted once, for threshold queries by binary search.
+
+    Comments without a score (NaN) are left out.
+
+    Attributes:
+        order (np.ndarray): Row indices sorted by score (ascending, stable).
+        scores (np.ndarray): The scores, in `order`.
+    """
+
+    def __init__(self, values):
+        rows = np.flatnonzero(~np.isnan(values))
+        order = np.argsort(values[rows], kind='stable')
+        self.order = rows[order]
+        self.scores = values[self.order]
+        self.order.flags.writeable = False
+        self.scores.flags.writeable = False
+
+    def __len__(self):
+        return len(self.order)
+
+    def _position(self, threshold):
+        return np.searchsorted(self.scores, threshold, side='right')
+
+    def count_above(self, threshold):
+        """Number of comments with a score strictly above the threshold."""
+        return len(self) - int(self._position(threshold))
+
+    def rows_above(self, threshold):
+        """
+        Row indices of the comments with a score strictly above the threshold.
+
+        Returns:
+            np.ndarray: A slice of `order`, from the lowest to the highest score (no copy).
+        """
+        return self.order[self._position(threshold):]
+
+    def curve(self, thresholds):
+        """
+        Number of comments above each threshold.
+
+        Args:
+            thresholds (np.ndarray): Thresholds to evaluate.
+
+        Returns:
+            np.ndarray: Counts, one per threshold.
+        """
+        return len(self) - self._position(np.asarray(thresholds))
+
+
+def get_sorted_scores(dataset, column):
+    """
+    Returns a score column of the dataset sorted for threshold queries, building it on first use.
+
+    Args:
+        dataset (CommentDataset): The dataset.
+        column (str): One of TOXIC_TYPES, ANY_TOXIC_TYPE or 'scream_index'.
+
+    Returns:
+        SortedScores: The cached sorted column.
+    """
+    def build():
+        if column == 'scream_index':
+            return SortedScores(dataset.scream_index)
+        if column == ANY_TOXIC_TYPE:
+            # fmax ignores NaN and, unlike nanmax, does not warn on rows without any score
+            return SortedScores(np.fmax.reduce(dataset.toxicity, axis=1))
+        return SortedScores(dataset.toxicity[:, TOXIC_TYPES.index(column)])
+
+    return dataset.cached(('sorted_scores', column), build)
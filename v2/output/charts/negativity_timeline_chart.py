@@ -0,0 +1,35 @@
+import plotly.graph_objects as go
+from v2.output.charts.negativity_gauge_meter import seconds_to_time_str
+
+def create_negativity_timeline_chart(points, cumulative, rolling, window_minutes, selected=None):
+    """
+    Creates a line chart with the level of negativity over the stream.
+
+    Args:
+        points (list[int]): Seconds of each point.
+        cumulative (list[float]): Negativity (%) from the start up to each point.
+        rolling (list[float]): Negativity (%) in the last `window_minutes` before each point.
+        window_minutes (int): Length of the rolling window, for the legend.
+        selected (tuple, optional): Selected (start, end) range in seconds, highlighted on the chart.
+
+    Returns:
+        plotly.graph_objects.Figure: A Plotly line chart figure.
+    """
+    labels = [seconds_to_time_str(int(point)) for point in points]
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=labels, y=list(rolling), mode='lines', name=f'Last {window_minutes} min', line={'color': 'lightcoral'}))
+    fig.add_trace(go.Scatter(x=labels, y=list(cumulative), mode='lines', name='Since the start', line={'color': '#d62728'}))
+
+    if isinstance(selected, tuple):
+        fig.add_vrect(x0=seconds_to_time_str(selected[0]), x1=seconds_to_time_str(selected[1]), fillcolor='gray', opacity=0.2, line_width=0)
+
+    fig.update_layout(
+        title='Level of Negativity over Time',
+        xaxis_title='Time',
+        yaxis_title='Negativity (%)',
+        yaxis={'range': [0, 100]},
+        template='plotly_white'
+    )
+
+    return fig
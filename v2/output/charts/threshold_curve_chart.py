@@ -0,0 +1,30 @@
+import plotly.graph_objects as go
+
+def create_threshold_curve_chart(thresholds, curves, selected=None, title='Comments above Threshold'):
+    """
+    Creates a line chart with the number of comments above each score threshold.
+
+    Args:
+        thresholds (list[float]): Thresholds on the x axis.
+        curves (dict): Score names as keys and the count above each threshold as values.
+        selected (float, optional): Current threshold, marked with a vertical line.
+        title (str): Chart title.
+
+    Returns:
+        plotly.graph_objects.Figure: A Plotly line chart figure.
+    """
+    fig = go.Figure()
+    for name, counts in curves.items():
+        fig.add_trace(go.Scatter(x=list(thresholds), y=list(counts), mode='lines', name=name))
+
+    if selected is not None:
+        fig.add_vline(x=selected, line_dash='dash', line_color='gray')
+
+    fig.update_layout(
+        title=title,
+        xaxis_title='Threshold',
+        yaxis_title='Comments',
+        template='plotly_white'
+    )
+
+    return fig
@@ -1,31 +1,35 @@
 import json
+from v2.dataset.comment_dataset import CommentDataset, TOXIC_TYPES, resolve_rows
+from v2.dataset.toxicity import TOXIC_THRESHOLD, ANY_TOXIC_TYPE, get_sorted_scores
 
-def get_all_toxic_type_count(data):
+def get_all_toxic_type_count(data, threshold=TOXIC_THRESHOLD):
     """
     Counts occurrences of each toxic type from a JSON file.
     
     Args:
-        data (list [dict]): The JSON data with comments
+        data (list [dict] | CommentDataset): The JSON data with comments
+        threshold (float): Only count toxic types with index above this value.
         
     Returns:
-        dict: A dictionary with toxic types as keys and their counts as values.
+        float: The share of comments with at least one toxic type above the threshold.
     """
-    toxic_types = {
-        'toxicity': 0,
-        'severe_toxicity': 0,
-        'obscene': 0,
-        'identity_attack': 0,
-        'insult': 0,
-        'threat': 0,
-        'sexual_explicit': 0
-    }
+    if isinstance(data, CommentDataset):
+        # A comment is above the threshold in some type when its highest score is
+        any_count = get_sorted_scores(data, ANY_TOXIC_TYPE).count_above(threshold)
+        return any_count / len(data) if len(data) else 0.0
+
+    dataset, indices = resolve_rows(data)
+    if dataset is not None:
+        if len(indices) == 0:
+            return 0.0
+        return float((dataset.toxicity[indices] > threshold).any(axis=1).mean())
 
     toxic_types_count = 0
 
     for item in data:
-        for toxic_type in toxic_types.keys():
-            if item.get(toxic_type, 0) > 0.7:  # Only count toxic types with index above 0.7
+        for toxic_type in TOXIC_TYPES:
+            if item.get(toxic_type, 0) > threshold:  # Only count toxic types with index above the threshold
                 toxic_types_count += 1
                 break
 
-    return toxic_types_count/data.__len__() if data else 0.0
\ No newline at end of file
+    return toxic_types_count/data.__len__() if data else 0.0
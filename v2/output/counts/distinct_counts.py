@@ -0,0 +1,191 @@
+import numpy as np
+import pandas as pd
+from v2.dataset.incremental import accumulate
+from v2.dataset.tokens import tokenize_rows
+from v2.output.counts.windowed import WINDOW, WindowedTracker
+
+PRECISION = 14  # 2**14 registers (16 KB): relative standard error 1.04 / sqrt(2**14), about 0.8%
+EXACT_LIMIT = 2048  # Up to this many distinct items the 64-bit hashes themselves are kept (16 KB), so counts are exact
+
+
+def hash_values(values):
+    """
+    64-bit hashes of strings, the same in every process, so counters of
+    different streams and dashboard workers can be merged.
+
+    Returns:
+        np.ndarray: uint64 hash of each value.
+    """
+    return pd.util.hash_array(np.asarray(values, dtype=object))
+
+
+def _bit_length(values):
+    # frexp gives the exponent exactly for integers below 2**53
+    return np.frexp(values.astype(np.float64))[1]
+
+
+def _registers(hashes, precision):
+    # HyperLogLog: the first bits pick a register, which keeps the longest run of leading zeros seen in the rest
+    rest_bits = 64 - precision
+    buckets = (hashes >> np.uint64(rest_bits)).astype(np.intp)
+    rest = hashes & np.uint64((1 << rest_bits) - 1)
+    ranks = (rest_bits - _bit_length(rest) + 1).astype(np.uint8)
+    registers = np.zeros(1 << precision, dtype=np.uint8)
+    np.maximum.at(registers, buckets, ranks)
+    return registers
+
+
+class DistinctCounter:
+    """
+    Number of distinct items, exact while small and HyperLogLog past `EXACT_LIMIT`.
+
+    In HyperLogLog mode the count has a relative standard error of
+    1.04 / sqrt(2**precision) (about 0.8% for the default precision, so
+    within 1.6% for 95% of the counts) and memory stays at 2**precision bytes
+    however many items are added. Counters are immutable; `merge` returns a
+    new one, and merging gives the count of the union of the items.
+
+    Attributes:
+        precision (int): log2 of the number of registers.
+        hashes (np.ndarray): Sorted distinct hashes in exact mode, else None.
+        registers (np.ndarray): uint8 registers in HyperLogLog mode, else None.
+    """
+
+    def __init__(self, precision=PRECISION, hashes=None, registers=None):
+        self.precision = precision
+        self.registers = registers
+        self.hashes = np.zeros(0, dtype=np.uint64) if hashes is None and registers is None else hashes
+
+    @classmethod
+    def from_hashes(cls, hashes, precision=PRECISION):
+        """
+        Builds a counter from item hashes (see `hash_values`); repeats are fine.
+        """
+        hashes = np.unique(np.asarray(hashes, dtype=np.uint64))
+        if len(hashes) <= EXACT_LIMIT:
+            return cls(precision, hashes=hashes)
+        return cls(precision, registers=_registers(hashes, precision))
+
+    @property
+    def exact(self):
+        """True while the counter still holds every distinct hash."""
+        return self.registers is None
+
+    @property
+    def relative_error(self):
+        """Relative standard error of `count` (0 in exact mode)."""
+        return 0.0 if self.exact else 1.04 / np.sqrt(1 << self.precision)
+
+    def merge(self, other):
+        """
+        Combines two counters of the same precision.
+
+        Returns:
+            DistinctCounter: Counter of the items of both.
+        """
+        if self.precision != other.precision:
+            raise ValueError(f"Cannot merge counters of precision {self.precision} and {other.precision}")
+        if self.exact and other.exact:
+            return DistinctCounter.from_hashes(np.union1d(self.hashes, other.hashes), self.precision)
+        left = self.registers if not self.exact else _registers(self.hashes, self.precision)
+        right = other.registers if not other.exact else _registers(other.hashes, other.precision)
+        return DistinctCounter(self.precision, registers=np.maximum(left, right))
+
+    def count(self):
+        """
+        Returns:
+            int: The number of distinct items (estimated in HyperLogLog mode).
+        """
+        if self.exact:
+            return len(self.hashes)
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Few items for the number of registers: linear counting is more accurate
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+
+class DistinctTracker(WindowedTracker):
+    """
+    Distinct items of a comment stream: a `DistinctCounter` for the whole
+    stream and one per time window, so the distinct items of any time range
+    are counted by merging window counters.
+    """
+
+    def __init__(self, batch, window=WINDOW):
+        super().__init__(batch, lambda hashes, counts, whole: DistinctCounter.from_hashes(hashes), window)
+
+    def counter(self, start=None, end=None):
+        """
+        Counter of a time range, merged from the windows it overlaps.
+
+        Args:
+            start (int, optional): First second of the range; the range is widened to whole windows.
+            end (int, optional): End of the range in seconds (exclusive).
+
+        Returns:
+            DistinctCounter: The counter (the whole stream when no range is given).
+        """
+        return self.summary(start, end)
+
+    def count(self, start=None, end=None):
+        """Number of distinct items, overall or in a time range."""
+        return self.counter(start, end).count()
+
+
+def author_batch(dataset, start):
+    """Authors of the rows from `start` onwards, as hashes."""
+    return dataset.seconds[start:].astype(np.int64), dataset.author_codes[start:], hash_values(dataset.authors)
+
+
+def word_batch(dataset, start):
+    """Words of the rows from `start` onwards, with the normalization of `v2.dataset.tokens`, as hashes."""
+    rows, ids, vocabulary = tokenize_rows(dataset, start)
+    return dataset.seconds[rows].astype(np.int64), ids, hash_values(vocabulary)
+
+
+class DistinctAuthors(DistinctTracker):
+    """Distinct comment authors."""
+
+    def __init__(self, **kwargs):
+        super().__init__(author_batch, **kwargs)
+
+
+class DistinctWords(DistinctTracker):
+    """Distinct words, with the normalization of `v2.dataset.tokens`."""
+
+    def __init__(self, **kwargs):
+        super().__init__(word_batch, **kwargs)
+
+
+def get_distinct_authors(dataset):
+    """
+    Returns the distinct-authors tracker of a dataset, computed once per dataset version.
+
+    Counts are exact up to `EXACT_LIMIT` distinct authors and HyperLogLog
+    estimates past that; the tracker's counters can be merged with those of
+    other streams.
+
+    Args:
+        dataset (CommentDataset): The dataset.
+
+    Returns:
+        DistinctAuthors: A snapshot of the tracker.
+    """
+    return dataset.cached('distinct_authors', lambda: accumulate(dataset, 'distinct_authors', DistinctAuthors))
+
+
+def get_distinct_words(dataset):
+    """
+    Returns the distinct-words tracker of a dataset, computed once per dataset version.
+
+    Args:
+        dataset (CommentDataset): The dataset.
+
+    Returns:
+        DistinctWords: A snapshot of the tracker.
+    """
+    return dataset.cached('distinct_words', lambda: accumulate(dataset, 'distinct_words', DistinctWords))
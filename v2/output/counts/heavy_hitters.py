@@ -0,0 +1,191 @@
+import heapq
+from functools import partial
+import numpy as np
+from v2.dataset.incremental import accumulate
+from v2.dataset.tokens import STOPWORDS_LANGUAGE, stopword_flags, tokenize_rows
+from v2.output.counts.windowed import WINDOW, WindowedTracker
+
+WINDOW_CAPACITY = 1000  # Items kept per window
+TOTAL_CAPACITY = 100000  # Items kept for the whole stream; below this many distinct items the counts are exact
+
+
+class SpaceSaving:
+    """
+    Space-Saving summary of item counts, with at most `capacity` items.
+
+    While no more than `capacity` distinct items were seen the counts are
+    exact. Past that, only the largest counts are kept: each kept count is an
+    upper bound at most `errors[item]` above the true count, and any item not
+    kept occurred at most `floor` times. Summaries are immutable; `merge`
+    returns a new one, so they can be shared between dataset versions.
+
+    Attributes:
+        capacity (int): Maximum number of items kept.
+        counts (dict): Item -> estimated count, in order of first appearance.
+        errors (dict): Item -> maximum overestimate (only nonzero entries).
+        floor (int): Maximum count of an item not in `counts`.
+    """
+
+    def __init__(self, capacity, counts=None, errors=None, floor=0):
+        self.capacity = capacity
+        self.counts = counts or {}
+        self.errors = errors or {}
+        self.floor = floor
+
+    @classmethod
+    def from_counts(cls, items, counts, capacity):
+        """
+        Builds a summary from exact counts (e.g. one batch of comments).
+
+        Args:
+            items (list): Distinct items, in order of first appearance.
+            counts (list[int]): Count of each item.
+            capacity (int): Maximum number of items kept.
+        """
+        return cls._truncated(dict(zip(items, counts)), {}, 0, capacity)
+
+    @classmethod
+    def _truncated(cls, counts, errors, floor, capacity):
+        if len(counts) > capacity:
+            values = np.fromiter(counts.values(), dtype=np.int64, count=len(counts))
+            order = np.argsort(-values, kind='stable')
+            floor = max(floor, int(values[order[capacity]]))
+            keep = np.zeros(len(values), dtype=bool)
+            keep[order[:capacity]] = True
+            # Kept items stay in order of first appearance, so ties still break the same way
+            counts = {item: count for (item, count), kept in zip(counts.items(), keep.tolist()) if kept}
+            errors = {item: error for item, error in errors.items() if item in counts}
+        return cls(capacity, counts, errors, floor)
+
+    @property
+    def exact(self):
+        """True when every count is exact (nothing was ever dropped)."""
+        return self.floor == 0
+
+    def __len__(self):
+        return len(self.counts)
+
+    def bounds(self, item):
+        """Lowest and highest possible count of an item."""
+        if item in self.counts:
+            return self.counts[item] - self.errors.get(item, 0), self.counts[item]
+        return 0, self.floor
+
+    def merge(self, other):
+        """
+        Combines two summaries, as if their items had been counted together.
+
+        An item missing from one side may have occurred up to that side's
+        `floor` times, so that much is added to its count and to its error.
+
+        Returns:
+            SpaceSaving: The merged summary, with the capacity of `self`.
+        """
+        counts = {}
+        errors = {}
+        for summary, rest in ((self, other), (other, self)):
+            for item, count in summary.counts.items():
+                if item in counts:
+                    continue
+                if item in rest.counts:
+                    counts[item] = count + rest.counts[item]
+                    error = summary.errors.get(item, 0) + rest.errors.get(item, 0)
+                else:
+                    counts[item] = count + rest.floor
+                    error = summary.errors.get(item, 0) + rest.floor
+                if error:
+                    errors[item] = error
+        return SpaceSaving._truncated(counts, errors, self.floor + other.floor, self.capacity)
+
+    def top(self, n=10):
+        """
+        Returns the items with the largest counts, highest first (earliest first on ties).
+
+        Returns:
+            list: (item, count) pairs.
+        """
+        return heapq.nlargest(n, self.counts.items(), key=lambda entry: entry[1])
+
+
+class TopKTracker(WindowedTracker):
+    """
+    Heavy hitters of a comment stream: a `SpaceSaving` summary for the whole
+    stream and one per time window, so the top items of any time range are
+    assembled by merging a few window summaries.
+    """
+
+    def __init__(self, batch, window=WINDOW, window_capacity=WINDOW_CAPACITY, total_capacity=TOTAL_CAPACITY):
+        self.window_capacity = window_capacity
+        self.total_capacity = total_capacity
+        super().__init__(batch, self._summarize, window)
+
+    def _summarize(self, items, counts, whole):
+        return SpaceSaving.from_counts(items.tolist(), counts.tolist(), self.total_capacity if whole else self.window_capacity)
+
+    def top(self, n=10, start=None, end=None):
+        """
+        Returns the most frequent items, overall or in a time range.
+
+        Returns:
+            list: (item, count) pairs, highest first.
+        """
+        return self.summary(start, end).top(n)
+
+
+def word_batch(dataset, start, language=STOPWORDS_LANGUAGE):
+    """Words of the rows from `start` onwards, stopwords excluded, with the normalization of `v2.dataset.tokens`."""
+    rows, ids, vocabulary = tokenize_rows(dataset, start)
+    keep = ~stopword_flags(vocabulary, language)[ids]
+    return dataset.seconds[rows[keep]].astype(np.int64), ids[keep], vocabulary
+
+
+def author_batch(dataset, start):
+    """Authors of the comments with text from `start` onwards."""
+    rows = start + np.flatnonzero(dataset.has_text[start:])
+    return dataset.seconds[rows].astype(np.int64), dataset.author_codes[rows], np.asarray(dataset.authors, dtype=object)
+
+
+class WordTracker(TopKTracker):
+    """Top words, stopwords excluded, with the normalization of `v2.dataset.tokens`."""
+
+    def __init__(self, language=STOPWORDS_LANGUAGE, **kwargs):
+        super().__init__(partial(word_batch, language=language), **kwargs)
+        self.language = language
+
+
+class AuthorTracker(TopKTracker):
+    """Top authors by number of comments with text."""
+
+    def __init__(self, **kwargs):
+        super().__init__(author_batch, **kwargs)
+
+
+def get_word_tracker(dataset, language=STOPWORDS_LANGUAGE):
+    """
+    Returns the top-words tracker of a dataset, computed once per dataset version.
+
+    Counts are exact while fewer than `TOTAL_CAPACITY` distinct words were
+    seen (`WINDOW_CAPACITY` per window); past that only the frequent words are kept.
+
+    Args:
+        dataset (CommentDataset): The dataset.
+        language (str): Stopwords language.
+
+    Returns:
+        WordTracker: A snapshot of the tracker.
+    """
+    name = ('word_tracker', language)
+    return dataset.cached(name, lambda: accumulate(dataset, name, lambda: WordTracker(language)))
+
+
+def get_author_tracker(dataset):
+    """
+    Returns the top-authors tracker of a dataset, computed once per dataset version.
+
+    Args:
+        dataset (CommentDataset): The dataset.
+
+    Returns:
+        AuthorTracker: A snapshot of the tracker.
+    """
+    return dataset.cached('author_tracker', lambda: accumulate(dataset, 'author_tracker', AuthorTracker))
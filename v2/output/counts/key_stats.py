@@ -0,0 +1,92 @@
+import numpy as np
+from v1.member_count import NEW_MEMBER_MESSAGE
+from v2.dataset.comment_dataset import SENTIMENTS, TOXIC_TYPES
+from v2.dataset.incremental import accumulate
+from v2.dataset.tokens import tokenize_rows
+from v2.dataset.toxicity import TOXIC_THRESHOLD
+from v2.output.counts.distinct_counts import get_distinct_authors, get_distinct_words
+
+
+class StatsAccumulator:
+    """
+    Running totals for the Stats page, updated with each new batch of rows.
+
+    Attributes:
+        rows (int): Rows of the dataset already counted.
+        last_id (str): Id of the last counted row, to check that a newer dataset only appended rows.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.last_id = None
+        self.total_words = 0
+        self.new_members = 0
+        self.sentiments = np.zeros(len(SENTIMENTS), dtype=np.int64)
+        self.toxic = 0
+
+    def update(self, dataset, start=0):
+        """
+        Adds the dataset rows from `start` onwards to the totals.
+
+        Args:
+            dataset (CommentDataset): The dataset.
+            start (int): First row not counted yet.
+        """
+        # Same words as the word clouds and top words
+        self.total_words += len(tokenize_rows(dataset, start)[1])
+        self.new_members += sum(1 for message in dataset.messages[start:] if NEW_MEMBER_MESSAGE in message)
+
+        codes = dataset.sentiment[start:]
+        self.sentiments += np.bincount(codes[codes >= 0], minlength=len(SENTIMENTS))
+        self.toxic += int((dataset.toxicity[start:, TOXIC_TYPES.index('toxicity')] > TOXIC_THRESHOLD).sum())
+
+        self.rows = len(dataset)
+        self.last_id = dataset.ids[-1] if len(dataset) else None
+
+    def snapshot(self):
+        """
+        Returns the current totals.
+
+        Returns:
+            dict: Totals and averages shown on the Stats page, except the distinct counts.
+        """
+        total_comments = self.rows
+        return {
+            'total_comments': total_comments,
+            'total_words': self.total_words,
+            'avg_words_per_comment': self.total_words / total_comments if total_comments else 0.0,
+            'new_members': self.new_members,
+            'sentiments': dict(zip(SENTIMENTS, self.sentiments.tolist())),
+            'toxic': self.toxic
+        }
+
+
+def get_key_stats(dataset):
+    """
+    Returns the Stats page KPIs of a dataset, computed once per dataset version.
+
+    Distinct authors and words come from `DistinctCounter`s: exact for small
+    datasets, HyperLogLog estimates (about 0.8% standard error) for large ones.
+
+    Args:
+        dataset (CommentDataset): The dataset.
+
+    Returns:
+        dict: See `StatsAccumulator.snapshot`, plus total_authors,
+        avg_comments_per_person, unique_words and distinct_error (the largest
+        relative standard error of the two distinct counts, 0 when both are exact).
+    """
+    def build():
+        stats = accumulate(dataset, 'key_stats', StatsAccumulator)
+        authors = get_distinct_authors(dataset).counter()
+        words = get_distinct_words(dataset).counter()
+        total_authors = authors.count()
+        stats.update({
+            'total_authors': total_authors,
+            'avg_comments_per_person': stats['total_comments'] / total_authors if total_authors else 0.0,
+            'unique_words': words.count(),
+            'distinct_error': max(authors.relative_error, words.relative_error)
+        })
+        return stats
+
+    return dataset.cached('key_stats', build)
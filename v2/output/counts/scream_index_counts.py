@@ -1,14 +1,20 @@
 import json
 import os
+import numpy as np
+from v2.dataset.comment_dataset import resolve_rows
 
 def scream_index_mean(data):
     """ Calculate the mean Scream Index from a JSON file.
     This function reads a JSON file containing objects with a 'scream_index' field,
     calculates the mean of these indices, and prints the result.
     """
+    dataset, indices = resolve_rows(data)
+    if dataset is not None:
+        scream_indices = dataset.scream_index[indices]
+        scream_indices = scream_indices[~np.isnan(scream_indices)]
+        return float(scream_indices.mean(dtype=np.float64)) if len(scream_indices) else 0.0
+
     scream_indices = [obj['scream_index'] for obj in data if 'scream_index' in obj]
     if scream_indices:
         return sum(scream_indices) / len(scream_indices)
     return 0.0
-
-    
\ No newline at end of file
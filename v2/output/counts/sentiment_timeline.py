@@ -0,0 +1,120 @@
+import numpy as np
+from v2.dataset.comment_dataset import SENTIMENTS, SENTIMENT_CODES, NO_SENTIMENT
+
+def sentiment_histogram(seconds, codes):
+    """
+    Per-second prefix sums of the comment count and of each sentiment.
+
+    One bincount covers every sentiment code: row 0 holds comments without
+    sentiment and row c + 1 the comments with code c.
+
+    Args:
+        seconds (np.ndarray): Seconds of each comment.
+        codes (np.ndarray): Sentiment code of each comment (NO_SENTIMENT when missing).
+
+    Returns:
+        tuple: (first second, prefix sums with shape (len(SENTIMENTS) + 1, duration + 1)).
+    """
+    first = int(seconds.min())
+    duration = int(seconds.max()) - first + 1
+    rows = len(SENTIMENTS) + 1
+
+    offsets = (codes.astype(np.int64) - NO_SENTIMENT) * duration + (seconds.astype(np.int64) - first)
+    histogram = np.bincount(offsets, minlength=rows * duration).reshape(rows, duration)
+
+    prefix = np.zeros((rows, duration + 1), dtype=np.int64)
+    np.cumsum(histogram, axis=1, out=prefix[:, 1:])
+    return first, prefix
+
+
+class SentimentTimeline:
+    """
+    Cumulative comment and sentiment counts indexed by second.
+
+    Any [start, end] range is answered with two lookups per row, so the
+    negativity gauge does not depend on the number of comments.
+
+    Attributes:
+        first (int): Second of the first comment.
+        prefix (np.ndarray): Prefix sums from `sentiment_histogram`.
+        totals (np.ndarray): Prefix sums of all comments.
+    """
+
+    def __init__(self, first, prefix):
+        self.first = first
+        self.prefix = prefix
+        self.totals = prefix.sum(axis=0)
+
+    @property
+    def duration(self):
+        return self.prefix.shape[1] - 1
+
+    def _positions(self, start, end):
+        # Inclusive [start, end] in seconds -> prefix positions, clipped to the stream
+        low = 0 if start is None else int(np.clip(start - self.first, 0, self.duration))
+        high = self.duration if end is None else int(np.clip(end - self.first + 1, 0, self.duration))
+        return low, max(low, high)
+
+    def count(self, start=None, end=None, sentiment=None):
+        """
+        Number of comments between start and end (inclusive, in seconds).
+
+        Args:
+            start (int, optional): First second; None for the beginning.
+            end (int, optional): Last second; None for the end.
+            sentiment (str, optional): Only count this sentiment (e.g. "NEG").
+
+        Returns:
+            int: The count.
+        """
+        low, high = self._positions(start, end)
+        row = self.totals if sentiment is None else self.prefix[SENTIMENT_CODES[sentiment] - NO_SENTIMENT]
+        return int(row[high] - row[low])
+
+    def percentage(self, sentiment, start=None, end=None):
+        """Share of the comments between start and end with the sentiment, from 0 to 100."""
+        total = self.count(start, end)
+        return self.count(start, end, sentiment) / total * 100 if total else 0.0
+
+    def curve(self, sentiment, step=60, window=None):
+        """
+        Share of the sentiment over time, for every `step` seconds.
+
+        Args:
+            sentiment (str): The sentiment (e.g. "NEG").
+            step (int): Seconds between points.
+            window (int, optional): Only the last `window` seconds before each point; None for everything so far.
+
+        Returns:
+            tuple: (seconds of each point, percentage at each point) as arrays.
+        """
+        points = np.arange(self.first, self.first + self.duration, step, dtype=np.int64)
+        if len(points) == 0 or points[-1] != self.first + self.duration - 1:
+            points = np.append(points, self.first + self.duration - 1)
+
+        high = points - self.first + 1
+        low = np.zeros_like(high) if window is None else np.maximum(high - window, 0)
+        row = self.prefix[SENTIMENT_CODES[sentiment] - NO_SENTIMENT]
+
+        totals = self.totals[high] - self.totals[low]
+        matches = row[high] - row[low]
+        percentages = np.divide(matches * 100, totals, out=np.zeros(len(points)), where=totals > 0)
+        return points, percentages
+
+
+def get_sentiment_timeline(dataset):
+    """
+    Returns the sentiment timeline of a dataset, building it on first use.
+
+    Args:
+        dataset (CommentDataset): The dataset.
+
+    Returns:
+        SentimentTimeline | None: The cached timeline, or None for an empty dataset.
+    """
+    def build():
+        if not len(dataset):
+            return None
+        return SentimentTimeline(*sentiment_histogram(dataset.seconds, dataset.sentiment))
+
+    return dataset.cached('sentiment_timeline', build)
@@ -1,23 +1,28 @@
 import json
 from collections import defaultdict
+import numpy as np
+from v2.dataset.comment_dataset import SENTIMENTS, resolve_rows
 
 def count_sentiment_types(data):
     """
     Counts occurrences of each sentiment type from a JSON file.
 
     Args:
-        data (list[dict]): JSON data with comments
+        data (list[dict] | CommentDataset): JSON data with comments
 
     Returns:
         dict: A dictionary with sentiment types as keys and their counts as values.
     """
-    sentiment_types_count = defaultdict(int)
+    dataset, indices = resolve_rows(data)
+    if dataset is not None:
+        codes = dataset.sentiment[indices]
+        codes = codes[codes >= 0]
+        # Keeps the keys in order of first occurrence, like the loop below
+        present, first_seen, counts = np.unique(codes, return_index=True, return_counts=True)
+        order = np.argsort(first_seen)
+        return {SENTIMENTS[present[i]]: int(counts[i]) for i in order}
 
-    sentiment_types = [
-        'NEU',
-        'POS',
-        'NEG'
-    ]
+    sentiment_types_count = defaultdict(int)
 
     for item in data:
         sentiment = item.get('sentiment')  # retorna None se não existir
@@ -1,31 +1,34 @@
 import json
 from collections import defaultdict
+from v2.dataset.comment_dataset import CommentDataset, TOXIC_TYPES, resolve_rows
+from v2.dataset.toxicity import TOXIC_THRESHOLD, get_sorted_scores
 
-def count_toxic_types(data):
+def count_toxic_types(data, threshold=TOXIC_THRESHOLD):
     """
     Counts occurrences of each toxic type from a JSON file.
 
     Args:
-        data (list [dict]): JSON data with comments.
+        data (list [dict] | CommentDataset): JSON data with comments.
+        threshold (float): Only count toxic types with index above this value.
 
     Returns:
         dict: A dictionary with toxic types as keys and their counts as values.
     """
-    toxic_types_count = defaultdict(int)
+    if isinstance(data, CommentDataset):
+        # Binary search on each pre-sorted score column
+        counts = {toxic_type: get_sorted_scores(data, toxic_type).count_above(threshold) for toxic_type in TOXIC_TYPES}
+        return {toxic_type: count for toxic_type, count in counts.items() if count}
+
+    dataset, indices = resolve_rows(data)
+    if dataset is not None:
+        counts = (dataset.toxicity[indices] > threshold).sum(axis=0)
+        return {toxic_type: int(count) for toxic_type, count in zip(TOXIC_TYPES, counts) if count}
 
-    toxic_types = [
-        'toxicity',
-        'severe_toxicity',
-        'obscene',
-        'identity_attack',
-        'insult',
-        'threat',
-        'sexual_explicit'
-    ]
+    toxic_types_count = defaultdict(int)
 
     for item in data:
         for toxic_type, index in item.items():
-            if toxic_type in toxic_types and index > 0.7:  # Only count toxic types with index above 0.7
+            if toxic_type in TOXIC_TYPES and index > threshold:  # Only count toxic types with index above the threshold
                 toxic_types_count[toxic_type] += 1
 
     return dict(toxic_types_count)
@@ -0,0 +1,91 @@
+from functools import reduce
+import numpy as np
+
+WINDOW = 300  # Seconds covered by each per-window summary
+
+
+class WindowedTracker:
+    """
+    Summaries of a comment stream, one for the whole stream and one per time
+    window, fed incrementally with new rows.
+
+    What is counted comes from `batch` and how it is summarized from
+    `summarize`; the summaries only need an immutable `merge`. A time range is
+    summarized by merging the windows it overlaps.
+
+    Attributes:
+        batch (callable): (dataset, start) -> (seconds, codes, items): the time
+            and item code of each occurrence in the rows from `start` onwards,
+            and the item of each code.
+        summarize (callable): (items, counts, whole) -> summary of exact
+            counts; `whole` is True for the summary of the whole stream.
+        rows (int): Rows of the dataset already counted.
+        last_id (str): Id of the last counted row.
+        window (int): Seconds covered by each window.
+        total: Summary of every counted row.
+        windows (dict): Window number (seconds // window) -> summary.
+    """
+
+    def __init__(self, batch, summarize, window=WINDOW):
+        self.batch = batch
+        self.summarize = summarize
+        self.rows = 0
+        self.last_id = None
+        self.window = window
+        self.total = self._empty(whole=True)
+        self.windows = {}
+
+    def _empty(self, whole=False):
+        return self.summarize(np.zeros(0, dtype=object), np.zeros(0, dtype=np.int64), whole)
+
+    def update(self, dataset, start=0):
+        """
+        Adds the dataset rows from `start` onwards to the summaries.
+
+        Args:
+            dataset (CommentDataset): The dataset.
+            start (int): First row not counted yet.
+        """
+        seconds, codes, items = self.batch(dataset, start)
+        if len(codes):
+            counts = np.bincount(codes, minlength=len(items))
+            present = np.flatnonzero(counts)
+            self.total = self.total.merge(self.summarize(items[present], counts[present], True))
+
+            # One exact count per (window, item), grouped by window
+            keys, counts = np.unique((seconds // self.window) * len(items) + codes, return_counts=True)
+            splits = np.flatnonzero(np.diff(keys // len(items))) + 1
+            for group_keys, group_counts in zip(np.split(keys, splits), np.split(counts, splits)):
+                number = int(group_keys[0] // len(items))
+                batch = self.summarize(items[group_keys % len(items)], group_counts, False)
+                self.windows[number] = self.windows[number].merge(batch) if number in self.windows else batch
+
+        self.rows = len(dataset)
+        self.last_id = dataset.ids[-1] if len(dataset) else None
+
+    def snapshot(self):
+        """Copy that later updates do not change (the summaries themselves are immutable)."""
+        copy = type(self).__new__(type(self))
+        copy.__dict__.update(self.__dict__)
+        copy.windows = dict(self.windows)
+        return copy
+
+    def summary(self, start=None, end=None):
+        """
+        Summary of a time range, merged from the windows it overlaps.
+
+        Args:
+            start (int, optional): First second of the range; the range is widened to whole windows.
+            end (int, optional): End of the range in seconds (exclusive).
+
+        Returns:
+            The summary (the whole stream when no range is given).
+        """
+        if start is None and end is None:
+            return self.total
+        first = -np.inf if start is None else start // self.window
+        last = np.inf if end is None else (end - 1) // self.window
+        selected = [self.windows[number] for number in sorted(self.windows) if first <= number <= last]
+        if not selected:
+            return self._empty()
+        return reduce(lambda merged, summary: merged.merge(summary), selected)
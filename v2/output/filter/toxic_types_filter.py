@@ -1,23 +1,35 @@
-def toxic_types_filter(dict_data: list, toxic_type: str) -> list:
+from v2.dataset.comment_dataset import CommentDataset, TOXIC_TYPES, resolve_rows
+from v2.dataset.toxicity import TOXIC_THRESHOLD, get_sorted_scores
+import numpy as np
+
+def toxic_types_filter(dict_data: list, toxic_type: str, threshold: float = TOXIC_THRESHOLD) -> list:
     """
     Filters the toxic types data based on the selected toxic type.
 
     Args:
-        dict_data (dict): A dictionary containing messages and their toxic type indexes.
+        dict_data (list | CommentDataset): Messages and their toxic type indexes.
         toxic_type (str): The toxic type to filter by.
+        threshold (float): Only keep messages with the toxic type index above this value.
 
     Returns:
-        dict: A dictionary containing all the messages above the toxic type index
+        list | CommentView: All the messages above the toxic type index
     """
-    
-    dict_filtered = []
-
     toxic_type = toxic_type.lower().replace(' ', '_')
 
+    if isinstance(dict_data, CommentDataset):
+        # The matching rows are a slice of the pre-sorted column, put back in file order
+        rows = get_sorted_scores(dict_data, toxic_type).rows_above(threshold)
+        return dict_data.view(np.sort(rows))
+
+    dataset, indices = resolve_rows(dict_data)
+    if dataset is not None:
+        selected = dataset.toxicity[indices, TOXIC_TYPES.index(toxic_type)] > threshold
+        return dataset.view(indices[selected])
+
+    dict_filtered = []
+
     for item in dict_data:
-        if item[toxic_type] > 0.7:
+        if item[toxic_type] > threshold:
             dict_filtered.append(item)
 
-    print(f"Filtered data for {toxic_type}: {dict_filtered.__len__()} items")
     return dict_filtered
-    
\ No newline at end of file
@@ -1,41 +1,83 @@
-def get_sentiments_peak(sentiment: str, dict_data: dict) -> list:
+import numpy as np
+from v1.timestamps import comment_elapsed_seconds
+from v2.dataset.comment_dataset import CommentDataset, SENTIMENT_CODES, NO_SENTIMENT, resolve_rows
+from v2.output.counts.sentiment_timeline import SentimentTimeline, sentiment_histogram, get_sentiment_timeline
+
+def find_sentiment_peaks(timeline, sentiment, window=300, stride=None, min_count=1, top=5):
     """
-    Get the peaks of sentiment over time.
+    Ranks time windows by the share of comments with the given sentiment.
 
     Args:
-        sentiment (str): The sentiment to analyze (e.g., "positive", "negative").
-        dict_data (dict): A dictionary containing timestamps and their corresponding sentiment values.
+        timeline (SentimentTimeline): Per-second cumulative counts.
+        sentiment (str): The sentiment to rank by (e.g. "POS", "NEG").
+        window (int): Window length in seconds.
+        stride (int, optional): Seconds between window starts; defaults to `window` (no overlap).
+        min_count (int): Windows with fewer comments are ignored.
+        top (int): Number of windows to return.
 
     Returns:
-        dict: A dictionary with timestamps as keys and sentiment values as values for the peaks.
+        list: The top windows, highest share first (earliest first on ties).
     """
-    min_time = dict_data[0]["time_in_seconds"]
-    max_time = dict_data[-1]["time_in_seconds"]
-
-    # Creates peaks of 5 minutes
-    peaks = []
-
-    start_time = min_time
-    while start_time < max_time:
-        end_time = start_time + 300
-        peak = {
-            "start_time": start_time,
-            "end_time": end_time,
-            "sentiment": 0,
-            "count": 0
+    stride = stride or window
+    first = timeline.first
+    duration = timeline.duration
+
+    # Same windows as before: starting at the first comment, while the start is before the last one
+    starts = np.arange(0, max(duration - 1, 0), stride, dtype=np.int64)
+    ends = np.minimum(starts + window, duration)
+
+    counts = timeline.totals[ends] - timeline.totals[starts]
+    row = timeline.prefix[SENTIMENT_CODES[sentiment] - NO_SENTIMENT]
+    matches = row[ends] - row[starts]
+
+    valid = np.flatnonzero(counts >= max(min_count, 1))
+    ratios = matches[valid] / counts[valid]
+    # Highest share first; ties keep the earliest window first
+    ranked = valid[np.lexsort((starts[valid], -ratios))][:top]
+
+    return [
+        {
+            "start_time": first + int(starts[index]),
+            "end_time": first + int(starts[index]) + window,
+            "sentiment": int(matches[index]),
+            "count": int(counts[index])
         }
-        for entry in dict_data:
-            if start_time <= entry["time_in_seconds"] < end_time:
-                if(entry.get("sentiment") == sentiment):
-                    peak["sentiment"] += 1
-                peak["count"] += 1
-        peak["start_time"] = start_time
-        peak["end_time"] = end_time
-        start_time = end_time
-        peaks.append(peak)
-
-    print(f"Peaks found: {peaks}")
-    # Returns the 5 highest peaks
-    highest_peaks = sorted(peaks, key=lambda x: (x["sentiment"]/x["count"] if x["count"] > 0 else 0), reverse=True)[:5]
-    print(f"Highest peaks: {highest_peaks}")
-    return highest_peaks
+        for index in ranked
+    ]
+
+def get_sentiments_peak(sentiment: str, dict_data: dict, window: int = 300, stride: int = None, min_count: int = 1, top: int = 5) -> list:
+    """
+    Get the peaks of sentiment over time.
+
+    Args:
+        sentiment (str): The sentiment to analyze (e.g., "POS", "NEG").
+        dict_data (list | CommentDataset): Comments with their sentiment values.
+        window (int): Window length in seconds.
+        stride (int, optional): Seconds between window starts; smaller than `window` gives sliding windows.
+        min_count (int): Minimum number of comments for a window to be ranked.
+        top (int): Number of peaks to return.
+
+    Returns:
+        list: The windows with the highest share of the sentiment.
+    """
+    if isinstance(dict_data, CommentDataset):
+        # The timeline is built once per dataset; each ranking is cached per parameters
+        timeline = get_sentiment_timeline(dict_data)
+        if timeline is None:
+            return []
+        return dict_data.cached(
+            ('sentiment_peaks', sentiment, window, stride, min_count, top),
+            lambda: find_sentiment_peaks(timeline, sentiment, window, stride, min_count, top)
+        )
+
+    dataset, indices = resolve_rows(dict_data)
+    if dataset is not None:
+        seconds = dataset.seconds[indices]
+        codes = dataset.sentiment[indices]
+    else:
+        seconds = np.fromiter((comment_elapsed_seconds(entry) for entry in dict_data), dtype=np.int64, count=len(dict_data))
+        codes = np.fromiter((SENTIMENT_CODES.get(entry.get("sentiment"), NO_SENTIMENT) for entry in dict_data), dtype=np.int8, count=len(dict_data))
+
+    if len(seconds) == 0:
+        return []
+    return find_sentiment_peaks(SentimentTimeline(*sentiment_histogram(seconds, codes)), sentiment, window, stride, min_count, top)
@@ -4,6 +4,8 @@ from wordcloud import WordCloud
 from nltk.corpus import stopwords
 import nltk
 import re
+from v2.dataset.comment_dataset import resolve_rows
+from v2.dataset.tokens import get_tokens
 
 def file_to_json(json_file):    
     with open(json_file, 'r', encoding='utf-8') as file:
@@ -12,8 +14,17 @@ def file_to_json(json_file):
 
 nltk.download('stopwords')
 
+OUTPUT_DIR = 'v2/output/wordclouds/images'
+
 def gerar_nuvem_palavras(json_data, complemento=''):
 
+    dataset, indices = resolve_rows(json_data)
+    if dataset is not None:
+        # Frequências das palavras já tokenizadas do dataset, sem re-separar as mensagens
+        frequencies = get_tokens(dataset).frequencies(indices)
+        wordcloud = WordCloud(background_color='white', width=1920, height=1080).generate_from_frequencies(frequencies)
+        return salvar_nuvem(wordcloud, complemento)
+
     all_words = []
 
     emoji_pattern = r':[a-zA-Z0-9-]+:'
@@ -28,9 +39,11 @@ def gerar_nuvem_palavras(json_data, complemento=''):
     stop_words = set(stopwords.words('portuguese'))
     wordcloud = WordCloud(stopwords=stop_words, background_color='white', width=1920, height=1080).generate(text)
 
-    output_dir = 'v2/output/wordclouds/images'
-    os.makedirs(output_dir, exist_ok=True)
-    output_file = os.path.join(output_dir, f'nuvem_palavras{complemento}.png')
+    return salvar_nuvem(wordcloud, complemento)
+
+def salvar_nuvem(wordcloud, complemento=''):
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    output_file = os.path.join(OUTPUT_DIR, f'nuvem_palavras{complemento}.png')
 
     wordcloud.to_file(output_file)
     print(f'Nuvem de palavras salva em: {output_file}')
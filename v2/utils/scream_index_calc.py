@@ -1,26 +1,129 @@
 import json
+import os
 import string
 import unicodedata
+from itertools import islice
+import numpy as np
+from v1.chat_log import ChatLogWriter, read_chat_log
+
+BATCH_SIZE = 10000  # Comments per batch in the JSONL streaming mode
+
+def _classify(codepoints):
+    """Flags (letter, uppercase letter) for each code point, as in the per-character version"""
+    letters = np.zeros(len(codepoints), dtype=bool)
+    uppers = np.zeros(len(codepoints), dtype=bool)
+    for index, codepoint in enumerate(codepoints):
+        char = chr(codepoint)
+        letters[index] = unicodedata.category(char).startswith('L')
+        uppers[index] = letters[index] and char.isupper()
+    return letters, uppers
+
+# Lookup tables for the Basic Multilingual Plane; the few code points above it are classified on demand
+_BMP_LETTERS, _BMP_UPPERS = _classify(range(0x10000))
+
+def scream_indices(messages):
+    """
+    Computes the scream index (uppercase letters / letters) of many messages at once.
+
+    The messages are joined and decoded to an array of code points, so the
+    letter and uppercase tests are table lookups over the whole column.
+
+    Args:
+        messages (list[str]): The messages.
+
+    Returns:
+        np.ndarray: float64 scream index of each message (0.0 when it has no letters).
+    """
+    lengths = np.fromiter((len(message) for message in messages), dtype=np.int64, count=len(messages))
+    text = ''.join(messages)
+    codepoints = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+
+    in_bmp = codepoints < 0x10000
+    letters = np.zeros(len(codepoints), dtype=bool)
+    uppers = np.zeros(len(codepoints), dtype=bool)
+    letters[in_bmp] = _BMP_LETTERS[codepoints[in_bmp]]
+    uppers[in_bmp] = _BMP_UPPERS[codepoints[in_bmp]]
+
+    if not in_bmp.all():
+        # Emojis and other astral characters: each distinct one is classified once
+        astral, inverse = np.unique(codepoints[~in_bmp], return_inverse=True)
+        astral_letters, astral_uppers = _classify(astral.tolist())
+        letters[~in_bmp] = astral_letters[inverse]
+        uppers[~in_bmp] = astral_uppers[inverse]
+
+    # Per-message totals from prefix sums (empty messages simply get 0)
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    letter_sums = np.concatenate(([0], np.cumsum(letters, dtype=np.int64)))
+    upper_sums = np.concatenate(([0], np.cumsum(uppers, dtype=np.int64)))
+    letter_counts = letter_sums[ends] - letter_sums[starts]
+    upper_counts = upper_sums[ends] - upper_sums[starts]
+
+    return np.divide(upper_counts, letter_counts, out=np.zeros(len(messages)), where=letter_counts > 0)
 
 def add_scream_index(json_file_path):
     with open(json_file_path, 'r', encoding='utf-8') as f:
         data = json.load(f)
-    for obj in data:
-        text = obj['message']
-        letters = [c for c in text if unicodedata.category(c).startswith('L')]
-        if letters:
-            scream_index = sum(1 for c in letters if c.isupper()) / len(letters)
-        else:
-            scream_index = 0.0
+    for obj, scream_index in zip(data, scream_indices([obj['message'] for obj in data]).tolist()):
         obj['scream_index'] = scream_index
     with open(json_file_path, 'w', encoding='utf-8') as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
 
+def add_scream_index_stream(input_path, output_path, batch_size=BATCH_SIZE):
+    """
+    Writes a copy of a finished JSONL file with the scream index of each comment,
+    one batch of comments at a time, so memory use depends on the batch size
+    and not on the file size.
+
+    The input is never rewritten in place: lines appended to it while it is
+    being read would be lost and byte offsets into it would no longer match.
+
+    Args:
+        input_path (str): JSONL file with one comment per line.
+        output_path (str): Where to write the result; must differ from the input.
+        batch_size (int): Comments per batch.
+
+    Returns:
+        int: Number of comments written.
+
+    Raises:
+        ValueError: If output_path is the input file.
+    """
+    if os.path.realpath(output_path) == os.path.realpath(input_path):
+        raise ValueError(f"output_path must differ from the input file: {input_path}")
+    tmp_path = f'{output_path}.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    written = 0
+    records = read_chat_log(input_path)
+    with ChatLogWriter(tmp_path, fsync_every=batch_size) as writer:
+        while True:
+            batch = list(islice(records, batch_size))
+            if not batch:
+                break
+            for record, scream_index in zip(batch, scream_indices([record.get('message') or '' for record in batch]).tolist()):
+                record['scream_index'] = scream_index
+            writer.append(batch)
+            written += len(batch)
+
+    os.replace(tmp_path, output_path)
+    return written
+
 if __name__ == "__main__":
     import sys
-    if len(sys.argv) != 2:
-        print("Usage: python scream_index_calc.py <json_file_path>")
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python -m v2.utils.scream_index_calc <json_file_path>")
+        print("       python -m v2.utils.scream_index_calc <input.jsonl> <output.jsonl>")
         sys.exit(1)
     json_file_path = sys.argv[1]
-    add_scream_index(json_file_path)
-    print(f"Scream index added to {json_file_path}")
+    if json_file_path.endswith('.jsonl'):
+        if len(sys.argv) != 3:
+            print("A .jsonl input needs a separate output file")
+            sys.exit(1)
+        output_path = sys.argv[2]
+        count = add_scream_index_stream(json_file_path, output_path)
+        print(f"Scream index added to {count} comments in {output_path}")
+    else:
+        add_scream_index(json_file_path)
+        print(f"Scream index added to {json_file_path}")